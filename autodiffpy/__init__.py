@@ -0,0 +1,47 @@
+from autodiffpy.dispatch import (
+    sin,
+    cos,
+    tan,
+    sec,
+    csc,
+    cot,
+    arcsin,
+    arccos,
+    arctan,
+    sinh,
+    cosh,
+    tanh,
+    sech,
+    csch,
+    coth,
+    exp,
+    log,
+    ln,
+    log2,
+    log10,
+    sqrt,
+    logistic,
+    softplus,
+    log1p,
+    expm1,
+    softmax,
+    where,
+    abs,
+    maximum,
+    minimum,
+    clip,
+    sum,
+    prod,
+    dot,
+    logsumexp,
+    cumsum,
+    stack,
+)
+from autodiffpy.complex_step import complex_step_grad
+from autodiffpy.gradcheck import check_gradients
+from autodiffpy.implicit import root
+from autodiffpy.primitive import primitive
+from autodiffpy.memoize import memoize
+from autodiffpy.frontend import grad, jacobian
+from autodiffpy.vectorize import vectorize
+from autodiffpy.precision import get_precision, set_precision, precision
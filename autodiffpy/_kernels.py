@@ -0,0 +1,56 @@
+"""Numeric helpers shared by the forward and the reverse mode.
+
+These functions only work on plain numbers and numpy arrays, so that both modes
+compute their values and derivatives with the same kernels.
+"""
+import numpy as np
+
+from autodiffpy.precision import get_precision
+
+
+def _exclusive_products(values, axis=None):
+    """Computes the product of all the values except the one at each position,
+    from prefix and suffix products so that zeros are handled correctly. The
+    products are taken along axis, or over all the values if it is None.
+    """
+    values = np.asarray(values)
+    stacked = np.ravel(values) if axis is None else np.moveaxis(values, axis, 0)
+
+    # the ones are of the type of the values, so that float32 is kept
+    one = np.ones_like(stacked[:1])
+    prefix = np.concatenate([one, np.cumprod(stacked[:-1], axis=0)])
+    suffix = np.concatenate([np.cumprod(stacked[:0:-1], axis=0)[::-1], one])
+    products = prefix * suffix
+
+    if axis is None:
+        return np.reshape(products, values.shape)
+    return np.moveaxis(products, 0, axis)
+
+
+def _tie_weights(x, y):
+    """The weight of x in the derivative of maximum(x, y): one where x is
+    larger, zero where it is smaller, and a half where they are equal.
+    """
+    weights = np.where(x > y, 1.0, np.where(x < y, 0.0, 0.5))
+    return weights.astype(get_precision())
+
+
+def _shift(values, axis):
+    """The largest real part along axis, or zero where it is not finite"""
+    shift = np.max(np.real(values), axis=axis, keepdims=True)
+    return np.where(np.isfinite(shift), shift, 0)
+
+
+def _logistic(x):
+    """Evaluates 1 / (1 + exp(-x)) with the exponent never positive, so that
+    it does not overflow for large negative x.
+    """
+    positive = np.real(x) >= 0
+    e = np.exp(np.where(positive, -x, x))
+    return np.where(positive, 1 / (1 + e), e / (1 + e))
+
+
+def _softplus(x):
+    """Evaluates log(1 + exp(x)) without overflowing for large x"""
+    positive = np.real(x) >= 0
+    return np.where(positive, x, 0) + np.log1p(np.exp(np.where(positive, -x, x)))
@@ -0,0 +1,58 @@
+"""Implements the complex step method for computing derivatives.
+
+For a function f which is real analytic, f(x + ih) = f(x) + ih f'(x) + O(h^2), so the
+derivative is imag(f(x + ih)) / h. Unlike finite differences there is no subtraction
+of nearly equal numbers, so h can be tiny (1e-30 by default) and the result is exact
+to machine precision.
+
+The functions here evaluate plain numpy code rather than Forward or Reverse objects.
+All n directions of a point are evaluated at once as an n x n complex array, so the
+function is called a single time per gradient. This makes the complex step method a
+cheap way to check the gradients computed by forward and reverse mode, and a way to
+differentiate numpy code that cannot be written in terms of autodiffpy objects.
+
+Functions that take absolute values, compare values or call np.real on their inputs
+are not analytic and will give wrong derivatives with this method.
+"""
+import numpy as np
+
+
+def complex_step_grad(f, x, h=1e-30, batched=True):
+    """Computes the gradient (or Jacobian) of f at x with the complex step method.
+
+    The inputs of f are the last axis of x, and f must accept points stacked along
+    leading axes: for example f = lambda x: x[..., 0] * np.sin(x[..., 1]) or
+    f = lambda x: np.sum(x ** 2, axis=-1). With batched=True all directions are
+    evaluated in a single call to f. If f only works on a single point, pass
+    batched=False to call it once per direction instead.
+
+    Args:
+        f - the function to differentiate, written with numpy operations
+        x - a scalar, a point of shape (n,), or a batch of points of shape (..., n)
+        h - the size of the imaginary step
+        batched - whether f can evaluate a stack of points in one call
+
+    Returns:
+        The derivative for scalar x. Otherwise an array with the batch axes of x,
+        then the axes of the output of f, then the n input axis, so for a scalar
+        function of a single point this is the gradient and for a vector function it
+        is the Jacobian.
+    """
+    x = np.asarray(x, dtype=float)
+
+    if x.ndim == 0:
+        return np.imag(f(x + 1j * h)) / h
+
+    n = x.shape[-1]
+
+    # row i of the last two axes perturbs input i
+    points = x[..., np.newaxis, :] + 1j * h * np.eye(n)
+
+    if batched:
+        results = np.asarray(f(points))
+    else:
+        flat = [np.asarray(f(point)) for point in points.reshape(-1, n)]
+        results = np.reshape(flat, points.shape[:-1] + flat[0].shape)
+
+    # move the direction axis behind the output axes
+    return np.moveaxis(np.imag(results) / h, x.ndim - 1, -1)
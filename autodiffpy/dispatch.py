@@ -0,0 +1,79 @@
+"""Mode independent versions of the functions in forward.py and reverse.py.
+
+Each function in this module looks at its arguments (and at the elements of list and
+tuple arguments) and calls the function with the same name in autodiffpy.forward if
+any of them is a Forward object, and in autodiffpy.reverse otherwise. The reverse
+mode functions fall back to numpy for arguments which are not Reverse objects, so
+these functions work on plain numbers and arrays as well.
+
+The most useful of these are re-exported from the autodiffpy package, so that for
+example ad.sum(terms) reduces a list of Forward or Reverse objects into a single node.
+The elementary functions make it possible to write a function once and evaluate it
+with Forward objects, Reverse objects or numpy arrays.
+"""
+from autodiffpy import forward, reverse
+
+
+def _module(args):
+    """Picks the module whose implementation should be used for the arguments"""
+    for arg in args:
+        items = arg if isinstance(arg, (list, tuple)) else [arg]
+
+        if any(isinstance(item, forward.Forward) for item in items):
+            return forward
+
+    return reverse
+
+
+def _dispatch(name):
+    """Creates a function which calls the function called name in the module that
+    matches its arguments.
+    """
+
+    def fun(*args, **kwargs):
+        return getattr(_module(args), name)(*args, **kwargs)
+
+    fun.__name__ = name
+    fun.__doc__ = getattr(forward, name).__doc__
+
+    return fun
+
+
+sin = _dispatch("sin")
+cos = _dispatch("cos")
+tan = _dispatch("tan")
+sec = _dispatch("sec")
+csc = _dispatch("csc")
+cot = _dispatch("cot")
+arcsin = _dispatch("arcsin")
+arccos = _dispatch("arccos")
+arctan = _dispatch("arctan")
+sinh = _dispatch("sinh")
+cosh = _dispatch("cosh")
+tanh = _dispatch("tanh")
+sech = _dispatch("sech")
+csch = _dispatch("csch")
+coth = _dispatch("coth")
+exp = _dispatch("exp")
+log = _dispatch("log")
+ln = _dispatch("ln")
+log2 = _dispatch("log2")
+log10 = _dispatch("log10")
+sqrt = _dispatch("sqrt")
+logistic = _dispatch("logistic")
+softplus = _dispatch("softplus")
+log1p = _dispatch("log1p")
+expm1 = _dispatch("expm1")
+softmax = _dispatch("softmax")
+where = _dispatch("where")
+abs = _dispatch("abs")
+maximum = _dispatch("maximum")
+minimum = _dispatch("minimum")
+clip = _dispatch("clip")
+
+sum = _dispatch("sum")
+prod = _dispatch("prod")
+dot = _dispatch("dot")
+logsumexp = _dispatch("logsumexp")
+cumsum = _dispatch("cumsum")
+stack = _dispatch("stack")
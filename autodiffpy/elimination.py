@@ -0,0 +1,225 @@
+"""Accumulates Jacobians by vertex elimination on the recorded reverse mode graph.
+
+The graph recorded by Reverse objects is the linearized computational graph: every
+edge from an argument to a node carries the partial derivative of the node with
+respect to that argument. Eliminating an intermediate vertex v replaces every path
+u -> v -> w by a direct edge u -> w with weight d(v)/d(u) * d(w)/d(v), added to any
+existing edge. Once every intermediate vertex is gone, the edges from the inputs to
+the outputs are the entries of the Jacobian.
+
+Eliminating the vertices in topological order is forward mode and in reverse
+topological order is reverse mode. Any other order is valid too, and for graphs with
+narrow waists some orders need far fewer multiplications than either. The Markowitz
+heuristic always eliminates the vertex with the fewest predecessor * successor pairs,
+which is the number of multiplications its elimination costs.
+
+The graph must consist of scalar valued nodes, since the partial derivatives of
+array valued operations are not stored as numbers.
+"""
+import heapq
+
+import numpy as np
+
+from autodiffpy.reverse import (
+    Reverse,
+    _live,
+    _precompute_partials,
+    _topological_order,
+)
+
+_ORDERS = ("markowitz", "forward", "reverse")
+
+
+class Elimination:
+    """The result of elimination_jacobian.
+
+    Attributes:
+        jacobian - the Jacobian, one row per output and one column per input
+        order - the name of the elimination order that was used
+        flops - the number of multiplications of the elimination that was done
+        forward_flops - the number of multiplications in topological order
+        reverse_flops - the number of multiplications in reverse topological order
+    """
+
+    def __init__(self, jacobian, order, flops, forward_flops, reverse_flops):
+        self.jacobian = jacobian
+        self.order = order
+        self.flops = flops
+        self.forward_flops = forward_flops
+        self.reverse_flops = reverse_flops
+
+    def __str__(self):
+        return "{} order: {} multiplications (forward {}, reverse {})".format(
+            self.order, self.flops, self.forward_flops, self.reverse_flops
+        )
+
+
+def _graph(outputs, inputs):
+    """Builds the linearized graph between inputs and outputs.
+
+    The vertices are numbered: the inputs first, then the intermediate nodes in
+    topological order, then one vertex per output, joined to its node by an edge
+    of weight one, so that outputs which feed other outputs are handled like any
+    other node.
+
+    Returns:
+        The predecessors and successors of every vertex as dicts from vertex to
+        edge weight, and the list of intermediate vertices in topological order.
+    """
+    order, seen = [], set()
+    for output in outputs:
+        for node in _topological_order(output):
+            if id(node) not in seen:
+                seen.add(id(node))
+                order.append(node)
+
+    index = {id(x): j for j, x in enumerate(inputs)}
+
+    # only the nodes that depend on an input are part of the graph
+    live = _live(order, inputs)
+
+    nodes = [node for node in order if id(node) in live and id(node) not in index]
+    for node in nodes:
+        index[id(node)] = len(index)
+
+    vertices = len(index) + len(outputs)
+    preds = [{} for _ in range(vertices)]
+    succs = [{} for _ in range(vertices)]
+
+    def link(u, v, weight):
+        preds[v][u] = preds[v].get(u, 0) + weight
+        succs[u][v] = preds[v][u]
+
+    _precompute_partials(nodes)
+
+    for node in nodes:
+        if np.ndim(node.value) != 0:
+            raise ValueError("elimination needs a graph of scalar valued nodes")
+
+        for position, parent in node.parents:
+            if id(parent) in live:
+                weight = node._partial(position)
+                if callable(weight) or np.ndim(weight) != 0:
+                    raise ValueError("elimination needs scalar partial derivatives")
+
+                link(index[id(parent)], index[id(node)], weight)
+
+    for k, output in enumerate(outputs):
+        if id(output) in live:
+            link(index[id(output)], len(index) + k, 1.0)
+
+    intermediates = list(range(len(inputs), len(index)))
+    return preds, succs, intermediates
+
+
+def _eliminate(v, preds, succs):
+    """Eliminates vertex v, returning the number of multiplications it took"""
+    flops = len(preds[v]) * len(succs[v])
+
+    for u, a in preds[v].items():
+        del succs[u][v]
+        for w, b in succs[v].items():
+            weight = succs[u].get(w, 0) + a * b
+            succs[u][w] = weight
+            preds[w][u] = weight
+
+    for w in succs[v]:
+        del preds[w][v]
+
+    preds[v], succs[v] = {}, {}
+    return flops
+
+
+def _count(order, preds, succs):
+    """Counts the multiplications of eliminating vertices in the given order,
+    following the structure of the graph only.
+    """
+    preds = [set(p) for p in preds]
+    succs = [set(s) for s in succs]
+    flops = 0
+
+    for v in order:
+        flops += len(preds[v]) * len(succs[v])
+
+        for u in preds[v]:
+            succs[u].discard(v)
+            succs[u] |= succs[v]
+        for w in succs[v]:
+            preds[w].discard(v)
+            preds[w] |= preds[v]
+
+        preds[v], succs[v] = set(), set()
+
+    return flops
+
+
+def _markowitz(intermediates, preds, succs):
+    """Eliminates the vertex with the smallest Markowitz degree, the product of
+    its numbers of predecessors and successors, until none are left.
+    """
+
+    def degree(v):
+        return len(preds[v]) * len(succs[v])
+
+    heap = [(degree(v), v) for v in intermediates]
+    heapq.heapify(heap)
+    remaining = set(intermediates)
+    flops = 0
+
+    while heap:
+        d, v = heapq.heappop(heap)
+
+        # skip entries whose degree changed since they were pushed
+        if v not in remaining or d != degree(v):
+            continue
+
+        neighbours = set(preds[v]) | set(succs[v])
+        flops += _eliminate(v, preds, succs)
+        remaining.discard(v)
+
+        for u in neighbours & remaining:
+            heapq.heappush(heap, (degree(u), u))
+
+    return flops
+
+
+def elimination_jacobian(outputs, inputs, order="markowitz"):
+    """Computes the Jacobian of outputs with respect to inputs by eliminating the
+    intermediate vertices of the recorded graph.
+
+    Arguments:
+        outputs {[Reverse]} -- scalar valued outputs
+        inputs {[Reverse]} -- scalar valued inputs
+        order (default: "markowitz") {str} -- "markowitz", "forward" or "reverse"
+
+    Returns:
+        Elimination -- the Jacobian, with the number of multiplications of the
+            chosen order and of the forward and reverse orders
+    """
+    if order not in _ORDERS:
+        raise ValueError("Unknown elimination order {}".format(order))
+
+    outputs, inputs = list(outputs), list(inputs)
+    if not all(isinstance(node, Reverse) for node in outputs + inputs):
+        raise ValueError("elimination needs Reverse outputs and inputs")
+
+    preds, succs, intermediates = _graph(outputs, inputs)
+    forward_flops = _count(intermediates, preds, succs)
+    reverse_flops = _count(intermediates[::-1], preds, succs)
+
+    if order == "markowitz":
+        flops = _markowitz(intermediates, preds, succs)
+    else:
+        sequence = intermediates if order == "forward" else intermediates[::-1]
+        flops = 0
+        for v in sequence:
+            flops += _eliminate(v, preds, succs)
+
+    first_output = len(preds) - len(outputs)
+    jacobian = np.zeros((len(outputs), len(inputs)))
+
+    for j in range(len(inputs)):
+        for w, weight in succs[j].items():
+            jacobian[w - first_output, j] = weight
+
+    return Elimination(jacobian, order, flops, forward_flops, reverse_flops)
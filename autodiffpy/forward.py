@@ -14,11 +14,72 @@ operations, then we will create more Forward objects that we can access.
 To get the results of computation, we can access the actual value by doing .value on
 the Forward object at hand. To get the gradient with respect to a certain variable,
 we can call .get_gradient(variable_name) on the Forward object.
+
+Values and variables can also be numpy arrays. Internally the derivative with respect
+to a variable is stored with the axes of the variable first followed by the axes of
+the value, so elementwise rules broadcast over the variable axes unchanged.
+get_gradient returns the Jacobian with the axes of the value first.
+
+Only the variables that are needed have to be differentiated. Inputs created with
+Forward.constant_input, or outside of the names given to a Forward.wrt block, are
+passive: they carry no derivatives, and operations between passive values skip the
+derivative computations altogether.
 """
+from contextlib import contextmanager
+import threading
+
 import numpy as np
 
+from autodiffpy._kernels import (
+    _exclusive_products,
+    _logistic,
+    _shift,
+    _softplus,
+    _tie_weights,
+)
+from autodiffpy.precision import _accumulate, _as_float, get_precision
+
 np.seterr(all="ignore")
 
+# the names given to the innermost Forward.wrt block of each thread
+_LOCAL = threading.local()
+
+
+def _active():
+    """Returns the names of the variables to differentiate with respect to in
+    the current thread, or None for all of them.
+    """
+    return getattr(_LOCAL, "active", None)
+
+
+# we support complex numbers and numpy arrays too!
+_NUMERIC = (float, int, complex, np.number, np.ndarray)
+
+
+def _as_value(value):
+    """Converts list inputs into arrays and integer arrays into float arrays
+    so that elementwise operations such as negative powers are well defined.
+    Arrays are kept in the working precision, see autodiffpy.precision.
+    """
+    if isinstance(value, (list, tuple)):
+        value = np.asarray(value)
+
+    return _as_float(value)
+
+
+def _align(derivative, value_ndim, result_ndim):
+    """Inserts axes between the variable axes and the value axes of a derivative
+    so that it broadcasts against a result with more dimensions than its value.
+    """
+    var_ndim = np.ndim(derivative) - value_ndim
+    missing = result_ndim - value_ndim
+
+    if var_ndim == 0 or missing <= 0:
+        return derivative
+
+    shape = np.shape(derivative)
+    return np.reshape(derivative, shape[:var_ndim] + (1,) * missing + shape[var_ndim:])
+
 
 def _coerce(arg):
     """Private function which does the actual coercion of a type into a
@@ -27,8 +88,7 @@ def _coerce(arg):
     if isinstance(arg, Forward):
         return arg
 
-    # we support complex numbers too!
-    if isinstance(arg, (float, int, complex)):
+    if isinstance(arg, _NUMERIC + (list, tuple)):
         return Forward(arg)
 
     # otherwise raise ValueError cause we don't support
@@ -70,13 +130,21 @@ class Forward:
     differentiation. If two arguments are provided, the first must be a string, which
     represents the variable name, and the second must be a numeric type, which
     represents the value of that variable.
+
+    Numeric types include numpy arrays (and lists, which are converted to arrays).
+    The derivative of an array valued variable with respect to itself is the
+    identity, so the gradient of any result with respect to it is a full Jacobian.
     """
 
+    # make numpy defer to our reflected operators instead of building object
+    # arrays of Forward objects when an array appears on the left
+    __array_ufunc__ = None
+
     def __init__(self, *args):
         if len(args) == 1:
-            value = args[0]
+            value = _as_value(args[0])
 
-            if not isinstance(value, (int, float, complex)):
+            if not isinstance(value, _NUMERIC):
                 raise ValueError
 
             self.derivatives = {}
@@ -84,15 +152,27 @@ class Forward:
 
         elif len(args) == 2:
             var_name, value = args
+            value = _as_value(value)
 
             if not isinstance(var_name, str):
                 raise ValueError
 
-            if not isinstance(value, (int, float, complex)):
+            if not isinstance(value, _NUMERIC):
                 raise ValueError
 
-            # initialize the variable to have derivative 1
-            self.derivatives = {var_name: 1}
+            # initialize the variable to have derivative 1, unless it is passive
+            active = _active()
+            if active is not None and var_name not in active:
+                self.derivatives = {}
+            elif np.ndim(value) == 0:
+                self.derivatives = {var_name: 1}
+            else:
+                shape = np.shape(value)
+                self.derivatives = {
+                    var_name: np.eye(np.size(value), dtype=get_precision()).reshape(
+                        shape + shape
+                    )
+                }
 
             self.value = value
         else:
@@ -112,11 +192,68 @@ class Forward:
         grad = self.derivatives.get(var_name, 0)
         # check to see if the computatino was nan, indicating that the gradient
         # most likely does not exist
-        if np.isnan(grad):
+        if np.any(np.isnan(grad)):
             raise ValueError("Gradient does not exist!")
 
+        # move the variable axes behind the value axes to get the Jacobian
+        var_ndim = np.ndim(grad) - np.ndim(self.value)
+        if var_ndim > 0 and np.ndim(self.value) > 0:
+            grad = np.moveaxis(grad, list(range(var_ndim)), list(range(-var_ndim, 0)))
+
         return grad
 
+    @classmethod
+    def batched(cls, var_name, values):
+        """Creates a variable which takes each of the given values at once.
+
+        The derivative of every element of the result is only taken with respect to
+        the matching element of values, so that evaluating a scalar function of
+        batched variables gives its gradient at every point in a single pass instead
+        of a full Jacobian.
+        """
+        values = _as_value(values)
+
+        active = _active()
+        if active is not None and var_name not in active:
+            return cls(values)
+
+        seed = np.ones(np.shape(values), dtype=get_precision())
+        return cls._with_derivatives(values, {var_name: seed})
+
+    @classmethod
+    def constant_input(cls, var_name, value):
+        """Creates a passive input which is not differentiated.
+
+        The result carries no derivatives, so that a variable can be excluded from
+        differentiation by changing only how it is created. get_gradient with respect
+        to var_name returns zero.
+        """
+        return cls(value)
+
+    @classmethod
+    @contextmanager
+    def wrt(cls, *var_names):
+        """Context manager which restricts differentiation to the named variables.
+
+        Variables with any other name created within the block are passive, as if
+        they were created with constant_input. Computations on values that depend on
+        passive inputs only are plain numeric operations without derivatives. The
+        block only applies to the thread that enters it.
+
+        Example:
+            with Forward.wrt("x"):
+                x = Forward("x", 1.0)
+                p = Forward("p", 2.0)
+            (p * x).get_gradient("p")  # 0
+        """
+        previous = _active()
+        _LOCAL.active = frozenset(var_names)
+
+        try:
+            yield
+        finally:
+            _LOCAL.active = previous
+
     @classmethod
     def _with_derivatives(cls, value, derivatives):
         """Creates a Forward object with a particular set of derivatives and value.
@@ -158,9 +295,19 @@ class Forward:
             result_func - the function to compute the result of the function
         """
 
-        # compute the new "derivatives"
-        new_left_derivatives = self.update_derivatives(left_update)
-        new_right_derivatives = right_forward.update_derivatives(right_update)
+        result = result_func(self.value, right_forward.value)
+
+        # passive operands have nothing to differentiate
+        if not self.derivatives and not right_forward.derivatives:
+            return Forward(result)
+
+        # compute the new "derivatives", lined up with the shape of the result
+        new_left_derivatives = self._aligned(np.ndim(result)).update_derivatives(
+            left_update
+        )
+        new_right_derivatives = right_forward._aligned(
+            np.ndim(result)
+        ).update_derivatives(right_update)
 
         # get all the variables that we can differentiate
         all_vars = self.derivatives.keys() | right_forward.derivatives.keys()
@@ -175,8 +322,22 @@ class Forward:
             # combine the derivatives
             updated[var] = derivative_update(l_der, r_der)
 
+        return Forward._with_derivatives(result, updated)
+
+    def _aligned(self, result_ndim):
+        """Returns a Forward object whose derivatives broadcast against a result
+        of dimension result_ndim, for binary operations between arrays of
+        different dimensions.
+        """
+        if np.ndim(self.value) >= result_ndim:
+            return self
+
         return Forward._with_derivatives(
-            result_func(self.value, right_forward.value), updated
+            self.value,
+            {
+                var: _align(der, np.ndim(self.value), result_ndim)
+                for var, der in self.derivatives.items()
+            },
         )
 
     @coerce
@@ -242,7 +403,7 @@ class Forward:
         return self.binop(
             other,
             lambda x: x * self.value ** (other.value - 1) * other.value,
-            lambda x: x * res * np.log(self.value),
+            lambda x: x * res * _as_float(np.log(self.value)),
             lambda x, y: x + y,
             lambda x, y: res,
         )
@@ -275,6 +436,29 @@ class Forward:
     def __ne__(self, other):
         return self.value != other.value
 
+    @coerce
+    def __matmul__(self, other):
+        return matmul(self, other)
+
+    @coerce
+    def __rmatmul__(self, other):
+        return matmul(other, self)
+
+    @property
+    def T(self):
+        """The transpose of an array valued Forward object"""
+        return transpose(self)
+
+    def __getitem__(self, index):
+        index = index if isinstance(index, tuple) else (index,)
+        ndim = np.ndim(self.value)
+
+        def rule(der):
+            # the variable axes come first, so skip over them before indexing
+            return der[(slice(None),) * (np.ndim(der) - ndim) + index]
+
+        return _linear(self.value[index], [(self, rule)])
+
     def __neg__(self):
         # define negation as literally just subtracting from zero
         return 0 - self
@@ -283,6 +467,9 @@ class Forward:
         # define pos as a nop
         return self
 
+    def __abs__(self):
+        return abs(self)
+
     def unop(self, value_fun, derivative_fun):
         """Convenience method for defining unary operators on Forward objects.
 
@@ -293,6 +480,9 @@ class Forward:
             value_fun - the function to compute the actual result
             derivative_fun - the function that computes the derivative
         """
+        if not self.derivatives:
+            return Forward(value_fun(self.value))
+
         updated_ders = {}
 
         for var in self.derivatives.keys():
@@ -460,9 +650,412 @@ def logistic(x):
     """Computes the logistic function of the input.
 
     The logistic function has the curious property that its gradient is given
-    by logistic(x) * (1 - logistic(x)).
+    by logistic(x) * (1 - logistic(x)), so the value is computed once and reused
+    for the derivative.
+    """
+    s = _logistic(x.value)
+    return x.unop(lambda v: s, lambda v: s * (1 - s))
+
+
+@coerce
+def softplus(x):
+    """Computes log(1 + exp(x)), whose derivative is logistic(x)"""
+    return x.unop(_softplus, _logistic)
+
+
+@coerce
+def log1p(x):
+    """Computes log(1 + x), accurately for small x"""
+    return x.unop(np.log1p, lambda v: 1 / (1 + v))
+
+
+@coerce
+def expm1(x):
+    """Computes exp(x) - 1, accurately for small x"""
+    value = np.expm1(x.value)
+    return x.unop(lambda v: value, lambda v: value + 1)
+
+
+def where(cond, x, y):
+    """Selects the elements of x where cond is true and those of y elsewhere.
+
+    The derivative is selected in the same way, so that piecewise functions can be
+    written without Python if statements, which only work for a single point.
+    """
+    x, y = _coerce(x), _coerce(y)
+    cond = np.asarray(cond, dtype=bool)
+
+    return x.binop(
+        y,
+        lambda der: der,
+        lambda der: der,
+        lambda l_der, r_der: np.where(cond, l_der, r_der),
+        lambda a, b: np.where(cond, a, b),
+    )
+
+
+@coerce
+def abs(x):
+    """Computes the absolute value of the input, whose derivative is taken to be
+    zero at zero.
+    """
+    return x.unop(np.abs, np.sign)
+
+
+def maximum(x, y):
+    """Computes the elementwise maximum of the inputs. Where they are equal, each
+    of them gets half of the derivative.
+    """
+    x, y = _coerce(x), _coerce(y)
+    weight = _tie_weights(x.value, y.value)
+
+    return x.binop(
+        y,
+        lambda der: der,
+        lambda der: der,
+        lambda l_der, r_der: weight * l_der + (1 - weight) * r_der,
+        np.maximum,
+    )
+
+
+def minimum(x, y):
+    """Computes the elementwise minimum of the inputs. Where they are equal, each
+    of them gets half of the derivative.
     """
-    return 1 / (1 + exp(-x))
+    x, y = _coerce(x), _coerce(y)
+    weight = _tie_weights(y.value, x.value)
+
+    return x.binop(
+        y,
+        lambda der: der,
+        lambda der: der,
+        lambda l_der, r_der: weight * l_der + (1 - weight) * r_der,
+        np.minimum,
+    )
+
+
+def clip(x, lower, upper):
+    """Limits the input to the interval from lower to upper. The derivative is that
+    of the input inside the interval, including its ends, and that of the bound
+    outside of it.
+    """
+    x, lower, upper = _coerce(x), _coerce(lower), _coerce(upper)
+
+    return where(
+        x.value < lower.value,
+        lower,
+        where(x.value > upper.value, upper, x),
+    )
+
+
+def _linear(value, rules):
+    """Creates a Forward object for an operation which is not elementwise.
+
+    Each rule is a pair of an operand and a function which maps the derivative of
+    that operand onto its contribution to the derivative of the result. Since the
+    variable axes of a derivative come first, these functions are the tangent rules
+    of the operation broadcast over any leading axes, which numpy does in a single
+    call.
+
+    Args:
+        value - the result of the operation
+        rules - list of (Forward, tangent function) pairs
+    """
+    updated = {}
+
+    for operand, rule in rules:
+        for var, der in operand.derivatives.items():
+            contribution = rule(der)
+            updated[var] = (
+                updated[var] + contribution if var in updated else contribution
+            )
+
+    return Forward._with_derivatives(value, updated)
+
+
+def _value_axes(ndim, axis):
+    """Converts an axis of a value into the matching (negative) axis of its
+    derivatives, which carry the variable axes in front.
+    """
+    if axis is None:
+        return tuple(range(-ndim, 0))
+
+    return tuple(a - ndim if a >= 0 else a for a in np.atleast_1d(axis))
+
+
+def _terms(values):
+    """Coerces the elements of a list or tuple into Forward objects"""
+    return [_coerce(value) for value in values]
+
+
+def _weighted_sum(value, terms, weights):
+    """Creates a single Forward object whose derivatives are the weighted sum of the
+    derivatives of terms. This is the derivative rule of every reduction over a
+    collection, and visits each derivative of each term exactly once.
+    """
+    return _linear(
+        value, [(term, lambda der, w=w: w * der) for term, w in zip(terms, weights)]
+    )
+
+
+def sum(x, axis=None):
+    """Computes the sum of the elements of the input along the given axis.
+
+    If the input is a list or tuple, the sum of its elements is computed as a
+    single Forward object rather than a chain of additions.
+    """
+    if isinstance(x, (list, tuple)):
+        terms = _terms(x)
+        value = _accumulate(np.sum, [term.value for term in terms], axis=0)
+        return _weighted_sum(value, terms, [1] * len(terms))
+
+    x = _coerce(x)
+    axes = _value_axes(np.ndim(x.value), axis)
+
+    return _linear(
+        _accumulate(np.sum, x.value, axis=axis),
+        [(x, lambda der: _accumulate(np.sum, der, axis=axes))],
+    )
+
+
+def prod(x):
+    """Computes the product of all the elements of the input, which is either an
+    array valued Forward object or a list whose elements are multiplied together
+    elementwise.
+    """
+    if isinstance(x, (list, tuple)):
+        terms = _terms(x)
+        values = np.broadcast_arrays(*[term.value for term in terms])
+        return _weighted_sum(
+            np.prod(values, axis=0), terms, _exclusive_products(values, axis=0)
+        )
+
+    x = _coerce(x)
+    weights = _exclusive_products(x.value)
+    axes = _value_axes(np.ndim(x.value), None)
+
+    return _linear(
+        np.prod(x.value), [(x, lambda der: np.sum(weights * der, axis=axes))]
+    )
+
+
+def logsumexp(x, axis=None):
+    """Computes log(sum(exp(x))) over the elements of the input along the given
+    axis, or over all of them. The input is either an array valued Forward object or
+    a list of scalars.
+
+    The largest element is subtracted before exponentiating so that the result does
+    not overflow, and the derivative is the softmax of the input.
+    """
+    if isinstance(x, (list, tuple)):
+        terms = _terms(x)
+        values = np.array([term.value for term in terms])
+    else:
+        x = _coerce(x)
+        values = x.value
+
+    shift = _shift(values, axis)
+    exps = np.exp(values - shift)
+    total = np.sum(exps, axis=axis, keepdims=True)
+    value = np.log(total) + shift
+    value = value.reshape(())[()] if axis is None else np.squeeze(value, axis=axis)
+    weights = exps / total
+
+    if isinstance(x, (list, tuple)):
+        return _weighted_sum(value, terms, weights)
+
+    axes = _value_axes(np.ndim(values), axis)
+    return _linear(value, [(x, lambda der: np.sum(weights * der, axis=axes))])
+
+
+def softmax(x, axis=None):
+    """Computes exp(x) / sum(exp(x)) over the elements of the input along the given
+    axis, or over all of them, as a single Forward object.
+    """
+    x = _coerce(x)
+    exps = np.exp(x.value - _shift(x.value, axis))
+    value = exps / np.sum(exps, axis=axis, keepdims=True)
+    axes = _value_axes(np.ndim(x.value), axis)
+
+    def rule(der):
+        return value * (der - np.sum(value * der, axis=axes, keepdims=True))
+
+    return _linear(value, [(x, rule)])
+
+
+def stack(values):
+    """Stacks a list of Forward objects (or numbers) into a single array valued
+    Forward object along a new first axis.
+    """
+    terms = _terms(values)
+    value = np.stack([term.value for term in terms])
+    updated = {}
+
+    for i, term in enumerate(terms):
+        for var, der in term.derivatives.items():
+            if var not in updated:
+                var_shape = np.shape(der)[: np.ndim(der) - np.ndim(term.value)]
+                updated[var] = np.zeros(
+                    var_shape + value.shape, dtype=np.result_type(der, value)
+                )
+
+            # position i of the value axes, which come after the variable axes
+            updated[var][(Ellipsis, i) + (slice(None),) * np.ndim(term.value)] = der
+
+    return Forward._with_derivatives(value, updated)
+
+
+def cumsum(x, axis=None):
+    """Computes the cumulative sum of the input along the given axis, or of its
+    flattened elements as numpy does. The input is either an array valued Forward
+    object or a list of scalars.
+    """
+    if isinstance(x, (list, tuple)):
+        x = stack(x)
+
+    x = _coerce(x)
+    ndim = np.ndim(x.value)
+
+    def rule(der):
+        if axis is None:
+            # flatten the value axes, which come after the variable axes
+            der = np.reshape(der, np.shape(der)[: np.ndim(der) - ndim] + (-1,))
+            return np.cumsum(der, axis=-1)
+
+        return np.cumsum(der, axis=_value_axes(ndim, axis)[0])
+
+    return _linear(np.cumsum(x.value, axis=axis), [(x, rule)])
+
+
+@coerce
+def transpose(x):
+    """Computes the transpose of the input, which reverses the order of its axes
+    as numpy does. The value axes of the derivatives are reversed in the same way.
+    """
+    ndim = np.ndim(x.value)
+    if ndim < 2:
+        return x
+
+    def rule(der):
+        # the variable axes come first and keep their order
+        lead = np.ndim(der) - ndim
+        return np.transpose(
+            der, tuple(range(lead)) + tuple(reversed(range(lead, lead + ndim)))
+        )
+
+    return _linear(x.value.T, [(x, rule)])
+
+
+@coerce
+def matmul(a, b):
+    """Computes the matrix product of two vectors or matrices.
+
+    The tangent of a @ b is da @ b + a @ db, where the first term broadcasts over the
+    variable axes of da directly. When b is a vector its derivative is a stack of
+    row vectors, so we multiply by the transpose of a from the right instead.
+    """
+    if np.ndim(a.value) == 0 or np.ndim(b.value) == 0:
+        return a * b
+
+    def right(der):
+        if np.ndim(b.value) == 1:
+            return np.matmul(der, np.transpose(a.value))
+
+        return np.matmul(a.value, der)
+
+    return _linear(
+        np.matmul(a.value, b.value),
+        [(a, lambda der: np.matmul(der, b.value)), (b, right)],
+    )
+
+
+def dot(a, b):
+    """Computes the dot product of two vectors or matrices.
+
+    If the inputs are lists or tuples of scalars, the dot product is computed as a
+    single Forward object rather than a chain of products and additions.
+    """
+    if isinstance(a, (list, tuple)) or isinstance(b, (list, tuple)):
+        left, right = _terms(a), _terms(b)
+        if len(left) != len(right):
+            raise ValueError("dot of {} and {} terms".format(len(left), len(right)))
+
+        values = [l.value * r.value for l, r in zip(left, right)]
+        weights = [r.value for r in right] + [l.value for l in left]
+        return _weighted_sum(np.sum(values), left + right, weights)
+
+    return matmul(a, b)
+
+
+def _solve_stacked(a, rhs, rhs_ndim):
+    """Solves a x = rhs for a stack of right hand sides whose trailing rhs_ndim axes
+    have the shape of the original right hand side, with a single LAPACK call.
+    """
+    columns = np.moveaxis(rhs, -rhs_ndim, 0)
+    solved = np.linalg.solve(a, columns.reshape(columns.shape[0], -1))
+
+    return np.moveaxis(solved.reshape(columns.shape), 0, -rhs_ndim)
+
+
+@coerce
+def solve(a, b):
+    """Solves the linear system a x = b for x.
+
+    Differentiating a x = b gives a dx = db - da x, so both tangents reuse the same
+    linear solve.
+    """
+    x = np.linalg.solve(a.value, b.value)
+    ndim = np.ndim(b.value)
+
+    return _linear(
+        x,
+        [
+            (a, lambda der: -_solve_stacked(a.value, np.matmul(der, x), ndim)),
+            (b, lambda der: _solve_stacked(a.value, der, ndim)),
+        ],
+    )
+
+
+@coerce
+def inv(a):
+    """Computes the inverse of a square matrix. The tangent is -inv(a) da inv(a)."""
+    a_inv = np.linalg.inv(a.value)
+
+    return _linear(a_inv, [(a, lambda der: -np.matmul(a_inv, np.matmul(der, a_inv)))])
+
+
+@coerce
+def det(a):
+    """Computes the determinant of a square matrix.
+
+    By Jacobi's formula the tangent is det(a) * trace(inv(a) da).
+    """
+    value = np.linalg.det(a.value)
+    a_inv_t = np.linalg.inv(a.value).T
+
+    return _linear(
+        value, [(a, lambda der: value * np.sum(a_inv_t * der, axis=(-2, -1)))]
+    )
+
+
+@coerce
+def logdet(a):
+    """Computes the log of the absolute value of the determinant of a square
+    matrix, whose tangent is trace(inv(a) da).
+    """
+    _, value = np.linalg.slogdet(a.value)
+    a_inv_t = np.linalg.inv(a.value).T
+
+    return _linear(value, [(a, lambda der: np.sum(a_inv_t * der, axis=(-2, -1)))])
+
+
+@coerce
+def norm(x):
+    """Computes the Euclidean norm of a vector, or the Frobenius norm of a matrix"""
+    value = np.linalg.norm(x.value)
+    axes = _value_axes(np.ndim(x.value), None)
+
+    return _linear(value, [(x, lambda der: np.sum(x.value * der, axis=axes) / value)])
 
 
 class fVector:
@@ -0,0 +1,251 @@
+"""Computes gradients and Jacobians without choosing between forward and reverse mode.
+
+A Jacobian of m outputs with respect to n inputs takes one forward pass carrying n
+tangents per node, or one recorded graph swept backwards m times. Which one is faster
+can differ by orders of magnitude, so grad and jacobian decide for the caller:
+
+1. f is traced with a Reverse input. Partial derivatives are only computed in a
+   backward sweep, so the trace costs about as much as evaluating f, and it reveals
+   the number of outputs m and the number of nodes of the graph. These are kept for
+   f and the shapes of its arguments, so later calls decide without a trace.
+2. The cost model estimates forward mode at n * nodes and reverse mode at
+   reverse_factor * m * nodes. Once both modes have been timed, the measured time
+   per unit of cost of each mode replaces the fixed reverse_factor.
+3. If reverse mode wins, the traced graph is swept, tracing f first if the decision
+   was made without a trace. If forward mode wins, f is evaluated in forward mode.
+   f is only evaluated twice when the first call for a shape picks forward mode.
+
+Vertex elimination in other orders (see autodiffpy.elimination) is not a candidate,
+since it needs a graph of scalar valued nodes, while f is traced with a single array
+valued input. It can be called directly on a graph of scalar Reverse objects.
+
+Every decision is recorded with its estimated costs and the time it took, in the
+history of the ModeSelector that made it, so that the model can be inspected and
+tuned. f must be written with operators and functions that accept both Forward and
+Reverse objects, such as those of the top-level autodiffpy package.
+"""
+from collections import deque
+import time
+
+import numpy as np
+
+from autodiffpy.forward import Forward
+from autodiffpy.precision import get_precision
+from autodiffpy.reverse import Reverse, _topological_order, gradients
+
+
+class Decision:
+    """The record of one gradient or Jacobian computation.
+
+    Attributes:
+        inputs - the number of inputs n
+        outputs - the number of outputs m
+        nodes - the number of nodes of the traced graph, None if forward mode was
+            asked for before f was ever traced
+        costs - dict from mode to its estimated cost, empty if nodes is None
+        mode - the mode that was used
+        seconds - the time the computation took, including the trace
+    """
+
+    def __init__(self, inputs, outputs, nodes, costs, mode):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.nodes = nodes
+        self.costs = costs
+        self.mode = mode
+        self.seconds = None
+
+    def __str__(self):
+        return "{} inputs, {} outputs, {} nodes: {} mode in {:.3g}s".format(
+            self.inputs, self.outputs, self.nodes, self.mode, self.seconds
+        )
+
+
+def _forward_jacobian(f, x, args):
+    out = f(Forward("x", x), *args)
+
+    if not isinstance(out, Forward):
+        return np.zeros(np.shape(out) + np.shape(x), dtype=x.dtype)
+
+    return np.broadcast_to(
+        out.get_gradient("x"), np.shape(out.value) + np.shape(x)
+    ).copy()
+
+
+def _reverse_jacobian(x, out):
+    if not isinstance(out, Reverse):
+        return np.zeros(np.shape(out) + np.shape(x.value), dtype=x.value.dtype)
+
+    shape = np.shape(out.value)
+    if not shape:
+        return np.asarray(gradients(out, [x])[0], dtype=x.value.dtype)
+
+    rows = []
+    for index in np.ndindex(*shape):
+        seed = np.zeros(shape, dtype=x.value.dtype)
+        seed[index] = 1.0
+        rows.append(gradients(out, [x], seed)[0])
+
+    return np.reshape(rows, shape + np.shape(x.value))
+
+
+def _work(inputs, outputs, nodes):
+    """The amount of work of each mode: forward mode carries one tangent per input
+    through every node, reverse mode sweeps every node once per output.
+    """
+    return {"forward": float(inputs * nodes), "reverse": float(outputs * nodes)}
+
+
+class ModeSelector:
+    """Chooses between forward and reverse mode with a cost model, and records
+    its decisions.
+
+    Attributes:
+        reverse_factor - the cost of a reverse sweep relative to carrying one
+            tangent through a forward pass, used until both modes were timed
+        rates - dict from mode to the measured seconds per unit of estimated cost,
+            an exponential moving average over the computations in that mode
+        history - the most recent Decisions
+    """
+
+    def __init__(self, reverse_factor=2.0, history_size=1000, smoothing=0.2):
+        """Creates a selector.
+
+        Args:
+            reverse_factor - the initial relative cost of a reverse sweep
+            history_size - the number of Decisions that are kept, and of the
+                functions whose traced sizes are kept
+            smoothing - the weight of the newest timing in the moving averages
+        """
+        self.reverse_factor = reverse_factor
+        self.smoothing = smoothing
+        self.rates = {}
+        self.history = deque(maxlen=history_size)
+        self._sizes = {}
+
+    def costs(self, inputs, outputs, nodes):
+        """Estimates the cost of each mode.
+
+        Returns:
+            dict from mode to the estimated cost, in seconds once both modes have
+            been timed and in units of forward tangents per node otherwise
+        """
+        work = _work(inputs, outputs, nodes)
+
+        if all(mode in self.rates for mode in work):
+            return {mode: work[mode] * self.rates[mode] for mode in work}
+
+        return {
+            "forward": work["forward"],
+            "reverse": self.reverse_factor * work["reverse"],
+        }
+
+    def _record(self, decision, seconds):
+        decision.seconds = seconds
+        self.history.append(decision)
+
+        # forward mode without a trace has no graph size to measure a rate by
+        if decision.nodes is None:
+            return
+
+        work = _work(decision.inputs, decision.outputs, decision.nodes)[decision.mode]
+        if work == 0:
+            return
+
+        rate = seconds / work
+        old = self.rates.get(decision.mode, rate)
+        self.rates[decision.mode] = old + self.smoothing * (rate - old)
+
+    def _trace(self, key, f, x, args):
+        """Evaluates f on a Reverse input and keeps the number of its outputs and
+        of the nodes of its graph under key.
+        """
+        traced = Reverse(x)
+        out = f(traced, *args)
+        nodes = len(_topological_order(out)) if isinstance(out, Reverse) else 1
+
+        if len(self._sizes) >= self.history.maxlen:
+            del self._sizes[next(iter(self._sizes))]
+        self._sizes[key] = (np.size(getattr(out, "value", out)), nodes)
+
+        return traced, out
+
+    def jacobian(self, f, x, args=(), mode=None):
+        """Computes the Jacobian of f at x in the cheaper mode.
+
+        Args:
+            f - function of an array (or number) x, followed by constant args
+            x - the point
+            args - constant arguments passed to f after the point
+            mode - "forward" or "reverse" to skip the cost model
+
+        Returns:
+            The Jacobian, with the axes of the output of f followed by the axes of x.
+        """
+        if mode not in (None, "forward", "reverse"):
+            raise ValueError("Unknown mode {}".format(mode))
+
+        start = time.perf_counter()
+        x = np.array(x, dtype=get_precision())
+        key = (f, np.shape(x), tuple(np.shape(arg) for arg in args))
+
+        # the trace records values only, the partials are computed when swept
+        trace = None
+        if mode == "reverse" or (mode is None and key not in self._sizes):
+            trace = self._trace(key, f, x, args)
+
+        inputs = np.size(x)
+        outputs, nodes = self._sizes.get(key, (None, None))
+
+        if nodes is None:
+            costs = {}
+        else:
+            costs = self.costs(inputs, outputs, nodes)
+            mode = mode or min(costs, key=costs.get)
+
+        if mode == "reverse":
+            result = _reverse_jacobian(*(trace or self._trace(key, f, x, args)))
+        else:
+            result = _forward_jacobian(f, x, args)
+            outputs = int(np.prod(np.shape(result)[: np.ndim(result) - np.ndim(x)]))
+
+        decision = Decision(inputs, outputs, nodes, costs, mode)
+        self._record(decision, time.perf_counter() - start)
+        return result
+
+    def grad(self, f, x, args=(), mode=None):
+        """Computes the gradient of a scalar function f at x in the cheaper mode,
+        which is reverse mode unless x has a single element.
+
+        Args:
+            f - scalar function of an array (or number) x, followed by constant args
+            x - the point
+            args - constant arguments passed to f after the point
+            mode - "forward" or "reverse" to skip the cost model
+
+        Returns:
+            The gradient, with the shape of x.
+        """
+        gradient = self.jacobian(f, x, args, mode)
+
+        if np.shape(gradient) != np.shape(x):
+            raise ValueError("grad needs a scalar function, use jacobian instead")
+
+        return gradient
+
+
+_SELECTOR = ModeSelector()
+
+
+def jacobian(f, x, args=(), mode=None, selector=None):
+    """Computes the Jacobian of f at x, choosing forward or reverse mode with the
+    cost model of selector (a shared ModeSelector by default).
+    """
+    return (selector or _SELECTOR).jacobian(f, x, args, mode)
+
+
+def grad(f, x, args=(), mode=None, selector=None):
+    """Computes the gradient of a scalar function f at x, choosing forward or
+    reverse mode with the cost model of selector (a shared ModeSelector by default).
+    """
+    return (selector or _SELECTOR).grad(f, x, args, mode)
@@ -0,0 +1,174 @@
+"""Checks the gradients of forward mode, reverse mode and finite differences against
+each other over many points at once.
+
+The function to check is written once for scalar inputs using the operators and the
+mode independent functions of autodiffpy.dispatch (or the top-level autodiffpy
+package), for example lambda x, y: ad.sin(x * y) + x ** 2. Every input is then given
+an array holding its value at every point, so each engine evaluates the function a
+single time for the whole batch:
+
+- forward mode uses Forward.batched variables, whose derivatives are elementwise
+- reverse mode seeds the output with ones, which gives the gradient at every point
+  since nothing mixes the points together
+- central differences evaluate the function on numpy arrays, two calls per input
+"""
+import numpy as np
+
+from autodiffpy.forward import Forward, _coerce
+from autodiffpy.reverse import Reverse, gradients
+
+_PAIRS = [
+    ("forward", "reverse"),
+    ("forward", "finite_difference"),
+    ("reverse", "finite_difference"),
+]
+
+
+def _forward_gradients(f, points):
+    """Evaluates f and its gradient at every row of points in a single pass. The
+    gradient is nan at the points where it does not exist.
+    """
+    names = ["x{}".format(i) for i in range(points.shape[1])]
+    result = _coerce(
+        f(*[Forward.batched(name, column) for name, column in zip(names, points.T)])
+    )
+
+    values = np.broadcast_to(result.value, len(points))
+    gradients = np.stack(
+        # get_gradient raises if any point has a nan derivative, so they are read
+        # directly and the points are skipped by GradientCheck instead
+        [
+            np.broadcast_to(result.derivatives.get(name, 0), len(points))
+            for name in names
+        ],
+        axis=1,
+    )
+    return values, gradients
+
+
+def _reverse_gradients(f, points):
+    """Computes the gradient of f at every row of points with a single reverse
+    sweep, seeded with ones. A constant result has a zero gradient.
+    """
+    inputs = [Reverse(column) for column in points.T]
+    result = f(*inputs)
+
+    if not isinstance(result, Reverse):
+        return np.zeros_like(points)
+
+    seed = np.ones(np.shape(result.value))
+    return np.stack(
+        [np.broadcast_to(g, len(points)) for g in gradients(result, inputs, seed)],
+        axis=1,
+    )
+
+
+def _finite_difference_gradients(f, points):
+    """Computes the gradient of f at every row of points by central differences"""
+    # the step balancing truncation and round off error of central differences
+    steps = np.finfo(float).eps ** (1 / 3) * np.maximum(1, np.abs(points))
+    gradients = np.empty_like(points)
+
+    for i in range(points.shape[1]):
+        above, below = points.copy(), points.copy()
+        above[:, i] += steps[:, i]
+        below[:, i] -= steps[:, i]
+
+        gradients[:, i] = (f(*above.T) - f(*below.T)) / (above[:, i] - below[:, i])
+
+    return gradients
+
+
+def _relative_error(a, b):
+    """The elementwise error between a and b, relative to their size once it is
+    larger than one
+    """
+    return np.abs(a - b) / np.maximum(1, np.maximum(np.abs(a), np.abs(b)))
+
+
+class GradientCheck:
+    """The result of check_gradients.
+
+    Attributes:
+        points - the points that were checked, one per row
+        gradients - dict from engine name to the gradients at every point
+        errors - dict from a pair of engine names to their relative errors
+        max_relative_error - dict from a pair of engine names to the largest
+            relative error of each input
+        skipped - boolean mask of the points where some gradient was not finite
+        failures - indices of the points where a pair of engines disagreed
+    """
+
+    def __init__(self, points, gradients, tolerance, finite_difference_tolerance):
+        self.points = points
+        self.gradients = gradients
+        self.skipped = ~np.all(
+            [np.all(np.isfinite(g), axis=1) for g in gradients.values()], axis=0
+        )
+
+        self.errors = {}
+        self.max_relative_error = {}
+        failed = np.zeros(len(points), dtype=bool)
+
+        for pair in _PAIRS:
+            errors = _relative_error(gradients[pair[0]], gradients[pair[1]])
+            errors[self.skipped] = 0
+
+            if "finite_difference" in pair:
+                limit = finite_difference_tolerance
+            else:
+                limit = tolerance
+
+            self.errors[pair] = errors
+            self.max_relative_error[pair] = errors.max(axis=0, initial=0)
+            failed |= np.any(errors > limit, axis=1)
+
+        self.failures = np.flatnonzero(failed)
+
+    @property
+    def ok(self):
+        """Whether all the engines agreed at every point that was checked"""
+        return len(self.failures) == 0
+
+    def __str__(self):
+        lines = [
+            "checked {} points, skipped {}, {} disagreements".format(
+                len(self.points), int(self.skipped.sum()), len(self.failures)
+            )
+        ]
+
+        for pair, errors in self.max_relative_error.items():
+            lines.append(
+                "max relative error {} vs {}: {}".format(
+                    pair[0], pair[1], np.array2string(errors, precision=2)
+                )
+            )
+
+        return "\n".join(lines)
+
+
+def check_gradients(f, points, tolerance=1e-8, finite_difference_tolerance=1e-5):
+    """Compares the gradients of f computed with forward mode, reverse mode and
+    central differences at every point.
+
+    Args:
+        f - a scalar function of n scalar inputs, written with operators and the
+            functions of autodiffpy.dispatch so that it works on Forward objects,
+            Reverse objects and numpy arrays
+        points - array of shape (number of points, n), or (n,) for a single point
+        tolerance - largest relative error allowed between forward and reverse mode
+        finite_difference_tolerance - largest relative error allowed between either
+            mode and central differences
+
+    Returns:
+        GradientCheck with the gradients, the errors and the points that failed
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+
+    gradients = {
+        "forward": _forward_gradients(f, points)[1],
+        "reverse": _reverse_gradients(f, points),
+        "finite_difference": _finite_difference_gradients(f, points),
+    }
+
+    return GradientCheck(points, gradients, tolerance, finite_difference_tolerance)
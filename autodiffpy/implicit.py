@@ -0,0 +1,187 @@
+"""Implements differentiation through the roots of nonlinear equations.
+
+root(f, x0, params) finds x with f(x, *params) = 0 by Newton's method on plain values,
+so none of the iterations are recorded. The derivative of the root with respect to
+the parameters follows from the implicit function theorem instead: differentiating
+f(x(p), p) = 0 gives dx/dp = -(df/dx)^-1 df/dp, which only needs the Jacobians of f
+at the solution. The cost of the derivative is therefore the same no matter how many
+Newton steps were taken.
+
+The parameters may be numbers, numpy arrays, Forward objects or Reverse objects, and
+the root is returned as the same kind of object. The Jacobians of f are computed in
+forward mode, so f must be written with operators and functions that accept Forward
+objects, such as those of the top-level autodiffpy package.
+"""
+import numpy as np
+
+from autodiffpy.forward import Forward, _coerce
+from autodiffpy.reverse import Reverse, _Op, _record
+
+
+def _jacobian(out, name, value):
+    """Returns the Jacobian of out with respect to the variable name as a matrix
+    with one row per element of out and one column per element of value.
+    """
+    grad = np.broadcast_to(
+        out.get_gradient(name), np.shape(out.value) + np.shape(value)
+    )
+    return np.reshape(grad, (np.size(out.value), np.size(value)))
+
+
+def _jacobians(f, x, params, wrt_params=True):
+    """Evaluates f at x and params in forward mode.
+
+    Args:
+        f - the function whose root is found
+        x - the point to evaluate at
+        params - the values of the parameters
+        wrt_params - whether to differentiate with respect to the params as well,
+            otherwise they are passive
+
+    Returns:
+        The value of f flattened, and the list of Jacobians of f with respect to x
+        followed by each of the params if wrt_params is true.
+    """
+    names = ["x"] + ["p{}".format(i) for i in range(len(params))]
+    active = names if wrt_params else names[:1]
+
+    with Forward.wrt(*active):
+        inputs = [Forward(name, value) for name, value in zip(names, [x] + params)]
+        out = _coerce(f(*inputs))
+
+    jacobians = [
+        _jacobian(out, name, value) for name, value in zip(active, [x] + params)
+    ]
+    return np.ravel(out.value), jacobians
+
+
+def _newton(f, x, params, tolerance, max_iterations):
+    """Finds a root of f(x, *params) by Newton's method on plain values"""
+    for _ in range(max_iterations):
+        value, (jacobian,) = _jacobians(f, x, params, wrt_params=False)
+        step = np.linalg.solve(jacobian, value)
+        x = x - np.reshape(step, np.shape(x))
+
+        if np.max(np.abs(step)) < tolerance:
+            return x
+
+    raise ValueError("Newton's method did not converge")
+
+
+def _forward_root(f, x, params, values):
+    """Creates the Forward object for a root, with the derivatives of each of the
+    Forward params pushed through the implicit function theorem.
+    """
+    _, jacobians = _jacobians(f, x, values)
+    x_jacobian = jacobians[0]
+
+    # the derivative of f along each variable, one row per element of the variable
+    tangents = {}
+    shapes = {}
+
+    for param, jacobian in zip(params, jacobians[1:]):
+        if not isinstance(param, Forward):
+            continue
+
+        for var, der in param.derivatives.items():
+            var_ndim = np.ndim(der) - np.ndim(param.value)
+            shapes[var] = np.shape(der)[:var_ndim]
+
+            tangent = np.reshape(der, (-1, np.size(param.value))) @ jacobian.T
+            tangents[var] = tangents[var] + tangent if var in tangents else tangent
+
+    derivatives = {
+        var: np.reshape(
+            -np.linalg.solve(x_jacobian, tangent.T).T, shapes[var] + np.shape(x)
+        )
+        for var, tangent in tangents.items()
+    }
+
+    return Forward._with_derivatives(x, derivatives)
+
+
+def _solver(f, x, values, tolerance, max_iterations):
+    """Creates the function of a recorded root, which returns the root x found
+    at values, and solves again from x when the graph is replayed at other
+    values. A scalar root replayed at arrays of parameters is solved at every
+    element of them.
+    """
+
+    def solve(*new_values):
+        if all(new is old for new, old in zip(new_values, values)):
+            return x
+
+        start = x
+        if np.ndim(x) == 0:
+            start = np.full(np.broadcast(*new_values).shape, x)
+
+        solved = _newton(f, start, list(new_values), tolerance, max_iterations)
+        return solved[()] if np.ndim(solved) == 0 else solved
+
+    return solve
+
+
+def _root_gradients(f):
+    """Creates the function computing the weights of the params of a root. The
+    Jacobians of f are only computed when a gradient is requested.
+    """
+
+    def vjp(values, x):
+        _, jacobians = _jacobians(f, x, values)
+        x_jacobian = jacobians[0]
+
+        def weight(jacobian, shape):
+            def gradient(g):
+                g = np.broadcast_to(g, np.shape(x))
+                adjoint = np.linalg.solve(x_jacobian.T, np.ravel(g))
+                return -np.reshape(adjoint @ jacobian, shape)
+
+            return gradient
+
+        return [
+            weight(jacobian, np.shape(value))
+            for jacobian, value in zip(jacobians[1:], values)
+        ]
+
+    return vjp
+
+
+def root(f, x0, params=(), tolerance=1e-12, max_iterations=100):
+    """Finds x such that f(x, *params) = 0 and differentiates it with respect to
+    the params without recording the Newton iterations.
+
+    Args:
+        f - the function whose root is found, taking x followed by the params and
+            returning a value of the same shape as x
+        x0 - the initial guess, a number or a vector
+        params - the parameters of f, which may be numbers, numpy arrays, Forward
+            objects or Reverse objects
+        tolerance - the size of the Newton step at which the root is accepted
+        max_iterations - the number of Newton steps after which a ValueError is
+            raised
+
+    Returns:
+        The root as a Reverse object if any of the params is a Reverse object, a
+        Forward object if any of them is a Forward object, and a plain value
+        otherwise.
+
+    Example:
+        a = Forward("a", 2.0)
+        x = root(lambda x, a: x ** 2 - a, 1.0, [a])
+        x.get_gradient("a")  # 1 / (2 * sqrt(2))
+    """
+    params = list(params)
+    values = [getattr(param, "value", param) for param in params]
+
+    x = _newton(f, np.asarray(x0, dtype=float), values, tolerance, max_iterations)
+    x = x[()] if np.ndim(x) == 0 else x
+
+    if any(isinstance(param, Reverse) for param in params):
+        solve = _solver(f, x, values, tolerance, max_iterations)
+        op = _Op("root", solve, vjp=_root_gradients(f))
+        return _record(op, *params)
+
+    if any(isinstance(param, Forward) for param in params):
+        return _forward_root(f, x, params, values)
+
+    return x
@@ -0,0 +1,123 @@
+"""Implements memoization of differentiated functions by their input point.
+
+Solvers and interactive tools often ask for the value and derivatives of a function
+at points they have already visited, for example when a line search backtracks or
+when a sensitivity is looked up again. Every such call rebuilds the Forward or
+Reverse graph from scratch. memoize wraps any function of numbers and numpy arrays,
+such as autodiffpy.reverse.value_and_grad(f), so that its results are kept in a
+least recently used cache keyed by the exact bytes of the inputs:
+
+    evaluate = memoize(value_and_grad(f), capacity=256)
+    value, gradient = evaluate(x)
+    evaluate.cache.hits, evaluate.cache.misses
+
+With a tolerance, inputs are rounded to multiples of the tolerance before they are
+looked up, so points that differ by less than the tolerance usually share an entry.
+Cached results are returned as they are, so they must not be modified in place.
+"""
+from collections import OrderedDict
+import functools
+
+import numpy as np
+
+
+class LRUCache:
+    """A cache of a bounded number of results, which evicts the least recently used
+    one when it is full.
+
+    Attributes:
+        capacity - the number of results that are kept
+        tolerance - the spacing inputs are rounded to before lookup, None to look
+            them up exactly
+        hits - the number of lookups that found a result
+        misses - the number of lookups that had to compute the result
+    """
+
+    def __init__(self, capacity=128, tolerance=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        if tolerance is not None and tolerance <= 0:
+            raise ValueError("tolerance must be positive")
+
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def key(self, args):
+        """Returns the key of a tuple of inputs. Numbers, lists and arrays are keyed
+        by their shape, type and bytes, any other input must be hashable.
+        """
+        return tuple(self._key(arg) for arg in args)
+
+    def _key(self, arg):
+        if not isinstance(arg, (int, float, complex, np.number, np.ndarray, list)):
+            return arg
+
+        value = np.asarray(arg)
+        if self.tolerance is not None and value.dtype.kind in "fc":
+            # adding zero turns -0.0 into 0.0, which has different bytes
+            value = np.round(value / self.tolerance) + 0.0
+
+        return value.shape, value.dtype.str, value.tobytes()
+
+    def get(self, args, compute):
+        """Returns the result for args, calling compute(*args) if it is not cached"""
+        key = self.key(args)
+
+        if key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+
+        self.misses += 1
+        result = compute(*args)
+
+        self._results[key] = result
+        if len(self._results) > self.capacity:
+            self._results.popitem(last=False)
+
+        return result
+
+    def clear(self):
+        """Removes every result. The statistics keep counting."""
+        self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
+
+    def __str__(self):
+        return "{} hits, {} misses, {}/{} results".format(
+            self.hits, self.misses, len(self), self.capacity
+        )
+
+
+def memoize(fun=None, capacity=128, tolerance=None):
+    """Caches the results of a function of numbers and numpy arrays by its inputs.
+
+    Can be applied directly, memoize(fun, capacity=...), or used as a decorator,
+    with or without arguments. The cache is available as the cache attribute of
+    the returned function.
+
+    Args:
+        fun - the function to memoize, which must only depend on its inputs
+        capacity - the number of results that are kept
+        tolerance - the spacing inputs are rounded to before lookup, None to look
+            them up exactly
+
+    Returns:
+        The memoized function.
+    """
+    if fun is None:
+        return functools.partial(memoize, capacity=capacity, tolerance=tolerance)
+
+    cache = LRUCache(capacity, tolerance)
+
+    @functools.wraps(fun)
+    def memoized(*args):
+        return cache.get(args, fun)
+
+    memoized.cache = cache
+    return memoized
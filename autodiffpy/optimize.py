@@ -0,0 +1,281 @@
+"""Implements gradient based minimization of scalar functions.
+
+The function to minimize takes a single array valued Reverse object, so that its
+value and full gradient come from one reverse sweep per evaluation, for example
+
+    def f(x):
+        return ad.sum((x[1:] - x[:-1] ** 2) ** 2) + ad.sum((1 - x) ** 2)
+
+The parameters are kept in numpy arrays between iterations, and functions written with
+array operations record a handful of nodes per evaluation however many parameters
+there are. Any extra args are passed to the function as constants.
+
+- gradient_descent takes steps of a fixed learning rate, with optional momentum
+- adam scales the steps by running estimates of the moments of the gradient
+- lbfgs builds a quasi-Newton direction from the last few gradients and chooses the
+  step length with line_search
+- line_search is a backtracking line search satisfying the Armijo condition
+"""
+import numpy as np
+
+from autodiffpy.reverse import value_and_grad
+
+
+class OptimizeResult:
+    """The result of a minimization.
+
+    Attributes:
+        x - the point that was found
+        value - the value of the function at x
+        gradient - the gradient of the function at x
+        iterations - the number of iterations that were taken
+        evaluations - the number of times the function and its gradient were
+            evaluated
+        converged - whether the norm of the gradient fell below the tolerance
+    """
+
+    def __init__(self, x, value, gradient, iterations, evaluations, converged):
+        self.x = x
+        self.value = value
+        self.gradient = gradient
+        self.iterations = iterations
+        self.evaluations = evaluations
+        self.converged = converged
+
+    def __str__(self):
+        return "{} after {} iterations: value {}, gradient norm {}".format(
+            "converged" if self.converged else "not converged",
+            self.iterations,
+            self.value,
+            np.linalg.norm(self.gradient),
+        )
+
+
+class _Counted:
+    """Counts the evaluations of the value and gradient of a function"""
+
+    def __init__(self, f, args):
+        self.evaluate = value_and_grad(f)
+        self.args = args
+        self.evaluations = 0
+
+    def __call__(self, x):
+        self.evaluations += 1
+        return self.evaluate(x, *self.args)
+
+
+def line_search(
+    evaluate, x, direction, value, gradient, step=1.0, shrink=0.5, c=1e-4, max_steps=50
+):
+    """Backtracks along direction until the value has decreased enough.
+
+    The step is shrunk until value(x + step * direction) <= value + c * step *
+    gradient . direction (the Armijo condition). Since every evaluation also
+    returns the gradient, the gradient at the accepted point is returned for the
+    next iteration rather than computed again.
+
+    Args:
+        evaluate - function returning the value and gradient at a point, such as
+            autodiffpy.reverse.value_and_grad(f)
+        x - the current point
+        direction - the descent direction
+        value - the value at x
+        gradient - the gradient at x
+        step - the first step length to try
+        shrink - the factor by which the step is shrunk
+        c - the fraction of the decrease predicted by the gradient to require
+        max_steps - the number of steps to try
+
+    Returns:
+        The accepted step length, the new point and its value and gradient. The
+        step length is 0 if no step decreased the value enough.
+    """
+    slope = np.sum(gradient * direction)
+
+    for _ in range(max_steps):
+        new_x = x + step * direction
+        new_value, new_gradient = evaluate(new_x)
+
+        if new_value <= value + c * step * slope:
+            return step, new_x, new_value, new_gradient
+
+        step *= shrink
+
+    return 0.0, x, value, gradient
+
+
+def gradient_descent(
+    f,
+    x0,
+    args=(),
+    learning_rate=0.01,
+    momentum=0.0,
+    tolerance=1e-8,
+    max_iterations=10000,
+):
+    """Minimizes f by gradient descent, optionally with momentum.
+
+    Args:
+        f - scalar function of a Reverse object
+        x0 - the starting point
+        args - constant arguments passed to f after the point
+        learning_rate - the step size
+        momentum - the fraction of the previous step added to the next one
+        tolerance - the norm of the gradient at which to stop
+        max_iterations - the number of steps after which to stop
+
+    Returns:
+        OptimizeResult
+    """
+    evaluate = _Counted(f, args)
+    x = np.array(x0, dtype=float)
+    velocity = np.zeros_like(x)
+    value, gradient = evaluate(x)
+
+    for iteration in range(max_iterations):
+        if np.linalg.norm(gradient) < tolerance:
+            return OptimizeResult(
+                x, value, gradient, iteration, evaluate.evaluations, True
+            )
+
+        velocity = momentum * velocity - learning_rate * gradient
+        x = x + velocity
+        value, gradient = evaluate(x)
+
+    converged = np.linalg.norm(gradient) < tolerance
+    return OptimizeResult(
+        x, value, gradient, max_iterations, evaluate.evaluations, converged
+    )
+
+
+def adam(
+    f,
+    x0,
+    args=(),
+    learning_rate=0.001,
+    beta1=0.9,
+    beta2=0.999,
+    epsilon=1e-8,
+    tolerance=1e-8,
+    max_iterations=10000,
+):
+    """Minimizes f with Adam, which scales each step by running averages of the
+    gradient and of its square.
+
+    Args:
+        f - scalar function of a Reverse object
+        x0 - the starting point
+        args - constant arguments passed to f after the point
+        learning_rate - the step size
+        beta1 - the decay rate of the average of the gradient
+        beta2 - the decay rate of the average of the squared gradient
+        epsilon - added to the denominator of the step to avoid division by zero
+        tolerance - the norm of the gradient at which to stop
+        max_iterations - the number of steps after which to stop
+
+    Returns:
+        OptimizeResult
+    """
+    evaluate = _Counted(f, args)
+    x = np.array(x0, dtype=float)
+    first = np.zeros_like(x)
+    second = np.zeros_like(x)
+    value, gradient = evaluate(x)
+
+    for iteration in range(max_iterations):
+        if np.linalg.norm(gradient) < tolerance:
+            return OptimizeResult(
+                x, value, gradient, iteration, evaluate.evaluations, True
+            )
+
+        first = beta1 * first + (1 - beta1) * gradient
+        second = beta2 * second + (1 - beta2) * gradient ** 2
+
+        # correct the bias of the averages towards their zero initialization
+        first_hat = first / (1 - beta1 ** (iteration + 1))
+        second_hat = second / (1 - beta2 ** (iteration + 1))
+
+        x = x - learning_rate * first_hat / (np.sqrt(second_hat) + epsilon)
+        value, gradient = evaluate(x)
+
+    converged = np.linalg.norm(gradient) < tolerance
+    return OptimizeResult(
+        x, value, gradient, max_iterations, evaluate.evaluations, converged
+    )
+
+
+def _lbfgs_direction(gradient, history):
+    """Computes the L-BFGS search direction with the two loop recursion over the
+    stored pairs of steps and gradient changes.
+    """
+    q = gradient.copy()
+    alphas = []
+
+    for s, y, rho in reversed(history):
+        alpha = rho * np.sum(s * q)
+        q = q - alpha * y
+        alphas.append(alpha)
+
+    if history:
+        s, y, _ = history[-1]
+        q = q * np.sum(s * y) / np.sum(y * y)
+
+    for (s, y, rho), alpha in zip(history, reversed(alphas)):
+        beta = rho * np.sum(y * q)
+        q = q + (alpha - beta) * s
+
+    return -q
+
+
+def lbfgs(f, x0, args=(), memory=10, tolerance=1e-8, max_iterations=1000):
+    """Minimizes f with the limited memory BFGS method.
+
+    Args:
+        f - scalar function of a Reverse object
+        x0 - the starting point
+        args - constant arguments passed to f after the point
+        memory - the number of previous steps used to approximate the Hessian
+        tolerance - the norm of the gradient at which to stop
+        max_iterations - the number of iterations after which to stop
+
+    Returns:
+        OptimizeResult
+    """
+    evaluate = _Counted(f, args)
+    x = np.array(x0, dtype=float)
+    value, gradient = evaluate(x)
+    history = []
+
+    for iteration in range(max_iterations):
+        if np.linalg.norm(gradient) < tolerance:
+            return OptimizeResult(
+                x, value, gradient, iteration, evaluate.evaluations, True
+            )
+
+        direction = _lbfgs_direction(gradient, history)
+
+        # fall back to steepest descent if the direction does not descend
+        if np.sum(direction * gradient) >= 0:
+            history = []
+            direction = -gradient
+
+        step, new_x, value, new_gradient = line_search(
+            evaluate, x, direction, value, gradient
+        )
+        if step == 0:
+            break
+
+        s, y = new_x - x, new_gradient - gradient
+        x, gradient = new_x, new_gradient
+
+        # only keep pairs that keep the approximate Hessian positive definite
+        if np.sum(s * y) > 1e-12:
+            history.append((s, y, 1 / np.sum(s * y)))
+            history = history[-memory:]
+    else:
+        iteration = max_iterations
+
+    converged = np.linalg.norm(gradient) < tolerance
+    return OptimizeResult(
+        x, value, gradient, iteration, evaluate.evaluations, converged
+    )
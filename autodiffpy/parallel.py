@@ -0,0 +1,250 @@
+"""Evaluates and differentiates recorded reverse mode graphs on a thread pool.
+
+A graph recorded by Reverse objects can be replayed at new input values, since every
+node keeps its operation and arguments. Nodes whose arguments are all computed can
+run at the same time, so ParallelGraph sorts the nodes into levels, or wavefronts:
+the level of a node is one more than the highest level of its arguments. All nodes of
+a level are independent, such as the separate outputs of an rVector or the sibling
+terms of a large sum, and in the backward sweep the same levels are visited in
+reverse order.
+
+Threads only pay off for array valued nodes, since numpy releases the GIL during
+large array operations while scalar nodes are pure Python overhead. The cost of a
+node is estimated as the number of elements it reads and writes. Within a level the
+nodes are grouped into chunks of at least min_cost elements, and a level that makes
+a single chunk runs on the calling thread, so graphs of small nodes are evaluated
+exactly as serially as before.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from autodiffpy.reverse import (
+    Reverse,
+    _apply_weight,
+    _as_value,
+    _live,
+    _ones,
+    _topological_order,
+    _unbroadcast,
+    _zeros,
+)
+
+
+def _cost(node):
+    """The number of elements node reads and writes"""
+    inputs = sum(np.size(parent.value) for _, parent in node.parents)
+    return np.size(node.value) + inputs
+
+
+def _chunks(nodes, min_cost):
+    """Splits nodes into chunks of at least min_cost, merging a small remainder
+    into the last chunk.
+    """
+    chunks, current, total = [], [], 0
+
+    for node in nodes:
+        current.append(node)
+        total += _cost(node)
+        if total >= min_cost:
+            chunks.append(current)
+            current, total = [], 0
+
+    if current:
+        if chunks:
+            chunks[-1].extend(current)
+        else:
+            chunks.append(current)
+
+    return chunks
+
+
+class ParallelGraph:
+    """A recorded graph which is evaluated and differentiated one level at a time,
+    with the independent nodes of each level spread over a thread pool.
+
+    Attributes:
+        outputs - the output nodes
+        inputs - the input nodes whose values can be replaced
+        levels - the nodes of every level, the inputs and other leaves first
+        min_cost - the smallest number of elements worth a task on the pool
+        tasks - the number of chunks that were run on the pool
+    """
+
+    def __init__(self, outputs, inputs, workers=None, min_cost=100000):
+        """Compiles the graph between inputs and outputs.
+
+        Args:
+            outputs - a Reverse object or a list of them
+            inputs - the Reverse objects whose values are passed to evaluate
+            workers - the number of threads, by default one per processor
+            min_cost - the number of elements below which nodes are run together
+                on a single thread
+        """
+        self._single = isinstance(outputs, Reverse)
+        self.outputs = [outputs] if self._single else list(outputs)
+        self.inputs = list(inputs)
+        self.min_cost = min_cost
+        self.tasks = 0
+        self._workers = workers
+        self._pool = None
+
+        order, seen = [], set()
+        for output in self.outputs:
+            for node in _topological_order(output):
+                if id(node) not in seen:
+                    seen.add(id(node))
+                    order.append(node)
+
+        level = {}
+        for node in order:
+            level[id(node)] = 1 + max(
+                (level[id(parent)] for _, parent in node.parents), default=-1
+            )
+
+        self.levels = [[] for _ in range(1 + max(level.values()))]
+        for node in order:
+            self.levels[level[id(node)]].append(node)
+
+        # the nodes whose gradients depend on an input
+        self._live = _live(order, self.inputs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts the thread pool down"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _run(self, function, nodes):
+        """Applies function to every node, in chunks on the pool if the nodes
+        cost enough, and returns the results in order.
+        """
+        chunks = _chunks(nodes, self.min_cost)
+        if len(chunks) == 1:
+            return [function(node) for node in nodes]
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self._workers)
+
+        self.tasks += len(chunks)
+        futures = [
+            self._pool.submit(lambda chunk: [function(n) for n in chunk], chunk)
+            for chunk in chunks
+        ]
+        return [result for future in futures for result in future.result()]
+
+    def _forward(self, values):
+        """Computes the value of every node, from the values of the inputs"""
+        if len(values) != len(self.inputs):
+            raise ValueError("expected {} input values".format(len(self.inputs)))
+
+        computed = {id(x): _as_value(v) for x, v in zip(self.inputs, values)}
+
+        def arguments(node):
+            return [
+                computed[id(arg)] if isinstance(arg, Reverse) else arg
+                for arg in node.args
+            ]
+
+        def evaluate(node):
+            return node.op.fun(*arguments(node), **node.kwargs)
+
+        # leaves other than the inputs keep their recorded values
+        for node in self.levels[0]:
+            computed.setdefault(id(node), node.value)
+
+        for nodes in self.levels[1:]:
+            nodes = [node for node in nodes if id(node) not in computed]
+            for node, value in zip(nodes, self._run(evaluate, nodes)):
+                computed[id(node)] = value
+
+        return computed, arguments
+
+    def evaluate(self, *values):
+        """Evaluates the outputs with the inputs set to values, which default to
+        the recorded values of the inputs. The recorded graph is not modified.
+
+        Returns:
+            The value of the output, or a list with the value of every output.
+        """
+        values = values or [x.value for x in self.inputs]
+        computed, _ = self._forward(values)
+        result = [computed[id(output)] for output in self.outputs]
+
+        return result[0] if self._single else result
+
+    def value_and_gradients(self, *values, seeds=None):
+        """Evaluates the outputs and the gradient of the seeded sum of the outputs
+        with respect to every input, with the inputs set to values.
+
+        Args:
+            values - the values of the inputs, by default their recorded values
+            seeds - the gradient of each output, by default ones
+
+        Returns:
+            The value (or list of values) of the outputs, and the list of the
+            gradients with respect to each input.
+        """
+        values = values or [x.value for x in self.inputs]
+        computed, arguments = self._forward(values)
+
+        if seeds is None:
+            seeds = [_ones(computed[id(output)]) for output in self.outputs]
+        elif self._single:
+            seeds = [seeds]
+
+        adjoints = {}
+        for output, seed in zip(self.outputs, seeds):
+            if id(output) in adjoints:
+                seed = adjoints[id(output)] + seed
+            adjoints[id(output)] = seed
+
+        def propagate(node):
+            gradient = adjoints[id(node)]
+            args = arguments(node)
+            out = computed[id(node)]
+
+            if node.op.rules is not None:
+                weights = {
+                    index: node.op.rules[index](*args, out) for index, _ in node.parents
+                }
+            else:
+                weights = dict(enumerate(node.op.vjp(args, out, **node.kwargs)))
+
+            return [
+                (
+                    parent,
+                    _unbroadcast(
+                        _apply_weight(weights[index], gradient),
+                        np.shape(computed[id(parent)]),
+                    ),
+                )
+                for index, parent in node.parents
+                if id(parent) in self._live
+            ]
+
+        for nodes in reversed(self.levels):
+            pending = [
+                node
+                for node in nodes
+                if node.op is not None
+                and id(node) in self._live
+                and id(node) in adjoints
+            ]
+
+            for contributions in self._run(propagate, pending):
+                for parent, contribution in contributions:
+                    if id(parent) in adjoints:
+                        contribution = adjoints[id(parent)] + contribution
+                    adjoints[id(parent)] = contribution
+
+        result = [computed[id(output)] for output in self.outputs]
+        grads = [adjoints.get(id(x), _zeros(computed[id(x)])) for x in self.inputs]
+
+        return (result[0] if self._single else result), grads
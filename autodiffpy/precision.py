@@ -0,0 +1,160 @@
+"""Sets the floating point precision of values, derivatives and gradients.
+
+By default every value is a float64 (or complex128) array. For large batched and
+array valued computations, half of that memory traffic can be saved by working in
+float32 instead: with the precision set to float32, the inputs of Forward and Reverse
+objects are stored as float32 (or complex64), and so are the derivatives that seed
+forward mode and the adjoints of the reverse sweep. numpy keeps float32 operands in
+float32, so the whole computation stays in the working precision.
+
+The precision is set for the whole program with set_precision, or for a block of
+code in the current thread with the precision context manager (or a Tape created
+with a dtype), which takes precedence over the global setting.
+
+Sums of many terms lose accuracy in float32, since every addition rounds to 24 bits.
+Reductions such as sum and mean are therefore accumulated in float64 and rounded to
+the working precision once. Totals that are kept over many evaluations, such as those
+of GradientAccumulator and ShardedGradient, stay in float64 altogether.
+"""
+from contextlib import contextmanager
+import threading
+
+import numpy as np
+
+_PRECISIONS = (np.dtype(np.float32), np.dtype(np.float64))
+_ARRAYS = (np.ndarray, np.generic)
+
+_DEFAULT = np.dtype(np.float64)
+
+
+class _Local(threading.local):
+    """The stack of precision blocks of a thread"""
+
+    # a class attribute, so that threads without blocks do not pay for the
+    # AttributeError of a missing attribute
+    stack = None
+
+
+_LOCAL = _Local()
+
+
+def _check(dtype):
+    """Returns dtype as a numpy dtype, if it is a supported precision"""
+    try:
+        dtype = np.dtype(dtype)
+    except TypeError:
+        raise ValueError("Unknown precision {}".format(dtype))
+
+    if dtype not in _PRECISIONS:
+        raise ValueError("The precision must be float32 or float64, not " + str(dtype))
+
+    return dtype
+
+
+def get_precision():
+    """Returns the floating point type of the current thread.
+
+    Returns:
+        The dtype of the innermost precision block of the thread, or else the
+        dtype given to set_precision, float64 by default.
+    """
+    stack = _LOCAL.stack
+    return stack[-1] if stack else _DEFAULT
+
+
+def set_precision(dtype):
+    """Sets the floating point type of all threads outside of precision blocks.
+
+    Args:
+        dtype - np.float32 or np.float64, or their names
+    """
+    global _DEFAULT
+    _DEFAULT = _check(dtype)
+
+
+@contextmanager
+def precision(dtype):
+    """Sets the floating point type of the current thread within a with block.
+
+    Example:
+        with ad.precision(np.float32):
+            x = Reverse(np.random.randn(10000))
+            loss = ad.sum(ad.tanh(x) ** 2)
+    """
+    dtype = _check(dtype)
+
+    if _LOCAL.stack is None:
+        _LOCAL.stack = []
+    _LOCAL.stack.append(dtype)
+
+    try:
+        yield dtype
+    finally:
+        _LOCAL.stack.pop()
+
+
+def _complex(dtype):
+    """Returns the complex type with the precision of dtype"""
+    return np.result_type(dtype, np.complex64)
+
+
+def _round(value):
+    """Rounds floating point arrays and numpy scalars of a higher precision than
+    the working precision down to it, and leaves anything else alone.
+    """
+    if not isinstance(value, _ARRAYS):
+        return value
+
+    dtype = get_precision()
+    kind = value.dtype.kind
+
+    if kind == "f" and value.dtype.itemsize > dtype.itemsize:
+        return value.astype(dtype)
+
+    if kind == "c" and value.dtype.itemsize > 2 * dtype.itemsize:
+        return value.astype(_complex(dtype))
+
+    return value
+
+
+def _as_float(value):
+    """Converts integer arrays to the working precision, and rounds arrays of a
+    higher precision down to it. Python numbers are converted to numpy scalars of
+    the working precision below float64, which they already have otherwise.
+    """
+    if isinstance(value, (float, int, complex)):
+        dtype = get_precision()
+        if dtype.itemsize == 8 or isinstance(value, bool):
+            return value
+        if isinstance(value, complex):
+            return _complex(dtype).type(value)
+        return dtype.type(value)
+
+    if isinstance(value, np.ndarray) and value.dtype.kind in "biu":
+        return value.astype(get_precision())
+
+    return _round(value)
+
+
+def _accumulator(dtype):
+    """Returns the type that values of dtype are summed in"""
+    dtype = np.dtype(dtype)
+
+    if dtype.kind == "f":
+        return np.result_type(dtype, np.float64)
+    if dtype.kind == "c":
+        return np.result_type(dtype, np.complex128)
+    return dtype
+
+
+def _accumulate(reduction, values, **kwargs):
+    """Applies a numpy reduction such as np.sum in the accumulator type of the
+    values, and rounds the result to their type once.
+    """
+    values = np.asarray(values)
+
+    if values.dtype.kind not in "fc":
+        return reduction(values, **kwargs)
+
+    result = reduction(values, dtype=_accumulator(values.dtype), **kwargs)
+    return result.astype(values.dtype)
@@ -0,0 +1,109 @@
+"""Implements the registration of user defined primitive functions.
+
+A function written with plain numpy, or one that calls into compiled code, can be
+turned into a single node of both the forward and the reverse mode by supplying its
+derivative rules:
+
+    @primitive(jvp=[lambda t, out, x: t * np.cos(x)],
+               vjp=[lambda g, out, x: g * np.cos(x)])
+    def fast_sin(x):
+        return np.sin(x)
+
+The function itself is always called with plain values, once per evaluation, so it
+keeps its native speed. The rules are the same as the built-in ones: a jvp rule maps
+the derivative of an argument onto the derivative of the result, and a vjp rule maps
+the gradient of the result onto the gradient of an argument.
+"""
+import functools
+
+from autodiffpy.forward import Forward, _linear
+from autodiffpy.reverse import Reverse, _Op, _record
+
+
+def _rules(rules):
+    """Accepts a single rule for functions of one argument"""
+    if rules is None:
+        return ()
+
+    return tuple(rules) if isinstance(rules, (list, tuple)) else (rules,)
+
+
+def _rule(rules, index, name):
+    """Returns the rule for the argument at index, which must exist"""
+    if index >= len(rules) or rules[index] is None:
+        raise ValueError(
+            "{} has no derivative rule for argument {}".format(name, index)
+        )
+
+    return rules[index]
+
+
+def primitive(jvp=None, vjp=None):
+    """Decorates a function of numbers and numpy arrays so that it also accepts
+    Forward and Reverse objects, as a single node with the given derivative rules.
+
+    Args:
+        jvp - one function per positional argument, jvp[i](tangent, out, *args,
+            **kwargs), which returns the derivative of the result along the
+            derivative tangent of argument i. The tangent has the shape of the
+            argument with the axes of the variable in front, so the rule must
+            broadcast over leading axes, as elementwise products and np.matmul do.
+            Needed to call the function with Forward objects.
+        vjp - one function per positional argument, vjp[i](gradient, out, *args,
+            **kwargs), which returns the contribution of the gradient of the result
+            to the gradient of argument i, with the shape of the argument. Needed to
+            call the function with Reverse objects.
+
+        args are the plain values of the arguments and out is the value of the
+        result. A single function may be given instead of a list for functions of
+        one argument, and None for arguments that are never differentiated. Keyword
+        arguments are passed through as constants.
+
+    Returns:
+        The decorator.
+    """
+    jvp = _rules(jvp)
+    vjp = _rules(vjp)
+
+    def decorate(fun):
+        name = fun.__name__
+
+        def weights(values, out, **kwargs):
+            # arguments without a rule are constants, whose weight is never used
+            return [
+                functools.partial(
+                    lambda g, rule: rule(g, out, *values, **kwargs), rule=rule
+                )
+                for rule in vjp + (None,) * (len(values) - len(vjp))
+            ]
+
+        op = _Op(name, fun, vjp=weights)
+
+        @functools.wraps(fun)
+        def wrapped(*args, **kwargs):
+            if any(isinstance(arg, Forward) for arg in args):
+                values = [getattr(arg, "value", arg) for arg in args]
+                out = fun(*values, **kwargs)
+
+                rules = [
+                    (
+                        arg,
+                        functools.partial(
+                            lambda t, rule: rule(t, out, *values, **kwargs),
+                            rule=_rule(jvp, index, name),
+                        ),
+                    )
+                    for index, arg in enumerate(args)
+                    if isinstance(arg, Forward)
+                ]
+                return _linear(out, rules)
+
+            for index, arg in enumerate(args):
+                if isinstance(arg, Reverse):
+                    _rule(vjp, index, name)
+
+            return _record(op, *args, **kwargs)
+
+        return wrapped
+
+    return decorate
@@ -4,19 +4,675 @@ The main object of interest is the Reverse class which allows users to define
 inputs to be differentiated. The Reverse objects can be combined together
 using standard Python mathematical operators and the defined elementary
 functions within this file as well.
+
+Gradients can be computed from several threads at once, as long as each
+thread builds its own graph. Parameters that are shared between the threads
+should be created with Reverse.parameter: their values are read-only and they
+keep no list of children, so using them never modifies them. The gradients
+with respect to them come from gradients(), or from backward() within a Tape,
+which keeps the gradients of the current thread apart from those of the others.
 """
-import math
+from contextlib import contextmanager
+import operator
+import threading
+import weakref
+
 import numpy as np
 
+from autodiffpy._kernels import (
+    _exclusive_products,
+    _logistic,
+    _shift,
+    _softplus,
+    _tie_weights,
+)
+from autodiffpy.precision import (
+    _ARRAYS,
+    _accumulate,
+    _as_float,
+    _round,
+    get_precision,
+    precision,
+)
+
+
+def _as_value(val):
+    """Converts list and integer array inputs into float arrays so that
+    elementwise operations such as negative powers are well defined. Arrays
+    are kept in the working precision, see autodiffpy.precision.
+    """
+    if isinstance(val, (list, tuple)):
+        val = np.asarray(val)
+
+    return _as_float(val)
+
+
+def _apply_weight(weight, gradient):
+    """Applies the weight of an edge in the computation graph to the gradient
+    of the child node.
+
+    Most weights are the local partial derivative and are simply multiplied
+    with the gradient. Operations which are not elementwise (reductions,
+    indexing, dot products) store a function which maps the gradient of the
+    child onto the contribution for the parent.
+    """
+    if callable(weight):
+        return weight(gradient)
+
+    return weight * gradient
+
+
+def _unbroadcast(gradient, shape):
+    """Sums a gradient over the axes along which a value of the given shape
+    was broadcast, so that the result has the shape of the original value.
+    """
+    if np.shape(gradient) == shape:
+        return gradient
+
+    gradient = np.asarray(gradient)
+
+    # sum out the leading axes added by broadcasting
+    while gradient.ndim > len(shape):
+        gradient = gradient.sum(axis=0)
+
+    # sum the axes that were stretched from length one
+    for axis, size in enumerate(shape):
+        if size == 1 and gradient.shape[axis] != 1:
+            gradient = gradient.sum(axis=axis, keepdims=True)
+
+    return gradient if shape else gradient[()]
+
+
+def _expand_reduced(gradient, shape, axis):
+    """Broadcasts the gradient of a reduction along axis back to the shape of
+    the value that was reduced.
+    """
+    kept = list(shape)
+    axes = range(len(shape)) if axis is None else np.atleast_1d(axis)
+
+    for a in axes:
+        kept[a] = 1
+
+    return np.broadcast_to(np.reshape(gradient, kept), shape)
+
+
+class _Op:
+    """An operation that can be recorded in the computation graph.
+
+    Recording an operation only stores references to its arguments. The
+    partial derivatives are computed from the values of the arguments and the
+    result when a gradient is first requested, so building a graph that is
+    never differentiated only costs the values and one node per operation.
+
+    Attributes:
+        name {str} -- name of the operation
+        fun {callable} -- computes the value from the values of the arguments
+        rules {tuple} -- for elementwise operations, one function per argument
+            computing its partial derivative as rule(*values, out). Rules also
+            work on stacked values, so the partials of many nodes with the
+            same operation can be computed together.
+        vjp {callable} -- for other operations, computes the weights of all
+            the arguments at once as vjp(values, out, **kwargs)
+    """
+
+    __slots__ = ("name", "fun", "rules", "vjp")
+
+    def __init__(self, name, fun, rules=None, vjp=None):
+        self.name = name
+        self.fun = fun
+        self.rules = rules
+        self.vjp = vjp
+
+    def __repr__(self):
+        return "_Op({})".format(self.name)
+
+
+_new = object.__new__
+_ref = weakref.ref
+_NO_KWARGS = {}
+
+
+def _node(op, value, args, kwargs, parents):
+    """Creates the node of a recorded operation and links it to its parents,
+    the Reverse objects among args. The node is created without going through
+    Reverse.__init__, since its value is already computed.
+    """
+    z = _new(Reverse)
+    z.value = value
+    z._children = ()
+    z.op = op
+    z.args = args
+    z.kwargs = kwargs
+    z._partials = None
+    z._gradient = None
+    z.shared = False
+
+    # the edges to children are weak, so that a graph is freed as soon as its
+    # output is discarded rather than by the cyclic garbage collector, and the
+    # parents each keep a single reference to z which children resolves
+    edge = _ref(z)
+    for arg in parents:
+        if arg.shared:
+            continue
+        children = arg._children
+        if not children:
+            arg._children = [edge]
+        elif children[-1] is not edge:
+            children.append(edge)
+
+    created = _LOCAL.created
+    if created is not None:
+        created.add(id(z))
+
+    return z
+
+
+def _record(op, *args, **kwargs):
+    """Applies op to args. If any of the args is a Reverse object, the result
+    is a new node which is appended to the children of each of them.
+
+    Arguments:
+        op {_Op} -- operation to apply
+        args -- Reverse objects and constants the operation is applied to
+        kwargs -- constant keyword arguments of the operation
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if an arg is a Reverse object.
+    """
+    # the elementary functions have a single argument
+    if len(args) == 1:
+        x = args[0]
+        if isinstance(x, Reverse):
+            return _node(op, op.fun(x.value, **kwargs), args, kwargs, args)
+        return op.fun(x, **kwargs)
+
+    values, parents = [], []
+    for index, arg in enumerate(args):
+        if isinstance(arg, Reverse):
+            values.append(arg.value)
+            parents.append(arg)
+            continue
+
+        # constant arrays must not widen the result beyond the working precision
+        if isinstance(arg, _ARRAYS):
+            rounded = _round(arg)
+            if rounded is not arg:
+                args = args[:index] + (rounded,) + args[index + 1 :]
+                arg = rounded
+
+        values.append(arg)
+
+    value = op.fun(*values, **kwargs)
+    if not parents:
+        return value
+
+    return _node(op, value, args, kwargs, parents)
+
+
+def _binary(op, x, y):
+    """Records op applied to a Reverse object x and y, the common case of the
+    operators, without the argument scan of _record.
+    """
+    if isinstance(y, Reverse):
+        args = (x, y)
+        return _node(op, op.fun(x.value, y.value), args, _NO_KWARGS, args)
+
+    if isinstance(y, _ARRAYS):
+        y = _round(y)
+
+    return _node(op, op.fun(x.value, y), (x, y), _NO_KWARGS, (x,))
+
+
+def _precompute_partials(nodes):
+    """Computes the partial derivatives of scalar valued nodes which apply the
+    same elementwise operation together, with one numpy call per operation
+    and argument rather than one call per node.
+    """
+    groups = {}
+    for node in nodes:
+        if (
+            node._partials is None
+            and node.op is not None
+            and node.op.rules is not None
+            and np.ndim(node.value) == 0
+        ):
+            groups.setdefault(node.op, []).append(node)
+
+    for op, group in groups.items():
+        if len(group) < 2:
+            continue
+
+        values = [
+            _as_float(np.array(column))
+            for column in zip(*(_values(n.args) for n in group))
+        ]
+        out = _as_float(np.array([node.value for node in group]))
+
+        for node in group:
+            node._partials = {}
+
+        for index, rule in enumerate(op.rules):
+            members = [
+                k
+                for k, node in enumerate(group)
+                if isinstance(node.args[index], Reverse)
+            ]
+            if not members:
+                continue
+
+            partial = rule(*(column[members] for column in values), out[members])
+            # constant partials such as 1 would otherwise become int64 arrays,
+            # which widen float32 gradients to float64
+            partials = np.broadcast_to(
+                np.asarray(partial, dtype=np.result_type(partial, out)),
+                (len(members),),
+            )
+            for k, partial in zip(members, partials):
+                group[k]._partials[index] = partial
+
+
+def _topological_order(output):
+    """Returns output and all of its ancestors, each one after all of its
+    parents. The graph is walked with an explicit stack so that deep graphs
+    do not hit the recursion limit.
+    """
+    order = []
+    visited = {id(output)}
+    stack = [(output, iter(output.parents))]
+
+    while stack:
+        node, parents = stack[-1]
+
+        for _, parent in parents:
+            if id(parent) not in visited:
+                visited.add(id(parent))
+                stack.append((parent, iter(parent.parents)))
+                break
+        else:
+            stack.pop()
+            order.append(node)
+
+    return order
+
+
+def _live(order, inputs):
+    """Returns the ids of inputs and of the nodes of order, which is
+    topological, that lie on a path from one of the inputs.
+    """
+    live = {id(x) for x in inputs}
+    for node in order:
+        if any(id(parent) in live for _, parent in node.parents):
+            live.add(id(node))
+
+    return live
+
+
+def _adjoints(output, seed=None, inputs=None):
+    """Propagates the seed of output backwards through its ancestors.
+
+    If inputs are given, only the nodes on a path from one of the inputs to
+    output are propagated through.
+
+    Returns:
+        list, dict -- the nodes that were visited in topological order, and
+            the gradient of output with respect to the ones it reached by id
+    """
+    order = _topological_order(output)
+
+    if inputs is not None:
+        live = _live(order, inputs)
+        order = [node for node in order if id(node) in live]
+    else:
+        live = {id(node) for node in order}
+
+    adjoints = {id(output): _ones(output.value) if seed is None else seed}
+    _sweep(order, adjoints, live)
+
+    return order, adjoints
+
+
+def _sweep(order, adjoints, live):
+    """Propagates the adjoints of the nodes of order, which is topological, to
+    their parents in live, visiting the nodes in reverse order. The adjoints
+    are accumulated in place.
+    """
+    _precompute_partials(order)
+
+    for node in reversed(order):
+        gradient = adjoints.get(id(node))
+        if gradient is None:
+            continue
+
+        for index, parent in node.parents:
+            key = id(parent)
+            if key not in live:
+                continue
+
+            contribution = _apply_weight(node._partial(index), gradient)
+            # scalar graphs skip the shape checks of _unbroadcast
+            if isinstance(contribution, np.ndarray) or isinstance(
+                parent.value, np.ndarray
+            ):
+                contribution = _unbroadcast(contribution, np.shape(parent.value))
+
+            previous = adjoints.get(key)
+            if previous is not None:
+                contribution = previous + contribution
+            adjoints[key] = contribution
+
+
+def _seeds():
+    """Returns the nodes of the current thread whose gradient_value was set
+    from outside or by backward(), by id
+    """
+    seeds = _LOCAL.seeds
+    if seeds is None:
+        seeds = _LOCAL.seeds = weakref.WeakValueDictionary()
+    return seeds
+
+
+def _seeded(seeds):
+    """Returns the seeds and their ancestors in topological order, together
+    with the ids of the seeds and of the other nodes whose gradient is
+    already known. The nodes past a known one are still walked, since
+    backward(inputs=...) leaves the gradient of some of their ancestors
+    unset. The graph is walked with an explicit stack.
+    """
+    roots = {id(seed) for seed in seeds}
+    order, visited, known = [], set(), set(roots)
+
+    for seed in seeds:
+        if id(seed) in visited:
+            continue
+        visited.add(id(seed))
+        stack = [(seed, iter(seed.parents))]
+
+        while stack:
+            node, parents = stack[-1]
+
+            for _, parent in parents:
+                if id(parent) in visited:
+                    continue
+                visited.add(id(parent))
+
+                if parent._gradient is not None:
+                    known.add(id(parent))
+                stack.append((parent, iter(parent.parents)))
+                break
+            else:
+                stack.pop()
+                order.append(node)
+
+    return order, known
+
+
+def _zeros(value):
+    """Returns the zero gradient for a value"""
+    return np.zeros(np.shape(value), dtype=get_precision()) if np.ndim(value) else 0
+
+
+def _ones(value):
+    """Returns the seed gradient for a value, in the working precision"""
+    return np.ones(np.shape(value), dtype=get_precision())[()]
+
+
+def gradients(output, inputs, seed=None):
+    """Computes the gradient of output with respect to each of the inputs.
+
+    Only nodes that are on a path from one of the inputs to output are
+    visited, and the gradients are kept separately from the graph so no
+    gradient_value is changed.
+
+    Arguments:
+        output {Reverse} -- the node to differentiate
+        inputs {[Reverse]} -- the nodes to differentiate with respect to
+        seed (default: 1) {Float, np.ndarray} -- gradient of output
+
+    Returns:
+        list -- gradient of output with respect to each input
+    """
+    _, adjoints = _adjoints(output, seed, inputs)
+
+    return [adjoints.get(id(x), _zeros(x.value)) for x in inputs]
+
+
+def value_and_grad(f):
+    """Creates a function which evaluates f and its gradient together, with a
+    single reverse sweep.
+
+    The point is a single array valued Reverse object, so the graph of a
+    function written with array operations has a handful of nodes however
+    many parameters there are.
+
+    Arguments:
+        f {callable} -- scalar function of a Reverse object, followed by any
+            constant arguments
+
+    Returns:
+        callable -- maps a point x (and the constant arguments) to the value
+            of f and the gradient of f, which has the shape of x
+    """
+
+    def evaluate(x, *args):
+        x = Reverse(np.array(x, dtype=get_precision()))
+        out = f(x, *args)
+
+        if not isinstance(out, Reverse):
+            return out, np.zeros(np.shape(x.value), dtype=get_precision())
+
+        return out.value, np.asarray(gradients(out, [x])[0], dtype=x.value.dtype)
+
+    return evaluate
+
+
+def per_example_grad(f):
+    """Creates a function which evaluates the losses of a batch of examples
+    and the gradient of each loss separately, with a single reverse sweep.
+
+    f is called with one copy of the parameters per example, stacked along a
+    leading batch axis, and must return one loss per example that depends
+    only on its own row of the parameters, for example
+    sum(params * examples, axis=1). The gradient with respect to the stacked
+    copies then holds the gradient of every example's loss in its row.
+
+    Arguments:
+        f {callable} -- function of a Reverse object with the batch axis
+            followed by the axes of the parameters, an array of examples
+            along its first axis, and any constant arguments, returning an
+            array of losses
+
+    Returns:
+        callable -- maps the parameters x, the batch (and the constant
+            arguments) to the losses and the per-example gradients, an
+            array with the batch axis followed by the axes of x
+    """
+
+    def evaluate(x, batch, *args):
+        x = np.array(x, dtype=get_precision())
+        size = len(batch)
+        copies = Reverse(np.repeat(x[np.newaxis], size, axis=0))
+        out = f(copies, batch, *args)
+
+        if np.shape(getattr(out, "value", out)) != (size,):
+            raise ValueError("f must return one loss per example")
+
+        if not isinstance(out, Reverse):
+            return out, np.zeros(np.shape(copies.value), dtype=get_precision())
+
+        return out.value, np.asarray(
+            gradients(out, [copies])[0], dtype=copies.value.dtype
+        )
+
+    return evaluate
+
+
+class _Local(threading.local):
+    """The tapes, the tracer, the seeds and the set of created nodes of a
+    thread
+    """
+
+    created = None
+    seeds = None
+    tracer = None
+
+
+_LOCAL = _Local()
+
+
+@contextmanager
+def _recording():
+    """Collects the ids of the nodes recorded in the current thread within a
+    with block. The ids are also added to those of an enclosing block.
+    """
+    outer = _LOCAL.created
+    _LOCAL.created = created = set()
+
+    try:
+        yield created
+    finally:
+        _LOCAL.created = outer
+        if outer is not None:
+            outer |= created
+
+
+def _current_tape():
+    """Returns the innermost Tape of the current thread, or None"""
+    tapes = getattr(_LOCAL, "tapes", None)
+    return tapes[-1] if tapes else None
+
+
+class Tape:
+    """Stores the gradients computed by backward() in the current thread.
+
+    While a tape is active in a thread, backward() writes the gradients into
+    the tape instead of the gradient_value of the nodes, and get_gradient()
+    reads them from the tape, so that threads sharing parameter nodes do not
+    overwrite each other's gradients. Tapes are local to the thread that
+    entered them and may be nested, the innermost one is used.
+
+    A tape created with a dtype also sets the precision of the values and
+    gradients computed within it, see autodiffpy.precision.
+
+    Example:
+        W = Reverse.parameter(np.ones(3))
+
+        def work(x):
+            with Tape():
+                loss = sum(W * x)
+                loss.backward()
+                return W.get_gradient()
+    """
+
+    def __init__(self, dtype=None):
+        """Creates an empty tape.
+
+        Arguments:
+            dtype (default: None) {np.dtype} -- np.float32 or np.float64 to
+                compute in that precision within the tape, None to keep the
+                current precision
+
+        Returns:
+            None
+        """
+        # the nodes are kept alongside their gradients so that their ids
+        # stay unique while the tape is alive
+        self._gradients = {}
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self._precision = None
+
+    def __enter__(self):
+        if self.dtype is not None:
+            self._precision = precision(self.dtype)
+            self._precision.__enter__()
+
+        if getattr(_LOCAL, "tapes", None) is None:
+            _LOCAL.tapes = []
+        _LOCAL.tapes.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _LOCAL.tapes.remove(self)
+
+        if self._precision is not None:
+            self._precision.__exit__(*exc_info)
+            self._precision = None
+
+    def __contains__(self, node):
+        return id(node) in self._gradients
+
+    def __len__(self):
+        return len(self._gradients)
+
+    def _store(self, order, adjoints):
+        """Stores the gradients of a backward sweep"""
+        for node in order:
+            gradient = adjoints.get(id(node), _zeros(node.value))
+            self._gradients[id(node)] = (node, gradient)
+
+    def gradient(self, node):
+        """Returns the gradient stored for node.
+
+        Arguments:
+            node {Reverse} -- a node that a backward() on this tape reached
+
+        Returns:
+            {Float, np.ndarray} -- gradient of the node
+        """
+        if node not in self:
+            raise ValueError("no gradient was recorded for this node")
+
+        return self._gradients[id(node)][1]
+
+    def clear(self):
+        """Forgets all stored gradients.
+
+        Returns:
+            None
+        """
+        self._gradients.clear()
+
+
+def _scatter(values, out, index):
+    """Maps the gradient of an indexed node onto the indexed array"""
+    shape = np.shape(values[0])
+
+    def scatter(gradient):
+        result = np.zeros(shape, dtype=np.result_type(gradient, get_precision()))
+        np.add.at(result, index, gradient)
+        return result
+
+    return [scatter]
+
+
+_ADD = _Op("add", operator.add, rules=(lambda x, y, z: 1, lambda x, y, z: 1))
+_MUL = _Op("mul", operator.mul, rules=(lambda x, y, z: y, lambda x, y, z: x))
+_POW = _Op(
+    "pow",
+    operator.pow,
+    rules=(
+        lambda x, y, z: y * x ** (y - 1),
+        # the log of a constant base is a float64 scalar, which would widen z
+        lambda x, y, z: z * _as_float(np.log(x)),
+    ),
+)
+_GETITEM = _Op("getitem", lambda x, index: x[index], vjp=_scatter)
+
 
 """Class for automatic differentiation using reverse mode. Represents a node
 in the computation graph.
 
 Attributes:
-    value {Float} -- value of the node in the computation graph
-    children {[Reverse]} -- Array of Reverse nodes whose value is dependent
-        upon this node
+    value {Float, np.ndarray} -- value of the node in the computation graph
+    children {[Reverse]} -- Array of the live Reverse nodes whose value is
+        dependent upon this node, each with the position of this node in its
+        arguments. They are referenced weakly.
+    parents {[Reverse]} -- Array of Reverse nodes that this node's value
+        depends upon, each with its position in the arguments of this node
+    op {_Op} -- operation that computed this node, None for inputs
+    args {tuple} -- Reverse objects and constants op was applied to
     gradient_value -- gradient of the node in the computation graph
+    shared {bool} -- whether the node is a read-only parameter, see
+        Reverse.parameter
 """
 
 
@@ -27,44 +683,250 @@ class Reverse:
     The class overrides the dunder methods for Python mathematical operators,
     which allows us to combine Reverse objects with standard mathematical
     operators and then build the computation graph.
+
+    The value of a node may be a scalar or a numpy array. Operations on array
+    valued nodes are elementwise and follow the numpy broadcasting rules, so a
+    function of a whole vector is a handful of nodes rather than one node per
+    element.
     """
 
+    # make numpy defer to our reflected operators instead of building object
+    # arrays of Reverse nodes when an array appears on the left
+    __array_ufunc__ = None
+
+    __slots__ = (
+        "value",
+        "_children",
+        "op",
+        "args",
+        "kwargs",
+        "_partials",
+        "_gradient",
+        "shared",
+        "__weakref__",
+    )
+
     def __init__(self, val):
         """Initializes a Reverse object with value, empty children array, and
         a blank gradient. Children are nodes whose values are dependent upon
         this node.
 
         Arguments:
-            val {Float} -- stores function value at this point of reverse graph
+            val {Float, list, np.ndarray} -- stores function value at this
+                point of reverse graph. Lists are converted to arrays.
 
         Returns:
             None
         """
-        self.value = val
-        self.children = []
-        self.gradient_value = None
+        self.value = _as_value(val)
+        self._children = ()
+        self.op = None
+        self.args = ()
+        self.kwargs = {}
+        self._partials = None
+        self._gradient = None
+        self.shared = False
+
+    @property
+    def children(self):
+        """The (index, Reverse) pairs of the nodes computed from self that are
+        still alive, index being the position of self in their arguments.
+        Children are only referenced weakly, so recording an operation does
+        not create a reference cycle between the nodes.
+        """
+        children = [child() for child in self._children]
+        children = [child for child in children if child is not None]
+        if len(children) < len(self._children):
+            self._children = [_ref(child) for child in children]
+
+        return [
+            (index, child)
+            for child in children
+            for index, arg in enumerate(child.args)
+            if arg is self
+        ]
+
+    @children.setter
+    def children(self, edges):
+        children = {id(child): child for _, child in edges}
+        self._children = [_ref(child) for child in children.values()]
+
+    @property
+    def parents(self):
+        """The (index, Reverse) pairs of the arguments of self that are
+        Reverse objects, index being their position in the arguments.
+        """
+        return [
+            (index, arg)
+            for index, arg in enumerate(self.args)
+            if isinstance(arg, Reverse)
+        ]
+
+    @property
+    def gradient_value(self):
+        """The gradient stored on the node, or None if it is not computed yet.
+
+        Setting it seeds the node: get_gradient() of the nodes it depends on
+        then propagates the gradients of all the nodes seeded since the last
+        such propagation.
+        """
+        return self._gradient
+
+    @gradient_value.setter
+    def gradient_value(self, value):
+        self._gradient = value
+
+        if value is None:
+            _seeds().pop(id(self), None)
+        else:
+            _seeds()[id(self)] = self
+
+    @classmethod
+    def parameter(cls, val):
+        """Creates a read-only input which can be shared between threads.
+
+        The value of a parameter cannot be modified, and operations on it do
+        not add to its children, so using a parameter never changes it and
+        its graph does not grow with every computation it is used in. Its
+        gradient is never stored on the node either: use gradients(), or
+        backward() and get_gradient() within a Tape.
+
+        Arguments:
+            val {Float, list, np.ndarray} -- value of the parameter, arrays
+                are copied
+
+        Returns:
+            Reverse -- the parameter node
+        """
+        node = cls(np.array(val) if isinstance(val, np.ndarray) else val)
+        if isinstance(node.value, np.ndarray):
+            node.value.setflags(write=False)
+        node.shared = True
+        return node
+
+    def _partial(self, index):
+        """Returns the weight of the edge from the argument at index to self,
+        computing the partial derivatives of self on first use.
+
+        Arguments:
+            index {int} -- position of the argument
+
+        Returns:
+            {Float, np.ndarray, callable} -- partial derivative of self with
+                respect to the argument
+        """
+        if self._partials is None:
+            self._partials = {}
+
+        if index not in self._partials:
+            values = _values(self.args)
+            if self.op.rules is not None:
+                self._partials[index] = self.op.rules[index](*values, self.value)
+            else:
+                weights = self.op.vjp(values, self.value, **self.kwargs)
+                self._partials.update(enumerate(weights))
+
+        return self._partials[index]
 
     def reset_gradient(self):
-        """Resets the gradient values to None in the computation graph.
+        """Resets the gradient values to None in the computation graph, for
+        self and every node computed from it. The graph is walked with an
+        explicit stack so that deep graphs do not hit the recursion limit.
+
+        Returns:
+            None
+        """
+        visited = {id(self)}
+        stack = [self]
+
+        while stack:
+            node = stack.pop()
+            node.gradient_value = None
+
+            for _, child in node.children:
+                if id(child) not in visited:
+                    visited.add(id(child))
+                    stack.append(child)
+
+    def backward(self, seed=None, inputs=None):
+        """Seeds the gradient of self and propagates it to every node that
+        self depends on, after which get_gradient returns the gradient of
+        self with respect to any of them.
+
+        Only the ancestors of self are visited, each one once, in reverse
+        topological order. Expressions that were built from the same inputs
+        but do not contribute to self are never touched.
+
+        Within a Tape the gradients are stored in the tape of the current
+        thread. Otherwise they are stored in the gradient_value of the nodes,
+        except for parameters, whose gradients are then discarded.
+
+        Arguments:
+            seed (default: 1) {Float, np.ndarray} -- gradient of self
+            inputs (default: None) {[Reverse]} -- if given, only the nodes on
+                a path from one of the inputs to self are propagated through,
+                and the gradient_value of the others is left unchanged
 
         Returns:
             None
         """
-        self.gradient_value = None
-        for _, child in self.children:
-            child.reset_gradient()
+        order, adjoints = _adjoints(self, seed, inputs)
+
+        tape = _current_tape()
+        if tape is not None:
+            tape._store(order, adjoints)
+            return
+
+        for node in order:
+            if not node.shared:
+                node._gradient = adjoints.get(id(node), _zeros(node.value))
+
+        # get_gradient of the nodes left out by inputs sweeps from self
+        if inputs is not None:
+            _seeds()[id(self)] = self
 
     def get_gradient(self):
         """Returns gradient value. Calculates gradient value if undefined.
 
+        The gradient of an array valued node has the same shape as its value.
+        Contributions from children which broadcast this node are summed over
+        the broadcast axes.
+
+        Within a Tape, the gradient stored in the tape is returned if there
+        is one. Parameters only have gradients within a Tape.
+
         Returns:
-            Float -- gradient value
+            {Float, np.ndarray} -- gradient value
         """
-        if self.gradient_value is None:
-            self.gradient_value = sum(
-                weight * child.get_gradient() for weight, child in self.children
+        tape = _current_tape()
+        if tape is not None and self in tape:
+            return tape.gradient(self)
+
+        if self.shared:
+            raise ValueError(
+                "parameters keep no gradient, use gradients() or backward() in a Tape"
             )
-        return self.gradient_value
+
+        if self._gradient is None:
+            # a single reverse sweep from the seeded nodes computes the
+            # gradients of all of their ancestors, so expressions built from
+            # self that do not lead to a seed are never visited. Afterwards
+            # every ancestor of the seeds has a gradient, so later sweeps
+            # need not start from them again.
+            seeds = _seeds()
+            order, known = _seeded(list(seeds.values()))
+            seeds.clear()
+            adjoints = {id(node): node._gradient for node in order if id(node) in known}
+            _sweep(order, adjoints, {id(node) for node in order} - known)
+
+            for node in order:
+                if id(node) not in known and not node.shared:
+                    node._gradient = adjoints.get(id(node), _zeros(node.value))
+
+            if self._gradient is None:
+                self._gradient = _zeros(self.value)
+
+        return self._gradient
 
     def __str__(self):
         """Sets string output for Reverse object.
@@ -85,15 +947,7 @@ class Reverse:
         Returns:
             Reverse -- sum of self and other object
         """
-        try:
-            z = Reverse(self.value + other.value)
-            self.children.append((1, z))
-            other.children.append((1, z))
-            return z
-        except AttributeError:
-            z = Reverse(self.value + other)
-            self.children.append((1, z))
-            return z
+        return _binary(_ADD, self, other)
 
     def __radd__(self, other):
         """Calculates reverse add with self and other
@@ -142,15 +996,7 @@ class Reverse:
         Returns:
             Reverse -- product of self and other
         """
-        try:
-            z = Reverse(self.value * other.value)
-            self.children.append((other.value, z))
-            other.children.append((self.value, z))
-            return z
-        except AttributeError:
-            z = Reverse(self.value * other)
-            self.children.append((other, z))
-            return z
+        return _binary(_MUL, self, other)
 
     def __rmul__(self, other):
         """Calculates product of self and other
@@ -194,15 +1040,7 @@ class Reverse:
         Returns:
             Reverse -- self raised to the other
         """
-        try:
-            z = Reverse(self.value ** other.value)
-            self.children.append((other.value * self.value ** (other.value - 1), z))
-            other.children.append((self.value ** other.value * np.log(self.value), z))
-            return z
-        except AttributeError:
-            z = Reverse(self.value ** other)
-            self.children.append((other * self.value ** (other - 1), z))
-            return z
+        return _binary(_POW, self, other)
 
     def __rpow__(self, other):
         """Calculates other raised to self and appends to children
@@ -213,9 +1051,38 @@ class Reverse:
         Returns:
             Reverse -- other raised to self
         """
-        z = Reverse(other ** self.value)
-        self.children.append((other ** self.value * np.log(other), z))
-        return z
+        return _record(_POW, other, self)
+
+    def __matmul__(self, other):
+        """Calculates the matrix product of self and other using dot
+
+        Arguments:
+            other {Reverse, np.ndarray} -- right operand, a vector or matrix
+
+        Returns:
+            Reverse -- matrix product of self and other
+        """
+        return dot(self, other)
+
+    def __rmatmul__(self, other):
+        """Calculates the matrix product of other and self using dot
+
+        Arguments:
+            other {Reverse, np.ndarray} -- left operand, a vector or matrix
+
+        Returns:
+            Reverse -- matrix product of other and self
+        """
+        return dot(other, self)
+
+    @property
+    def T(self):
+        """Transposes self using transpose
+
+        Returns:
+            Reverse -- transpose of self
+        """
+        return transpose(self)
 
     def __neg__(self):
         """Negates self
@@ -228,19 +1095,36 @@ class Reverse:
     def __pos__(self):
         return self
 
+    def __getitem__(self, index):
+        """Indexes into an array valued Reverse object and appends result to
+        children
+
+        Arguments:
+            index -- any numpy index into self.value
+
+        Returns:
+            Reverse -- the selected element(s) of self
+        """
+        return _record(_GETITEM, self, index=index)
+
     def __eq__(self, other):
         """Calculates whether self is equal to other
 
         Arguments:
-            other {Reverse, Float} -- value being compared to self
+            other {Reverse, Float, np.ndarray} -- value being compared to self
 
         Returns:
-            Bool -- true if self is equal to other
+            {Bool, np.ndarray} -- true if other is a Reverse object with the same
+                value and gradient as self, elementwise true where the value
+                of self equals other otherwise. While a function is traced,
+                the comparison is decided by the tracer like self < other.
         """
+        if _LOCAL.tracer is not None:
+            return _compare(np.equal, self, other)
+
         try:
-            return (
-                self.value == other.value
-                and self.gradient_value == other.gradient_value
+            return np.array_equal(self.value, other.value) and np.array_equal(
+                self.gradient_value, other.gradient_value
             )
         except AttributeError:
             return self.value == other
@@ -249,51 +1133,123 @@ class Reverse:
         """Calculates whether self is not equal to other
 
         Arguments:
-            other {Reverse, Float} -- value being compared to self
+            other {Reverse, Float, np.ndarray} -- value being compared to self
 
         Returns:
-            Bool -- true if self is not equal to other
+            {Bool, np.ndarray} -- the negation of self == other
         """
-        try:
-            return (
-                self.value != other.value or self.gradient_value != other.gradient_value
-            )
-        except AttributeError:
-            return self.value != other
+        if _LOCAL.tracer is not None:
+            return _compare(np.not_equal, self, other)
 
+        if isinstance(other, Reverse):
+            return not self == other
 
-def sin(x):
-    """Returns sin of x. Appends result to x.children if x is a Reverse object.
+        return self.value != other
 
-    Arguments:
-        x {Reverse, Float} -- input to sin function
+    def __lt__(self, other):
+        """Compares the value of self with the value of other.
 
-    Returns:
-        {Reverse, Float} -- Only returns Reverse if x is a Reverse object. Else float.
-    """
-    try:
-        z = Reverse(sin(x.value))
-        x.children.append((cos(x.value), z))
-        return z
-    except AttributeError:
-        return np.sin(x)
+        Arguments:
+            other {Reverse, Float, np.ndarray} -- value being compared to self
 
+        Returns:
+            {Bool, np.ndarray} -- true where self is less than other
+        """
+        return _compare(np.less, self, other)
 
-def cos(x):
-    """Returns cos of x. Appends result to x.children if x is a Reverse object.
+    def __le__(self, other):
+        """Compares the value of self with the value of other.
+
+        Arguments:
+            other {Reverse, Float, np.ndarray} -- value being compared to self
+
+        Returns:
+            {Bool, np.ndarray} -- true where self is at most other
+        """
+        return _compare(np.less_equal, self, other)
+
+    def __gt__(self, other):
+        """Compares the value of self with the value of other.
+
+        Arguments:
+            other {Reverse, Float, np.ndarray} -- value being compared to self
+
+        Returns:
+            {Bool, np.ndarray} -- true where self is greater than other
+        """
+        return _compare(np.greater, self, other)
+
+    def __ge__(self, other):
+        """Compares the value of self with the value of other.
+
+        Arguments:
+            other {Reverse, Float, np.ndarray} -- value being compared to self
+
+        Returns:
+            {Bool, np.ndarray} -- true where self is at least other
+        """
+        return _compare(np.greater_equal, self, other)
+
+    def __abs__(self):
+        """Calculates the absolute value of self and appends it to children
+
+        Returns:
+            Reverse -- absolute value of self
+        """
+        return abs(self)
 
-    Arguments:
-        x {Reverse, Float} -- input to cos function
+
+class _Comparison:
+    """A comparison of Reverse objects that is recorded rather than evaluated,
+    while a function is traced. where() keeps the comparison in the graph.
+    """
+
+    def __init__(self, op, x, y):
+        self.op = op
+        self.x = x
+        self.y = y
+
+
+def _compare(op, x, y):
+    """Compares the values of x and y, unless a function is being traced in
+    the current thread (see autodiffpy.vectorize), in which case the tracer
+    decides the outcome of the comparison.
+    """
+    tracer = getattr(_LOCAL, "tracer", None)
+    if tracer is not None:
+        return tracer.compare(op, x, y)
+
+    return op(*_values([x, y]))
+
+
+_SIN = _Op("sin", np.sin, rules=(lambda x, z: np.cos(x),))
+
+
+def sin(x):
+    """Returns sin of x. Appends result to x.children if x is a Reverse object.
+
+    Arguments:
+        x {Reverse, Float} -- input to sin function
 
     Returns:
         {Reverse, Float} -- Only returns Reverse if x is a Reverse object. Else float.
     """
-    try:
-        z = Reverse(cos(x.value))
-        x.children.append((-1 * sin(x.value), z))
-        return z
-    except AttributeError:
-        return np.cos(x)
+    return _record(_SIN, x)
+
+
+_COS = _Op("cos", np.cos, rules=(lambda x, z: -1 * np.sin(x),))
+
+
+def cos(x):
+    """Returns cos of x. Appends result to x.children if x is a Reverse object.
+
+    Arguments:
+        x {Reverse, Float} -- input to cos function
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if x is a Reverse object. Else float.
+    """
+    return _record(_COS, x)
 
 
 def tan(x):
@@ -348,36 +1304,33 @@ def cot(x):
     return 1 / tan(x)
 
 
+_ARCSIN = _Op("arcsin", np.arcsin, rules=(lambda x, z: 1 / (np.sqrt(1 - x ** 2)),))
+
+
 def arcsin(x):
     """Computes the arcsin of the Reverse object and computes the
     derivative.
     """
-    try:
-        z = Reverse(arcsin(x.value))
-        x.children.append((1 / (sqrt(1 - x.value ** 2)), z))
-        return z
-    except AttributeError:
-        return np.arcsin(x)
+    return _record(_ARCSIN, x)
+
+
+_ARCCOS = _Op("arccos", np.arccos, rules=(lambda x, z: -1 / (np.sqrt(1 - x ** 2)),))
 
 
 def arccos(x):
     """Computes the arccos of the object."""
-    try:
-        z = Reverse(arccos(x.value))
-        x.children.append((-1 / (sqrt(1 - x.value ** 2)), z))
-        return z
-    except AttributeError:
-        return np.arccos(x)
+    return _record(_ARCCOS, x)
+
+
+_ARCTAN = _Op("arctan", np.arctan, rules=(lambda x, z: 1 / (1 + x ** 2),))
 
 
 def arctan(x):
     """Computes the arctan of the object."""
-    try:
-        z = Reverse(arctan(x.value))
-        x.children.append((1 / (1 + x.value ** 2), z))
-        return z
-    except AttributeError:
-        return np.arctan(x)
+    return _record(_ARCTAN, x)
+
+
+_EXP = _Op("exp", np.exp, rules=(lambda x, z: z,))
 
 
 def exp(x):
@@ -389,12 +1342,7 @@ def exp(x):
     Returns:
         {Reverse, Float} -- Only returns Reverse if x is a Reverse object. Else float.
     """
-    try:
-        z = Reverse(exp(x.value))
-        x.children.append((exp(x.value), z))
-        return z
-    except AttributeError:
-        return np.exp(x)
+    return _record(_EXP, x)
 
 
 def sinh(x):
@@ -475,23 +1423,28 @@ def coth(x):
     return 1 / tanh(x)
 
 
+_LOG = _Op(
+    "log",
+    lambda x, base: np.log(x) / _as_float(np.log(base)),
+    rules=(
+        lambda x, base, z: 1 / (_as_float(np.log(base)) * x),
+        lambda x, base, z: -z / _as_float(base * np.log(base)),
+    ),
+)
+
+
 def log(x, base=np.exp(1)):
     """Calculates base log of x. Defaults to natural log. Appends result to
     x.children if x is a Reverse object.
 
     Arguments:
         x {Reverse, Float} -- Value to calculate log.
-        base (default: e) {Float} -- log base
+        base (default: e) {Reverse, Float} -- log base
 
     Returns:
         {Reverse, Float} -- Only returns Reverse if x is a Reverse object. Else float.
     """
-    try:
-        z = Reverse(log(x.value, base))
-        x.children.append((1 / (log(base) * x.value), z))
-        return z
-    except AttributeError:
-        return math.log(x, base)
+    return _record(_LOG, x, base)
 
 
 def ln(x):
@@ -546,17 +1499,662 @@ def sqrt(x):
     return x ** (1 / 2)
 
 
+def _indicator(mask):
+    """Returns one where mask is true and zero elsewhere"""
+    return np.where(mask, 1.0, 0.0).astype(get_precision())
+
+
+def _selected(cond):
+    """Returns the weights of the two branches of a where"""
+    return _indicator(cond), _indicator(np.logical_not(cond))
+
+
+_WHERE = _Op(
+    "where",
+    lambda c, x, y: np.where(c, x, y),
+    rules=(
+        lambda c, x, y, z: 0,
+        lambda c, x, y, z: _selected(c)[0],
+        lambda c, x, y, z: _selected(c)[1],
+    ),
+)
+
+
+def _where_compare(compare):
+    """Creates the where operation whose condition compares its first two
+    arguments, which are part of the graph but get no gradient.
+    """
+    return _Op(
+        "where",
+        lambda a, b, x, y: np.where(compare(a, b), x, y),
+        rules=(
+            lambda a, b, x, y, z: 0,
+            lambda a, b, x, y, z: 0,
+            lambda a, b, x, y, z: _selected(compare(a, b))[0],
+            lambda a, b, x, y, z: _selected(compare(a, b))[1],
+        ),
+    )
+
+
+_WHERE_COMPARE = {
+    compare: _where_compare(compare)
+    for compare in (
+        np.less,
+        np.less_equal,
+        np.greater,
+        np.greater_equal,
+        np.equal,
+        np.not_equal,
+    )
+}
+
+
+def where(cond, x, y):
+    """Selects the elements of x where cond is true and those of y elsewhere,
+    with the gradient flowing to the selected ones.
+
+    Arguments:
+        cond {Bool, np.ndarray} -- condition, such as a comparison of Reverse
+            objects
+        x {Reverse, Float, np.ndarray} -- values where cond is true
+        y {Reverse, Float, np.ndarray} -- values where cond is false
+
+    Returns:
+        Reverse -- selected values
+    """
+    if isinstance(cond, _Comparison):
+        return _record(_WHERE_COMPARE[cond.op], cond.x, cond.y, x, y)
+
+    return _record(_WHERE, np.asarray(cond, dtype=bool), x, y)
+
+
+_ABS = _Op("abs", np.abs, rules=(lambda x, z: np.sign(x),))
+
+
+def abs(x):
+    """Calculates the absolute value of x, whose gradient is taken to be zero
+    at zero.
+
+    Arguments:
+        x {Reverse, Float} -- Value to calculate the absolute value of.
+
+    Returns:
+        Reverse -- absolute value of x
+    """
+    return _record(_ABS, x)
+
+
+_MAXIMUM = _Op(
+    "maximum",
+    np.maximum,
+    rules=(
+        lambda x, y, z: _tie_weights(x, y),
+        lambda x, y, z: _tie_weights(y, x),
+    ),
+)
+_MINIMUM = _Op(
+    "minimum",
+    np.minimum,
+    rules=(
+        lambda x, y, z: _tie_weights(y, x),
+        lambda x, y, z: _tie_weights(x, y),
+    ),
+)
+
+
+def maximum(x, y):
+    """Calculates the elementwise maximum of x and y. Where they are equal,
+    each of them gets half of the gradient.
+
+    Arguments:
+        x {Reverse, Float, np.ndarray} -- first value
+        y {Reverse, Float, np.ndarray} -- second value
+
+    Returns:
+        Reverse -- elementwise maximum
+    """
+    return _record(_MAXIMUM, x, y)
+
+
+def minimum(x, y):
+    """Calculates the elementwise minimum of x and y. Where they are equal,
+    each of them gets half of the gradient.
+
+    Arguments:
+        x {Reverse, Float, np.ndarray} -- first value
+        y {Reverse, Float, np.ndarray} -- second value
+
+    Returns:
+        Reverse -- elementwise minimum
+    """
+    return _record(_MINIMUM, x, y)
+
+
+_CLIP = _Op(
+    "clip",
+    np.clip,
+    rules=(
+        lambda x, lower, upper, z: _indicator((x >= lower) & (x <= upper)),
+        lambda x, lower, upper, z: _indicator(x < lower),
+        lambda x, lower, upper, z: _indicator((x > upper) & (x >= lower)),
+    ),
+)
+
+
+def clip(x, lower, upper):
+    """Limits x to the interval from lower to upper. The gradient flows to x
+    inside the interval, including its ends, and to the bound outside of it.
+
+    Arguments:
+        x {Reverse, Float, np.ndarray} -- value to limit
+        lower {Reverse, Float, np.ndarray} -- lower bound
+        upper {Reverse, Float, np.ndarray} -- upper bound
+
+    Returns:
+        Reverse -- limited value
+    """
+    return _record(_CLIP, x, lower, upper)
+
+
+_LOGISTIC = _Op("logistic", _logistic, rules=(lambda x, z: z * (1 - z),))
+_SOFTPLUS = _Op("softplus", _softplus, rules=(lambda x, z: _logistic(x),))
+_LOG1P = _Op("log1p", np.log1p, rules=(lambda x, z: 1 / (1 + x),))
+_EXPM1 = _Op("expm1", np.expm1, rules=(lambda x, z: z + 1,))
+
+
+def logistic(x):
+    """Calculates 1 / (1 + exp(-x)) as a single node. Appends result to
+    x.children if x is a Reverse object.
+
+    Arguments:
+        x {Reverse, Float} -- Value to calculate the logistic function of.
+
+    Returns:
+        Reverse -- logistic of x
+    """
+    return _record(_LOGISTIC, x)
+
+
+def softplus(x):
+    """Calculates log(1 + exp(x)) without overflowing. Appends result to
+    x.children if x is a Reverse object.
+
+    Arguments:
+        x {Reverse, Float} -- Value to calculate softplus of.
+
+    Returns:
+        Reverse -- softplus of x
+    """
+    return _record(_SOFTPLUS, x)
+
+
+def log1p(x):
+    """Calculates log(1 + x), accurately for small x. Appends result to
+    x.children if x is a Reverse object.
+
+    Arguments:
+        x {Reverse, Float} -- Value to calculate log1p of.
+
+    Returns:
+        Reverse -- log of 1 + x
+    """
+    return _record(_LOG1P, x)
+
+
+def expm1(x):
+    """Calculates exp(x) - 1, accurately for small x. Appends result to
+    x.children if x is a Reverse object.
+
+    Arguments:
+        x {Reverse, Float} -- Value to calculate expm1 of.
+
+    Returns:
+        Reverse -- exp of x minus 1
+    """
+    return _record(_EXPM1, x)
+
+
+def _values(terms):
+    """Returns the values of a list of Reverse objects and numbers"""
+    return [getattr(term, "value", term) for term in terms]
+
+
+# a reduction over a collection is a single node with one argument per term,
+# so the graph is one node deep no matter how many terms there are
+_SUM_TERMS = _Op(
+    "sum_terms",
+    lambda *terms: _accumulate(np.sum, terms, axis=0),
+    vjp=lambda values, z: [1] * len(values),
+)
+_SUM = _Op(
+    "sum",
+    lambda x, axis=None: _accumulate(np.sum, x, axis=axis),
+    vjp=lambda values, z, axis=None: [
+        lambda g: _expand_reduced(g, np.shape(values[0]), axis)
+    ],
+)
+
+
+def sum(x, axis=None):
+    """Sums the elements of x along the given axis. Appends result to
+    x.children if x is a Reverse object.
+
+    If x is a list or tuple, its elements are summed into a single node rather
+    than a chain of additions.
+
+    Arguments:
+        x {Reverse, np.ndarray, list} -- values to sum
+        axis (default: None) {int, tuple} -- axis to sum over, all if None
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if x is a Reverse object. Else float.
+    """
+    if isinstance(x, (list, tuple)):
+        return _record(_SUM_TERMS, *x)
+
+    return _record(_SUM, x, axis=axis)
+
+
+# the terms are multiplied elementwise, like sum_terms adds them
+_PROD_TERMS = _Op(
+    "prod_terms",
+    lambda *terms: np.prod(np.broadcast_arrays(*terms), axis=0),
+    vjp=lambda values, z: list(
+        _exclusive_products(np.broadcast_arrays(*values), axis=0)
+    ),
+)
+_PROD = _Op("prod", np.prod, vjp=lambda values, z: [_exclusive_products(values[0])])
+
+
+def prod(x):
+    """Multiplies all the elements of x. Appends result to the children of x,
+    or of the elements of x if it is a list or tuple.
+
+    Arguments:
+        x {Reverse, np.ndarray, list} -- values to multiply
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if x contains a Reverse object.
+    """
+    if isinstance(x, (list, tuple)):
+        return _record(_PROD_TERMS, *x)
+
+    return _record(_PROD, x)
+
+
+def _logsumexp(values, axis=None):
+    """Computes log(sum(exp(values))) along axis after shifting by the largest
+    value
+    """
+    shift = _shift(values, axis)
+    out = np.log(np.sum(np.exp(np.subtract(values, shift)), axis=axis, keepdims=True))
+    out = out + shift
+
+    return out.reshape(())[()] if axis is None else np.squeeze(out, axis=axis)
+
+
+def _logsumexp_gradient(values, z, axis=None):
+    """The gradient of logsumexp is the softmax of its input"""
+    shape = np.shape(values[0])
+    weights = np.exp(values[0] - _expand_reduced(z, shape, axis))
+    return [lambda g: _expand_reduced(g, shape, axis) * weights]
+
+
+# the partial derivatives are the softmax of the values, exp(values - out)
+_LOGSUMEXP_TERMS = _Op(
+    "logsumexp_terms",
+    lambda *terms: _logsumexp(terms),
+    vjp=lambda values, z: list(np.exp(np.subtract(values, z))),
+)
+_LOGSUMEXP = _Op("logsumexp", _logsumexp, vjp=_logsumexp_gradient)
+
+
+def logsumexp(x, axis=None):
+    """Calculates log(sum(exp(x))) over the elements of x along the given axis
+    without overflowing. Appends result to the children of x, or of the
+    elements of x if it is a list or tuple.
+
+    Arguments:
+        x {Reverse, np.ndarray, list} -- values to reduce
+        axis (default: None) {int, tuple} -- axis to reduce, all if None
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if x contains a Reverse object.
+    """
+    if isinstance(x, (list, tuple)):
+        return _record(_LOGSUMEXP_TERMS, *x)
+
+    return _record(_LOGSUMEXP, x, axis=axis)
+
+
+def _softmax(x, axis=None):
+    """Computes exp(x) / sum(exp(x)) along axis after shifting by the largest
+    value
+    """
+    exps = np.exp(x - _shift(x, axis))
+    return exps / np.sum(exps, axis=axis, keepdims=True)
+
+
+def _softmax_gradient(values, z, axis=None):
+    """Applies the Jacobian of softmax, diag(z) - z z^T, to the gradient"""
+    return [lambda g: z * (g - np.sum(g * z, axis=axis, keepdims=True))]
+
+
+_SOFTMAX = _Op("softmax", _softmax, vjp=_softmax_gradient)
+
+
+def softmax(x, axis=None):
+    """Calculates exp(x) / sum(exp(x)) over the elements of x along the given
+    axis without overflowing. Appends result to x.children if x is a Reverse
+    object.
+
+    Arguments:
+        x {Reverse, np.ndarray} -- values to normalize
+        axis (default: None) {int, tuple} -- axis to normalize over, all if None
+
+    Returns:
+        {Reverse, np.ndarray} -- Only returns Reverse if x is a Reverse object.
+    """
+    return _record(_SOFTMAX, x, axis=axis)
+
+
+_STACK = _Op(
+    "stack",
+    lambda *values: np.stack(values),
+    vjp=lambda values, z: [lambda g, i=i: g[i] for i in range(len(values))],
+)
+
+
+def stack(values):
+    """Stacks a list of Reverse objects and numbers into a single array valued
+    node along a new first axis. Appends result to the children of each
+    Reverse object in the list.
+
+    Arguments:
+        values {list} -- Reverse objects and numbers of the same shape
+
+    Returns:
+        {Reverse, np.ndarray} -- Only returns Reverse if values contains a
+            Reverse object.
+    """
+    return _record(_STACK, *values)
+
+
+def _reverse_cumsum(g, shape, axis):
+    """The gradient of cumsum: each element contributes to every later partial
+    sum along axis, or of the flattened values if axis is None.
+    """
+    if axis is None:
+        return np.reshape(np.cumsum(g[::-1])[::-1], shape)
+
+    return np.flip(np.cumsum(np.flip(g, axis), axis=axis), axis)
+
+
+_CUMSUM = _Op(
+    "cumsum",
+    lambda x, axis=None: np.cumsum(x, axis=axis),
+    vjp=lambda values, z, axis=None: [
+        lambda g: _reverse_cumsum(g, np.shape(values[0]), axis)
+    ],
+)
+
+
+def cumsum(x, axis=None):
+    """Calculates the cumulative sum of x along the given axis, or of its
+    flattened elements as numpy does. Appends result to the children of x, or
+    of the elements of x if it is a list or tuple.
+
+    Arguments:
+        x {Reverse, np.ndarray, list} -- values to accumulate
+        axis (default: None) {int} -- axis to accumulate along, the flattened
+            values if None
+
+    Returns:
+        {Reverse, np.ndarray} -- Only returns Reverse if x contains a Reverse object.
+    """
+    if isinstance(x, (list, tuple)):
+        x = stack(x)
+
+    return _record(_CUMSUM, x, axis=axis)
+
+
+def _mean_gradient(values, z, axis=None):
+    """Spreads the gradient of a mean evenly over the averaged elements"""
+    shape = np.shape(values[0])
+    count = np.size(values[0]) / np.size(z)
+    return [lambda g: _expand_reduced(g, shape, axis) / count]
+
+
+_MEAN = _Op(
+    "mean",
+    lambda x, axis=None: _accumulate(np.mean, x, axis=axis),
+    vjp=_mean_gradient,
+)
+
+
+def mean(x, axis=None):
+    """Averages the elements of x along the given axis. Appends result to
+    x.children if x is a Reverse object.
+
+    Arguments:
+        x {Reverse, np.ndarray} -- values to average
+        axis (default: None) {int, tuple} -- axis to average over, all if None
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if x is a Reverse object. Else float.
+    """
+    return _record(_MEAN, x, axis=axis)
+
+
+def _dot_gradients(gradient, x_value, y_value):
+    """Computes the contributions of the gradient of np.dot(x, y) to x and y
+    for vectors and matrices. Vectors are treated as a row (on the left) or a
+    column (on the right) so that every case is a single matrix product.
+    """
+    x_matrix = np.reshape(x_value, (-1, np.shape(x_value)[-1]))
+    y_matrix = np.reshape(y_value, (np.shape(y_value)[0], -1))
+    g_matrix = np.reshape(gradient, (x_matrix.shape[0], y_matrix.shape[1]))
+
+    x_gradient = np.reshape(g_matrix @ y_matrix.T, np.shape(x_value))
+    y_gradient = np.reshape(x_matrix.T @ g_matrix, np.shape(y_value))
+
+    return x_gradient, y_gradient
+
+
+def _dot_terms(values, z):
+    """Each term of a dot product of lists is weighted by its partner"""
+    half = len(values) // 2
+    return values[half:] + values[:half]
+
+
+_DOT_TERMS = _Op(
+    "dot_terms",
+    lambda *terms: np.dot(terms[: len(terms) // 2], terms[len(terms) // 2 :]),
+    vjp=_dot_terms,
+)
+_DOT = _Op(
+    "dot",
+    np.dot,
+    vjp=lambda values, z: [
+        lambda g: _dot_gradients(g, *values)[0],
+        lambda g: _dot_gradients(g, *values)[1],
+    ],
+)
+
+
+def dot(x, y):
+    """Computes the dot product of two vectors or matrices. Appends result to
+    the children of whichever inputs are Reverse objects.
+
+    If x and y are lists or tuples, the dot product of their elements is a
+    single node rather than a chain of products and additions.
+
+    Arguments:
+        x {Reverse, np.ndarray, list} -- left operand, a vector or matrix
+        y {Reverse, np.ndarray, list} -- right operand, a vector or matrix
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if x or y is a Reverse object.
+    """
+    if isinstance(x, (list, tuple)) or isinstance(y, (list, tuple)):
+        if len(x) != len(y):
+            raise ValueError("dot of {} and {} terms".format(len(x), len(y)))
+
+        return _record(_DOT_TERMS, *x, *y)
+
+    x_value = getattr(x, "value", x)
+    y_value = getattr(y, "value", y)
+
+    # products with a scalar are elementwise
+    if np.ndim(x_value) == 0 or np.ndim(y_value) == 0:
+        return x * y
+
+    return _record(_DOT, x, y)
+
+
+_TRANSPOSE = _Op("transpose", np.transpose, vjp=lambda values, z: [np.transpose])
+
+
+def transpose(x):
+    """Transposes a vector or matrix. Appends result to x.children if x is a
+    Reverse object.
+
+    Arguments:
+        x {Reverse, np.ndarray} -- value to transpose
+
+    Returns:
+        {Reverse, np.ndarray} -- Only returns Reverse if x is a Reverse object.
+    """
+    return _record(_TRANSPOSE, x)
+
+
+def _solve_gradients(values, x_value):
+    """Computes the weights of a and b for the solution of a x = b"""
+    a_value = values[0]
+    solved = []
+
+    def b_gradient(gradient):
+        # both weights are applied to the same gradient, so the transposed
+        # system is solved once for the two of them
+        if not solved or solved[0] is not gradient:
+            solved[:] = [gradient, np.linalg.solve(np.transpose(a_value), gradient)]
+        return solved[1]
+
+    def a_gradient(gradient):
+        # -b_gradient x^T, treating a vector right hand side as a column
+        rows = len(x_value)
+        return (
+            -np.reshape(b_gradient(gradient), (rows, -1))
+            @ np.reshape(x_value, (rows, -1)).T
+        )
+
+    return [a_gradient, b_gradient]
+
+
+_SOLVE = _Op("solve", np.linalg.solve, vjp=_solve_gradients)
+
+
+def solve(a, b):
+    """Solves the linear system a x = b for x. Appends result to the children
+    of whichever inputs are Reverse objects.
+
+    The gradient with respect to b is the solution of the transposed system,
+    which is then reused for the gradient with respect to a.
+
+    Arguments:
+        a {Reverse, np.ndarray} -- square coefficient matrix
+        b {Reverse, np.ndarray} -- right hand side, a vector or matrix
+
+    Returns:
+        {Reverse, np.ndarray} -- Only returns Reverse if a or b is a Reverse object.
+    """
+    return _record(_SOLVE, a, b)
+
+
+_INV = _Op("inv", np.linalg.inv, vjp=lambda values, z: [lambda g: -z.T @ g @ z.T])
+
+
+def inv(a):
+    """Computes the inverse of a square matrix. Appends result to a.children
+    if a is a Reverse object.
+
+    Arguments:
+        a {Reverse, np.ndarray} -- square matrix to invert
+
+    Returns:
+        {Reverse, np.ndarray} -- Only returns Reverse if a is a Reverse object.
+    """
+    return _record(_INV, a)
+
+
+_DET = _Op("det", np.linalg.det, vjp=lambda values, z: [z * np.linalg.inv(values[0]).T])
+
+
+def det(a):
+    """Computes the determinant of a square matrix. Appends result to
+    a.children if a is a Reverse object.
+
+    Arguments:
+        a {Reverse, np.ndarray} -- square matrix
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if a is a Reverse object. Else float.
+    """
+    return _record(_DET, a)
+
+
+_LOGDET = _Op(
+    "logdet",
+    lambda a: np.linalg.slogdet(a)[1],
+    vjp=lambda values, z: [np.linalg.inv(values[0]).T],
+)
+
+
+def logdet(a):
+    """Computes the log of the absolute value of the determinant of a square
+    matrix. Appends result to a.children if a is a Reverse object.
+
+    Arguments:
+        a {Reverse, np.ndarray} -- square matrix
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if a is a Reverse object. Else float.
+    """
+    return _record(_LOGDET, a)
+
+
+_NORM = _Op("norm", np.linalg.norm, vjp=lambda values, z: [values[0] / z])
+
+
+def norm(x):
+    """Computes the Euclidean norm of a vector, or the Frobenius norm of a
+    matrix. Appends result to x.children if x is a Reverse object.
+
+    Arguments:
+        x {Reverse, np.ndarray} -- vector or matrix
+
+    Returns:
+        {Reverse, Float} -- Only returns Reverse if x is a Reverse object. Else float.
+    """
+    return _record(_NORM, x)
+
+
 class rVector:
     """The class rVector allows expressions to be combined into multiple
     outputs and then find the gradient of those expressions with respect to
     various inputs.
+
+    The outputs can either be given as a list of Reverse objects or as a
+    single array valued Reverse object, in which case each element of its
+    value is one output.
     """
 
-    def __init__(self, functions: list):
+    def __init__(self, functions):
         """The constructor of rVector
 
         Arguments:
-            functions {list} -- list of functions to evaluate
+            functions {list, Reverse} -- list of functions to evaluate, or a
+                single array valued function
 
         Returns:
             None
@@ -567,14 +2165,18 @@ class rVector:
         >>> vector = rVector(functions)
         >>> print(vector.values)
         [12, 4, 6]
-        >>> print(vector.get_gradients(x))
-        [4.0, 8.0, 0]
-        >>> print(vector.get_gradients(y))
-        [14.0, 2.0, 3.0]
+        >>> print(np.array(vector.get_gradients(x)))
+        [4. 8. 0.]
+        >>> print(np.array(vector.get_gradients(y)))
+        [14.  2.  3.]
         """
 
         self.functions = functions
-        self.values = [i.value for i in self.functions]
+
+        if isinstance(functions, Reverse):
+            self.values = functions.value
+        else:
+            self.values = [i.value for i in self.functions]
 
     def get_gradients(self, variable):
         """Gets the gradient of the provided variable with respect to all the
@@ -586,13 +2188,22 @@ class rVector:
         Returns:
             list -- Gradient of all functions for the input variable
         """
-        gradients = []
-        for i in self.functions:
-            for f in self.functions:
-                f.gradient_value = 0
-            i.gradient_value = 1.0
+        if isinstance(self.functions, Reverse):
+            return self._get_array_gradients(variable)
+
+        return [gradients(f, [variable])[0] for f in self.functions]
+
+    def _get_array_gradients(self, variable):
+        """Gets the gradients of each element of an array valued function by
+        seeding one element at a time.
+        """
+        result = []
+        shape = np.shape(self.values)
+
+        for index in np.ndindex(*shape):
+            seed = np.zeros(shape, dtype=get_precision())
+            seed[index] = 1.0
 
-            gradients.append(variable.get_gradient())
-            variable.reset_gradient()
+            result.append(gradients(self.functions, [variable], seed)[0])
 
-        return gradients
+        return result
@@ -0,0 +1,121 @@
+"""Adapts autodiffpy functions to scipy.optimize.
+
+scipy.optimize.minimize asks for the value and the gradient of the objective through
+two separate callables, fun and jac, which it usually calls one after the other at the
+same point. Since a reverse sweep computes the value along with the gradient anyway,
+ScipyObjective evaluates both at once and keeps them in a small least recently used
+cache (see autodiffpy.memoize) keyed by the bytes of the point, so that each point
+costs exactly one value and gradient pass whichever of the two callables asks for it
+first.
+
+The Hessian vector products for methods such as trust-ncg come from the complex step
+method applied to the reverse mode gradient: for an analytic function the imaginary
+part of the gradient at x + ihp is h times the Hessian applied to p.
+
+scipy is only needed for minimize. The callables of ScipyObjective are plain
+functions of numpy arrays and can be passed to any other optimizer as well.
+"""
+import numpy as np
+
+from autodiffpy.memoize import memoize
+from autodiffpy.reverse import Reverse, gradients, value_and_grad
+
+
+class ScipyObjective:
+    """Wraps a scalar function of an array valued Reverse object into the fun, jac
+    and hessp callables of scipy.optimize.
+
+    Attributes:
+        f - the function being wrapped
+        args - constant arguments passed to f after the point
+        cache - the autodiffpy.memoize.LRUCache of values and gradients
+    """
+
+    def __init__(self, f, args=(), cache_size=4, step=1e-20):
+        """Creates the objective.
+
+        Args:
+            f - scalar function of a Reverse object
+            args - constant arguments passed to f after the point
+            cache_size - the number of points whose value and gradient are kept,
+                the least recently used one is evicted first
+            step - the size of the imaginary step used by hessp
+        """
+        self.f = f
+        self.args = tuple(args)
+        self.step = step
+
+        # the cache is keyed by the point only, the constant arguments such as
+        # a dataset would otherwise be copied into the key of every entry
+        evaluate, args = value_and_grad(f), self.args
+        self._evaluate = memoize(lambda x: evaluate(x, *args), capacity=cache_size)
+        self.cache = self._evaluate.cache
+
+    @property
+    def hits(self):
+        """The number of calls answered from the cache"""
+        return self.cache.hits
+
+    @property
+    def misses(self):
+        """The number of calls which evaluated f"""
+        return self.cache.misses
+
+    def value_and_grad(self, x):
+        """Returns the value and gradient of f at x, evaluating f only if x is not
+        in the cache.
+        """
+        return self._evaluate(np.asarray(x, dtype=float))
+
+    def fun(self, x):
+        """The value of f at x"""
+        return float(self.value_and_grad(x)[0])
+
+    def jac(self, x):
+        """The gradient of f at x"""
+        return self.value_and_grad(x)[1]
+
+    def hessp(self, x, p):
+        """The Hessian of f at x applied to the vector p"""
+        point = Reverse(np.asarray(x, dtype=float) + 1j * self.step * np.asarray(p))
+        out = self.f(point, *self.args)
+
+        if not isinstance(out, Reverse):
+            return np.zeros(np.shape(x))
+
+        return np.imag(gradients(out, [point])[0]) / self.step
+
+    def clear(self):
+        """Empties the cache"""
+        self.cache.clear()
+
+
+def minimize(f, x0, args=(), method="L-BFGS-B", cache_size=4, **kwargs):
+    """Minimizes f with scipy.optimize.minimize, passing the gradient and, for the
+    methods that use it, the Hessian vector product.
+
+    Args:
+        f - scalar function of a Reverse object
+        x0 - the starting point
+        args - constant arguments passed to f after the point
+        method - the scipy.optimize.minimize method
+        cache_size - the number of points whose value and gradient are kept
+        kwargs - any other arguments of scipy.optimize.minimize
+
+    Returns:
+        The scipy.optimize.OptimizeResult, with the ScipyObjective that was used as
+        its objective attribute.
+    """
+    from scipy import optimize
+
+    objective = ScipyObjective(f, args, cache_size)
+
+    if method.lower() in ("newton-cg", "trust-ncg", "trust-krylov", "trust-constr"):
+        kwargs.setdefault("hessp", objective.hessp)
+
+    result = optimize.minimize(
+        objective.fun, x0, jac=objective.jac, method=method, **kwargs
+    )
+    result.objective = objective
+
+    return result
@@ -0,0 +1,270 @@
+"""Serves values and gradients of registered functions with micro-batching.
+
+Evaluating a function at a single point builds a graph of Python objects whose cost
+does not depend on how much numeric work they do, so answering requests one point at
+a time is bound by that overhead. GradientService instead collects the requests for
+each registered function that arrive within a short window and evaluates them as one
+batch with Forward.batched variables, which costs about as much as a single point,
+then hands every caller its own value and gradient. If the batch raises, its points
+are evaluated one at a time, so that only the callers whose points fail get the error.
+
+The window closes when max_batch_size requests are waiting or max_latency seconds
+after the first one arrived, whichever comes first. The functions are written for
+scalar inputs with the operators and functions of the top-level autodiffpy package,
+as for check_gradients, for example lambda x, y: ad.sin(x * y) + x ** 2.
+
+The service can be used in-process from asyncio code with await service.evaluate,
+or on localhost with serve, which answers newline delimited JSON requests of the form
+{"id": 1, "function": "f", "point": [1.0, 2.0]} with
+{"id": 1, "value": ..., "gradient": [...]} or {"id": 1, "error": "..."}.
+
+The batches are evaluated on the event loop, so they should be small enough that
+max_latency stays meaningful for the other callers.
+"""
+import asyncio
+import json
+
+import numpy as np
+
+from autodiffpy.gradcheck import _forward_gradients
+
+
+def _result(value, gradient):
+    """Returns the value and gradient of a point, or the error of
+    Forward.get_gradient if the gradient does not exist there
+    """
+    if np.any(np.isnan(gradient)):
+        return ValueError("Gradient does not exist!")
+
+    return value, gradient
+
+
+def _evaluate_point(f, point):
+    """Evaluates f and its gradient at a single point, returning the error
+    instead of raising it
+    """
+    try:
+        values, gradients = _forward_gradients(f, point[np.newaxis])
+    except Exception as error:
+        return error
+
+    return _result(values[0], gradients[0])
+
+
+class ServiceMetrics:
+    """Counters of the work done by a GradientService.
+
+    Attributes:
+        requests - the number of requests that were answered
+        batches - the number of batches that were evaluated
+        largest_batch - the size of the largest batch
+        max_queue_depth - the largest number of requests that were waiting at once
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.max_queue_depth = 0
+
+    @property
+    def mean_batch_size(self):
+        """The average number of requests per batch"""
+        return self.requests / self.batches if self.batches else 0.0
+
+    def __str__(self):
+        return "{} requests in {} batches (mean {:.1f}, largest {}), queue {}".format(
+            self.requests,
+            self.batches,
+            self.mean_batch_size,
+            self.largest_batch,
+            self.max_queue_depth,
+        )
+
+
+class GradientService:
+    """Evaluates registered functions and their gradients, coalescing concurrent
+    requests into batches.
+
+    Attributes:
+        max_batch_size - the largest number of requests evaluated together
+        max_latency - the number of seconds a request waits for others to join
+            its batch
+        metrics - the ServiceMetrics of the service
+    """
+
+    def __init__(self, max_batch_size=256, max_latency=0.002):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.metrics = ServiceMetrics()
+        self._functions = {}
+        self._queues = {}
+        self._workers = {}
+
+    def register(self, name, f, inputs):
+        """Registers f under name.
+
+        Args:
+            name - the name requests refer to f by
+            f - scalar function of inputs scalar arguments
+            inputs - the number of arguments of f
+        """
+        self._functions[name] = (f, inputs)
+
+    @property
+    def queue_depth(self):
+        """The number of requests currently waiting to be evaluated"""
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    async def evaluate(self, name, point):
+        """Returns the value and gradient of the function registered under name
+        at point, evaluated in a batch with any concurrent requests.
+
+        Args:
+            name - the name of a registered function
+            point - the values of its arguments
+
+        Returns:
+            The value, and the gradient as an array with one entry per argument.
+        """
+        if name not in self._functions:
+            raise ValueError("Unknown function {}".format(name))
+
+        _, inputs = self._functions[name]
+        point = np.asarray(point, dtype=float)
+        if point.shape != (inputs,):
+            raise ValueError("{} takes {} inputs".format(name, inputs))
+
+        if name not in self._workers:
+            self._queues[name] = asyncio.Queue()
+            self._workers[name] = asyncio.ensure_future(self._work(name))
+
+        future = asyncio.get_event_loop().create_future()
+        await self._queues[name].put((point, future))
+        self.metrics.max_queue_depth = max(
+            self.metrics.max_queue_depth, self.queue_depth
+        )
+
+        return await future
+
+    async def _work(self, name):
+        """Collects the requests for name into batches and evaluates them"""
+        queue = self._queues[name]
+        loop = asyncio.get_event_loop()
+
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_latency
+
+            try:
+                while len(batch) < self.max_batch_size:
+                    if not queue.empty():
+                        batch.append(queue.get_nowait())
+                        continue
+
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # the requests taken off the queue are no longer in it for close()
+                for _, future in batch:
+                    future.cancel()
+                raise
+
+            self._run(name, batch)
+
+    def _run(self, name, batch):
+        """Evaluates a batch and hands the results to the waiting requests"""
+        f = self._functions[name][0]
+        points = np.stack([point for point, _ in batch])
+
+        try:
+            results = [_result(*r) for r in zip(*_forward_gradients(f, points))]
+        except Exception as error:
+            # a bad point fails the whole batch, so the points are evaluated on
+            # their own to fail only the requests they came from
+            if len(batch) == 1:
+                results = [error]
+            else:
+                results = [_evaluate_point(f, point) for point, _ in batch]
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        self.metrics.requests += len(batch)
+        self.metrics.batches += 1
+        self.metrics.largest_batch = max(self.metrics.largest_batch, len(batch))
+
+    async def close(self):
+        """Stops evaluating batches. Requests that are still waiting are cancelled."""
+        for worker in self._workers.values():
+            worker.cancel()
+
+        for queue in self._queues.values():
+            while not queue.empty():
+                queue.get_nowait()[1].cancel()
+
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+
+async def _answer(service, line, writer):
+    """Answers one JSON request line"""
+    request = {}
+    try:
+        request = json.loads(line)
+        value, gradient = await service.evaluate(request["function"], request["point"])
+        response = {"value": float(value), "gradient": gradient.tolist()}
+    except Exception as error:
+        response = {"error": "{}: {}".format(type(error).__name__, error)}
+
+    if isinstance(request, dict) and "id" in request:
+        response["id"] = request["id"]
+
+    writer.write((json.dumps(response) + "\n").encode())
+
+
+async def serve(service, host="127.0.0.1", port=0):
+    """Starts answering newline delimited JSON requests for service.
+
+    Every line is answered as soon as its batch is done, so responses may come back
+    out of order and should be matched by their id.
+
+    Args:
+        service - the GradientService to answer from
+        host - the address to listen on
+        port - the port to listen on, 0 for any free port
+
+    Returns:
+        The asyncio server. Its address is server.sockets[0].getsockname().
+    """
+
+    async def handle(reader, writer):
+        pending = set()
+
+        try:
+            async for line in reader:
+                task = asyncio.ensure_future(_answer(service, line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            await asyncio.gather(*pending)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,174 @@
+"""Computes the gradient of a loss summed over a large dataset on a process pool.
+
+A loss which is a sum over records cannot be differentiated with one graph over
+the whole dataset, since every record adds its own nodes. ShardedGradient splits
+the records into chunks instead, and each worker process evaluates value_and_grad
+of the loss over one chunk at a time. The per-chunk values and gradients are added
+up pairwise, as a balanced tree, which keeps the rounding error of the sum of many
+chunks small. Each chunk is evaluated in the precision of the process that calls
+the ShardedGradient (see autodiffpy.precision), and the chunk results are converted
+to float64 before they are added up. A floating point dataset is stored in the
+precision that is set when the ShardedGradient is created.
+
+The dataset is copied once into shared memory, which every worker maps when it
+starts, so a task only carries the parameters and the bounds of its chunk and the
+records are never pickled. The loss function is sent with every task, so it has to
+be picklable, that is defined at the top level of a module.
+
+Shared memory needs Python 3.8 or later. The module can be imported on older
+versions, but creating a ShardedGradient raises a RuntimeError there.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+import numpy as np
+
+from autodiffpy.precision import _accumulator, _round, get_precision, precision
+from autodiffpy.reverse import value_and_grad
+
+# the dataset as seen by a worker process
+_MEMORY = None
+_DATA = None
+
+
+def _attach(name, shape, dtype):
+    """Maps the shared dataset in a worker process"""
+    global _MEMORY, _DATA
+
+    _MEMORY = shared_memory.SharedMemory(name=name)
+    _DATA = np.ndarray(shape, dtype=dtype, buffer=_MEMORY.buf)
+
+
+def _chunk_value_and_grad(loss_fn, params, start, stop, args):
+    """Evaluates the loss and its gradient over the records start to stop, in
+    the precision of params.
+    """
+    with precision(params.dtype):
+        return value_and_grad(loss_fn)(params, _DATA[start:stop], *args)
+
+
+def _upcast(value):
+    """Converts a value to the type it is accumulated in"""
+    value = np.asarray(value)
+    return value.astype(_accumulator(value.dtype))[()]
+
+
+def _tree_sum(results):
+    """Adds up (value, gradient) pairs pairwise"""
+    results = [(_upcast(value), _upcast(gradient)) for value, gradient in results]
+
+    while len(results) > 1:
+        pairs = zip(results[0::2], results[1::2])
+        summed = [(a[0] + b[0], a[1] + b[1]) for a, b in pairs]
+        if len(results) % 2:
+            summed.append(results[-1])
+        results = summed
+
+    return results[0]
+
+
+class ShardedGradient:
+    """Evaluates a loss summed over the records of a dataset, and its gradient,
+    on a pool of worker processes which share the dataset.
+
+    The pool and the shared memory are kept until close is called, so that
+    an optimizer can evaluate the gradient many times.
+
+    Attributes:
+        loss_fn - the loss of a chunk of records
+        chunk - the number of records per task
+        workers - the number of worker processes
+    """
+
+    def __init__(self, loss_fn, data, workers=None, chunk=1024, args=()):
+        """Copies data into shared memory and starts the worker processes.
+
+        Args:
+            loss_fn - picklable scalar function loss_fn(params, records, *args) of
+                a Reverse object params and an array of records, the rows of data
+            data - the dataset, with one record per row
+            workers - the number of processes, by default one per processor
+            chunk - the number of records per task
+            args - constant arguments passed to loss_fn after the records
+        """
+        if shared_memory is None:
+            raise RuntimeError(
+                "ShardedGradient needs multiprocessing.shared_memory, Python 3.8+"
+            )
+        if chunk < 1:
+            raise ValueError("chunk must be at least 1")
+
+        data = np.ascontiguousarray(_round(np.asarray(data)))
+        if len(data) == 0:
+            raise ValueError("the dataset is empty")
+
+        self.loss_fn = loss_fn
+        self.workers = workers or os.cpu_count()
+        self.chunk = chunk
+        self.args = tuple(args)
+        self._length = len(data)
+
+        self._memory = shared_memory.SharedMemory(create=True, size=data.nbytes)
+        np.ndarray(data.shape, dtype=data.dtype, buffer=self._memory.buf)[...] = data
+
+        self._pool = ProcessPoolExecutor(
+            self.workers,
+            initializer=_attach,
+            initargs=(self._memory.name, data.shape, data.dtype.str),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, params):
+        """Returns the loss summed over all records and its gradient at params"""
+        params = np.array(params, dtype=get_precision())
+        futures = [
+            self._pool.submit(
+                _chunk_value_and_grad,
+                self.loss_fn,
+                params,
+                start,
+                min(start + self.chunk, self._length),
+                self.args,
+            )
+            for start in range(0, self._length, self.chunk)
+        ]
+
+        return _tree_sum(future.result() for future in futures)
+
+    def close(self):
+        """Stops the worker processes and frees the shared memory"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._memory.close()
+            self._memory.unlink()
+
+
+def sharded_grad(loss_fn, params, data, workers=None, chunk=1024, args=()):
+    """Computes a loss summed over the records of data and its gradient with
+    respect to params, in chunks of records spread over a pool of processes.
+
+    Args:
+        loss_fn - picklable scalar function loss_fn(params, records, *args) of a
+            Reverse object params and an array of records, the rows of data
+        params - the point
+        data - the dataset, with one record per row
+        workers - the number of processes, by default one per processor
+        chunk - the number of records per task
+        args - constant arguments passed to loss_fn after the records
+
+    Returns:
+        The summed loss, and its gradient, which has the shape of params.
+    """
+    with ShardedGradient(loss_fn, data, workers, chunk, args) as evaluate:
+        return evaluate(params)
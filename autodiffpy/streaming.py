@@ -0,0 +1,136 @@
+"""Accumulates the gradient of a sum of losses over a stream of records.
+
+Differentiating a sum over records with a single graph keeps the nodes of every
+record alive until the end. GradientAccumulator instead builds the graph of one
+record, or one mini-batch of records, at a time, adds its value and gradient into
+running totals and drops the graph before the next one is built.
+The memory used is that of one mini-batch, however long the stream is, so the
+records can come from a generator that reads them lazily.
+
+Each mini-batch gets its own Reverse input for the parameters. Once its gradient is
+known, the edges of the nodes recorded for it are removed, which detaches them from
+the children of any Reverse objects that the loss function shares between
+mini-batches, so those do not collect an edge for every mini-batch. The graphs those shared objects
+belong to are left as they are, so they can still be differentiated.
+
+The graphs are built in the working precision (see autodiffpy.precision), and
+arrays of records are rounded to it, but the running totals are kept in float64,
+since a float32 total stops changing once it is large compared to the loss of a
+single mini-batch.
+"""
+from itertools import islice
+
+import numpy as np
+
+from autodiffpy.precision import _accumulator, _round, get_precision
+from autodiffpy.reverse import Reverse, _recording, _topological_order, gradients
+
+
+def _release(output, created):
+    """Removes the edges from the older ancestors of output to the nodes of its
+    graph whose ids are in created. Their edges to other children are kept.
+    """
+    for node in _topological_order(output):
+        if id(node) not in created:
+            node.children = [
+                edge for edge in node.children if id(edge[1]) not in created
+            ]
+
+
+class GradientAccumulator:
+    """Running totals of a loss and its gradient over records.
+
+    Attributes:
+        loss_fn - the loss of a record or mini-batch
+        params - the point the gradient is taken at
+        value - the total loss of the records added so far
+        gradient - the total gradient of the records added so far, with the
+            shape of params
+        count - the number of records or mini-batches added so far
+    """
+
+    def __init__(self, loss_fn, params, args=()):
+        """Creates an empty accumulator.
+
+        Args:
+            loss_fn - scalar function loss_fn(params, records, *args) of a Reverse
+                object params and a record or mini-batch
+            params - the point
+            args - constant arguments passed to loss_fn after the records
+        """
+        self.loss_fn = loss_fn
+        self.params = np.array(params, dtype=get_precision())
+        self.args = tuple(args)
+        self.reset()
+
+    def reset(self):
+        """Sets the totals back to zero"""
+        dtype = _accumulator(self.params.dtype)
+        self.value = dtype.type(0)
+        self.gradient = np.zeros(np.shape(self.params), dtype=dtype)
+        self.count = 0
+
+    def add(self, records):
+        """Adds the loss of a record or mini-batch and its gradient to the totals.
+
+        Returns:
+            The loss of records.
+        """
+        x = Reverse(self.params)
+        with _recording() as created:
+            out = self.loss_fn(x, _round(records), *self.args)
+
+        if isinstance(out, Reverse):
+            value, gradient = out.value, gradients(out, [x])[0]
+            _release(out, created)
+        else:
+            value, gradient = out, 0.0
+
+        self.value += value
+        self.gradient += gradient
+        self.count += 1
+        return value
+
+    def add_all(self, records, batch_size=None):
+        """Adds the records of an iterable, one graph at a time.
+
+        Args:
+            records - iterable of records, which may be a generator
+            batch_size - if given, consecutive records are stacked into arrays of
+                up to batch_size records, and loss_fn is called once per array
+
+        Returns:
+            The totals, value and gradient.
+        """
+        records = iter(records)
+
+        if batch_size is None:
+            for record in records:
+                self.add(record)
+        else:
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                self.add(np.stack(batch))
+
+        return self.value, self.gradient
+
+
+def stream_grad(loss_fn, params, records, batch_size=None, args=()):
+    """Computes a loss summed over a stream of records and its gradient with
+    respect to params, keeping the graph of one record or mini-batch at a time.
+
+    Args:
+        loss_fn - scalar function loss_fn(params, records, *args) of a Reverse
+            object params and a record, or an array of batch_size records
+        params - the point
+        records - iterable of records, which may be a generator
+        batch_size - if given, the number of records stacked into each call of
+            loss_fn
+        args - constant arguments passed to loss_fn after the records
+
+    Returns:
+        The summed loss, and its gradient, which has the shape of params.
+    """
+    return GradientAccumulator(loss_fn, params, args).add_all(records, batch_size)
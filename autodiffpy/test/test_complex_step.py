@@ -0,0 +1,63 @@
+from autodiffpy.complex_step import complex_step_grad
+from autodiffpy import forward, reverse
+from pytest import approx
+import numpy as np
+
+
+def fun(x):
+    return x[..., 0] * np.sin(x[..., 1]) + np.exp(x[..., 0] * x[..., 2])
+
+
+def test_scalar():
+    assert complex_step_grad(np.sin, 1.0) == approx(np.cos(1.0), rel=1e-15)
+    assert complex_step_grad(lambda x: x ** 3, 2.0) == approx(12, rel=1e-15)
+
+
+def test_gradient():
+    grad = complex_step_grad(fun, [1.0, 2.0, 0.5])
+
+    assert grad == approx(
+        [np.sin(2) + 0.5 * np.exp(0.5), np.cos(2), np.exp(0.5)], rel=1e-14
+    )
+
+
+def test_jacobian():
+    def vector_fun(x):
+        return np.stack([x[..., 0] * x[..., 1], x[..., 1] ** 2], axis=-1)
+
+    jacobian = complex_step_grad(vector_fun, [2.0, 3.0])
+
+    assert jacobian[0] == approx([3, 2])
+    assert jacobian[1] == approx([0, 6])
+
+
+def test_batch_of_points():
+    points = np.random.RandomState(0).uniform(-1, 1, size=(50, 3))
+    grads = complex_step_grad(fun, points)
+
+    assert grads.shape == (50, 3)
+    for point, grad in zip(points, grads):
+        assert grad == approx(complex_step_grad(fun, point))
+
+
+def test_unbatched():
+    def single_point(x):
+        return x[0] * np.sin(x[1]) + np.exp(x[0] * x[2])
+
+    assert complex_step_grad(single_point, [1.0, 2.0, 0.5], batched=False) == approx(
+        complex_step_grad(fun, [1.0, 2.0, 0.5])
+    )
+
+
+def test_agrees_with_forward_and_reverse():
+    point = np.array([0.3, -1.2, 0.7])
+    expected = complex_step_grad(fun, point)
+
+    x = forward.Forward("x", point)
+    f = x[0] * forward.sin(x[1]) + forward.exp(x[0] * x[2])
+    assert f.get_gradient("x") == approx(expected)
+
+    x = reverse.Reverse(point)
+    f = x[0] * reverse.sin(x[1]) + reverse.exp(x[0] * x[2])
+    f.gradient_value = 1.0
+    assert x.get_gradient() == approx(expected)
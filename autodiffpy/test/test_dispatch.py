@@ -0,0 +1,46 @@
+import autodiffpy as ad
+from autodiffpy.forward import Forward, sin
+from autodiffpy.reverse import Reverse, gradients
+from pytest import approx
+import numpy as np
+
+
+def test_forward_dispatch():
+    x = Forward("x", 2.0)
+    f = ad.sum([x, 3.0, sin(x)])
+
+    assert isinstance(f, Forward)
+    assert f.value == approx(5 + np.sin(2))
+    assert f.get_gradient("x") == approx(1 + np.cos(2))
+
+    f = ad.dot([1.0, 2.0], [x, x])
+    assert f.get_gradient("x") == approx(3)
+
+
+def test_reverse_dispatch():
+    x = Reverse(2.0)
+    f = ad.prod([x, 3.0, x])
+    f.gradient_value = 1.0
+
+    assert isinstance(f, Reverse)
+    assert f.value == approx(12)
+    assert x.get_gradient() == approx(12)
+
+
+def test_plain_values():
+    assert ad.sum([1.0, 2.0]) == approx(3)
+    assert ad.prod(np.array([2.0, 3.0])) == approx(6)
+    assert ad.logsumexp([0.0, 0.0]) == approx(np.log(2))
+    assert ad.cumsum([1.0, 2.0]) == approx([1, 3])
+    assert ad.stack([1.0, 2.0]) == approx([1, 2])
+
+
+def test_piecewise_dispatch():
+    x = Forward("x", -2.0)
+    y = Reverse(-2.0)
+
+    assert ad.abs(x).get_gradient("x") == approx(-1)
+    assert gradients(ad.abs(y), [y]) == approx([-1])
+    assert ad.maximum(x, -3.0).get_gradient("x") == approx(1)
+    assert ad.where([True, False], [1.0, 2.0], [3.0, 4.0]) == approx([1, 4])
+    assert ad.clip(5.0, 0.0, 1.0) == approx(1)
@@ -0,0 +1,75 @@
+from autodiffpy.elimination import elimination_jacobian
+from autodiffpy.reverse import Reverse, cos, exp, sin, sum, gradients
+from pytest import approx, raises
+import numpy as np
+
+
+def waist(n):
+    """n inputs squeezed through a single node into n outputs"""
+    xs = [Reverse(0.1 * i) for i in range(n)]
+    s = xs[0] ** 2
+    for x in xs[1:]:
+        s = s + x ** 2
+    return xs, [sin(k * s) for k in range(1, n + 1)]
+
+
+def test_elimination_jacobian():
+    x = Reverse(0.5)
+    y = Reverse(2.0)
+    outputs = [x * y + exp(x), sin(x * y), y]
+
+    expected = np.array(
+        [
+            [2 + np.exp(0.5), 0.5],
+            [2 * np.cos(1), 0.5 * np.cos(1)],
+            [0, 1],
+        ]
+    )
+    for order in ["markowitz", "forward", "reverse"]:
+        result = elimination_jacobian(outputs, [x, y], order)
+        assert result.jacobian == approx(expected)
+        assert result.order == order
+
+
+def test_elimination_matches_gradients():
+    xs, outputs = waist(10)
+    result = elimination_jacobian(outputs, xs)
+
+    for row, output in zip(result.jacobian, outputs):
+        assert row == approx(gradients(output, xs))
+
+
+def test_elimination_flops():
+    xs, outputs = waist(10)
+    result = elimination_jacobian(outputs, xs)
+
+    assert result.flops == 158
+    assert (result.forward_flops, result.reverse_flops) == (354, 300)
+    assert result.flops < min(result.forward_flops, result.reverse_flops)
+    assert str(result).startswith("markowitz order: 158 multiplications")
+
+    # the counts of the pure orders match eliminating in those orders
+    assert elimination_jacobian(outputs, xs, "forward").flops == 354
+    assert elimination_jacobian(outputs, xs, "reverse").flops == 300
+
+
+def test_elimination_constant_and_repeated_inputs():
+    x = Reverse(3.0)
+    unrelated = Reverse(1.0)
+    result = elimination_jacobian([x * x, cos(unrelated)], [x])
+
+    assert result.jacobian == approx(np.array([[6], [0]]))
+
+
+def test_elimination_errors():
+    x = Reverse(1.0)
+    v = Reverse([1.0, 2.0])
+
+    with raises(ValueError):
+        elimination_jacobian([x], [x], order="sideways")
+
+    with raises(ValueError):
+        elimination_jacobian([sum(v * x)], [x])
+
+    with raises(ValueError):
+        elimination_jacobian([1.0], [x])
@@ -26,7 +26,31 @@ from autodiffpy.forward import (
     log10,
     log,
     logistic,
+    sum,
+    transpose,
+    matmul,
+    dot,
+    solve,
+    inv,
+    det,
+    logdet,
+    norm,
+    prod,
+    logsumexp,
+    stack,
+    cumsum,
+    where,
+    softplus,
+    log1p,
+    expm1,
+    softmax,
+    maximum,
+    minimum,
+    clip,
 )
+from autodiffpy.forward import abs as fabs
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from pytest import approx, raises
 import numpy as np
 
@@ -573,3 +597,377 @@ def test_invalid_creation():
 
     with raises(ValueError):
         Forward()
+
+
+def _numeric_jacobian(fun, x, h=1e-6):
+    x = np.asarray(x, dtype=float)
+    columns = []
+
+    for index in np.ndindex(*x.shape):
+        step = np.zeros_like(x)
+        step[index] = h
+        columns.append((fun(x + step) - fun(x - step)) / (2 * h))
+
+    # stack the variable axes behind the value axes
+    return np.moveaxis(np.array(columns), 0, -1).reshape(np.shape(fun(x)) + x.shape)
+
+
+A = np.array([[4.0, 1.0, 0.5], [1.0, 3.0, -1.0], [0.5, -1.0, 5.0]])
+B = np.array([1.0, -2.0, 0.5])
+
+
+def test_array_var():
+    x = Forward("x", [1.0, 2.0])
+    f = sin(x) * x
+
+    assert f.value == approx(np.sin([1, 2]) * [1, 2])
+    assert f.get_gradient("x") == approx(
+        np.diag(np.cos([1, 2]) * [1, 2] + np.sin([1, 2]))
+    )
+    assert f.get_gradient("y") == approx(0)
+
+
+def test_array_broadcasting():
+    x = Forward("x", 2.0)
+    v = Forward("v", [1.0, 2.0])
+
+    f = x * v
+    assert f.get_gradient("x") == approx([1, 2])
+    assert f.get_gradient("v") == approx(2 * np.eye(2))
+
+    f = sum(v) * v
+    assert f.value == approx([3, 6])
+    assert f.get_gradient("v") == approx(np.array([[4, 1], [2, 5]]))
+
+
+def test_array_indexing():
+    m = Forward("m", A)
+    f = m[1] * m[:, 0]
+
+    expected = _numeric_jacobian(lambda a: a[1] * a[:, 0], A)
+    assert f.value == approx(A[1] * A[:, 0])
+    assert f.get_gradient("m") == approx(expected)
+
+
+def test_transpose_many_axes():
+    X = np.random.RandomState(0).randn(2, 3, 4)
+    C = np.arange(24.0).reshape(4, 3, 2)
+    f = Forward("x", X).T * C
+
+    assert f.value == approx(X.T * C)
+    assert f.get_gradient("x") == approx(_numeric_jacobian(lambda a: a.T * C, X))
+
+    f = Forward.batched("x", X).T
+    assert f.get_gradient("x") == approx(np.ones((4, 3, 2)))
+
+
+def test_matmul():
+    x = Forward("x", B)
+    f = A @ x
+
+    assert f.value == approx(A @ B)
+    assert f.get_gradient("x") == approx(A)
+
+    f = x @ A
+    assert f.get_gradient("x") == approx(A.T)
+
+    f = dot(x, x)
+    assert f.value == approx(B @ B)
+    assert f.get_gradient("x") == approx(2 * B)
+
+    m = Forward("m", A)
+    f = matmul(m, transpose(m))
+    assert f.value == approx(A @ A.T)
+    assert f.get_gradient("m") == approx(_numeric_jacobian(lambda a: a @ a.T, A))
+
+    f = matmul(Forward("c", 2.0), x)
+    assert f.get_gradient("c") == approx(B)
+
+
+def test_least_squares():
+    x = Forward("x", B)
+    f = norm(A @ x - 1) ** 2
+
+    residual = A @ B - 1
+    assert f.value == approx(residual @ residual)
+    assert f.get_gradient("x") == approx(2 * A.T @ residual)
+
+
+def test_solve():
+    m = Forward("m", A)
+    b = Forward("b", B)
+    f = solve(m, b)
+
+    assert f.value == approx(np.linalg.solve(A, B))
+    assert f.get_gradient("b") == approx(np.linalg.inv(A))
+    assert f.get_gradient("m") == approx(
+        _numeric_jacobian(lambda a: np.linalg.solve(a, B), A)
+    )
+
+    rhs = np.stack([B, 2 * B], axis=1)
+    f = solve(m, rhs)
+    assert f.get_gradient("m") == approx(
+        _numeric_jacobian(lambda a: np.linalg.solve(a, rhs), A)
+    )
+
+
+def test_inv_det():
+    m = Forward("m", A)
+
+    f = inv(m)
+    assert f.value == approx(np.linalg.inv(A))
+    assert f.get_gradient("m") == approx(_numeric_jacobian(np.linalg.inv, A))
+
+    f = det(m)
+    assert f.value == approx(np.linalg.det(A))
+    assert f.get_gradient("m") == approx(np.linalg.det(A) * np.linalg.inv(A).T)
+
+    f = logdet(m)
+    assert f.value == approx(np.log(np.linalg.det(A)))
+    assert f.get_gradient("m") == approx(np.linalg.inv(A).T)
+
+
+def test_gaussian_log_likelihood():
+    m = Forward("m", A)
+    f = -0.5 * (B @ solve(m, B)) - 0.5 * logdet(m)
+
+    def likelihood(a):
+        return -0.5 * B @ np.linalg.solve(a, B) - 0.5 * np.linalg.slogdet(a)[1]
+
+    assert f.value == approx(likelihood(A))
+    assert f.get_gradient("m") == approx(_numeric_jacobian(likelihood, A))
+
+
+def test_sum_axis():
+    m = Forward("m", A)
+    f = sum(m * m, axis=0)
+
+    assert f.value == approx(np.sum(A * A, axis=0))
+    assert f.get_gradient("m") == approx(
+        _numeric_jacobian(lambda a: np.sum(a * a, axis=0), A)
+    )
+
+
+def test_sum_of_list():
+    xs = [Forward("x{}".format(i), i) for i in range(1000)]
+    f = sum(xs + [2]) * 2
+
+    assert f.value == approx(2 * (999 * 1000 / 2 + 2))
+    assert f.get_gradient("x0") == approx(2)
+    assert f.get_gradient("x999") == approx(2)
+
+
+def test_prod():
+    x = Forward("x", 2.0)
+    y = Forward("y", 0.0)
+    f = prod([x, y, 3.0, x])
+
+    assert f.value == approx(0)
+    assert f.get_gradient("x") == approx(0)
+    assert f.get_gradient("y") == approx(12)
+
+    v = Forward("v", [1.0, 2.0, 0.0, 4.0])
+    f = prod(v)
+    assert f.value == approx(0)
+    assert f.get_gradient("v") == approx([0, 0, 8, 0])
+
+
+def test_dot_of_lists():
+    x = Forward("x", 2.0)
+    y = Forward("y", -1.0)
+    f = dot([x, y, 3.0], [y, x, x])
+
+    assert f.value == approx(-2 - 2 + 6)
+    assert f.get_gradient("x") == approx(-1 - 1 + 3)
+    assert f.get_gradient("y") == approx(2 + 2)
+
+    with raises(ValueError):
+        dot([x, y, 3.0], [y, x])
+
+
+def test_logsumexp():
+    x = Forward("x", 1000.0)
+    y = Forward("y", 1000.0)
+    f = logsumexp([x, y])
+
+    assert f.value == approx(1000 + np.log(2))
+    assert f.get_gradient("x") == approx(0.5)
+
+    v = Forward("v", [0.0, np.log(3.0)])
+    f = logsumexp(v)
+    assert f.value == approx(np.log(4))
+    assert f.get_gradient("v") == approx([0.25, 0.75])
+
+
+def test_stack_cumsum():
+    x = Forward("x", 2.0)
+    y = Forward("y", 3.0)
+
+    f = stack([x, x * y, 1.0])
+    assert f.value == approx([2, 6, 1])
+    assert f.get_gradient("x") == approx([1, 3, 0])
+    assert f.get_gradient("y") == approx([0, 2, 0])
+
+    f = cumsum([x, x * y, 1.0])
+    assert f.value == approx([2, 8, 9])
+    assert f.get_gradient("x") == approx([1, 4, 4])
+    assert f.get_gradient("y") == approx([0, 2, 2])
+
+    f = cumsum(Forward("v", [1.0, 2.0, 3.0]))
+    assert f.get_gradient("v") == approx(np.tril(np.ones((3, 3))))
+
+
+def test_prod_cumsum_of_arrays():
+    a = Forward("a", [1.0, 2.0, 0.0])
+    f = prod([a, np.array([3.0, 4.0, 5.0]), 2.0])
+
+    assert f.value == approx([6, 16, 0])
+    assert f.get_gradient("a") == approx(np.diag([6, 8, 10]))
+
+    M = np.arange(6.0).reshape(2, 3)
+    for axis in (None, 0, 1):
+        f = cumsum(Forward("m", M), axis=axis)
+
+        assert f.value == approx(np.cumsum(M, axis=axis))
+        assert f.get_gradient("m") == approx(
+            _numeric_jacobian(lambda m: np.cumsum(m, axis=axis), M)
+        )
+
+
+def test_batched():
+    x = Forward.batched("x", [1.0, 2.0, 3.0])
+    y = Forward("y", 2.0)
+    f = sin(x) * y
+
+    assert f.value == approx(2 * np.sin([1, 2, 3]))
+    assert f.get_gradient("x") == approx(2 * np.cos([1, 2, 3]))
+    assert f.get_gradient("y") == approx(np.sin([1, 2, 3]))
+
+
+def test_constant_input():
+    x = Forward("x", 2.0)
+    p = Forward.constant_input("p", 3.0)
+    f = p * x ** 2 + exp(p)
+
+    assert f.value == approx(12 + np.exp(3))
+    assert f.get_gradient("x") == approx(12)
+    assert f.get_gradient("p") == 0
+    assert p.derivatives == {}
+    assert exp(p).derivatives == {}
+
+
+def test_wrt():
+    with Forward.wrt("x"):
+        x = Forward("x", 2.0)
+        y = Forward("y", 3.0)
+        v = Forward("v", [1.0, 2.0])
+        b = Forward.batched("b", [1.0, 2.0])
+
+    assert list(x.derivatives) == ["x"]
+    assert y.derivatives == {} and v.derivatives == {} and b.derivatives == {}
+
+    f = x * y + sin(y)
+    assert f.get_gradient("x") == approx(3)
+    assert f.get_gradient("y") == 0
+
+    # differentiation is back to normal after the block
+    assert Forward("y", 3.0).derivatives == {"y": 1}
+
+
+def test_wrt_is_thread_local():
+    entered = threading.Barrier(2)
+
+    def work(name):
+        with Forward.wrt(name):
+            entered.wait()
+            x, y = Forward("x", 1.0), Forward("y", 1.0)
+            entered.wait()
+        return list(x.derivatives), list(y.derivatives)
+
+    with ThreadPoolExecutor(2) as pool:
+        first, second = pool.map(work, ["x", "y"])
+
+    assert first == (["x"], [])
+    assert second == ([], ["y"])
+    assert Forward("y", 3.0).derivatives == {"y": 1}
+
+
+def test_piecewise():
+    x = Forward.batched("x", np.array([-2.0, 0.0, 0.5, 3.0]))
+
+    f = fabs(x)
+    assert f.value == approx([2, 0, 0.5, 3])
+    assert f.get_gradient("x") == approx([-1, 0, 1, 1])
+    assert abs(-x).value == approx([2, 0, 0.5, 3])
+
+    f = where(x.value < 0, x ** 2, 3 * x)
+    assert f.value == approx([4, 0, 1.5, 9])
+    assert f.get_gradient("x") == approx([-4, 3, 3, 3])
+
+    f = maximum(x, 0.0)
+    assert f.get_gradient("x") == approx([0, 0.5, 1, 1])
+
+    f = minimum(x, 0.5)
+    assert f.value == approx([-2, 0, 0.5, 0.5])
+    assert f.get_gradient("x") == approx([1, 1, 0.5, 0])
+
+    f = clip(x, -1.0, 0.5)
+    assert f.value == approx([-1, 0, 0.5, 0.5])
+    assert f.get_gradient("x") == approx([0, 1, 1, 0])
+
+
+def test_piecewise_two_variables():
+    x = Forward("x", 2.0)
+    y = Forward("y", 2.0)
+
+    f = maximum(x, y)
+    assert f.get_gradient("x") == approx(0.5)
+    assert f.get_gradient("y") == approx(0.5)
+
+    f = clip(x, y - 1, 3.0)
+    assert f.get_gradient("x") == approx(1)
+    assert f.get_gradient("y") == approx(0)
+
+    f = clip(x, y + 1, 4.0)
+    assert f.value == approx(3)
+    assert f.get_gradient("y") == approx(1)
+
+
+def test_fused_activations():
+    x = Forward.batched("x", np.array([-1000.0, -1.0, 0.0, 2.0, 1000.0]))
+    s = 1 / (1 + np.exp(-np.array([-1000.0, -1.0, 0.0, 2.0, 1000.0])))
+
+    f = logistic(x)
+    assert np.all(np.isfinite(f.value))
+    assert f.value == approx(s)
+    assert f.get_gradient("x") == approx(s * (1 - s))
+
+    f = softplus(x)
+    assert f.value == approx(np.logaddexp(0, [-1000.0, -1.0, 0.0, 2.0, 1000.0]))
+    assert f.get_gradient("x") == approx(s)
+
+    y = Forward("y", 1e-10)
+    assert log1p(y).value == approx(1e-10, rel=1e-12)
+    assert log1p(y).get_gradient("y") == approx(1)
+    assert expm1(y).value == approx(1e-10, rel=1e-12)
+    assert expm1(y).get_gradient("y") == approx(1)
+
+
+def test_softmax():
+    values = np.array([[1.0, 2.0, 3.0], [0.0, 0.0, 1000.0]])
+    x = Forward("x", values)
+
+    f = softmax(x, axis=1)
+    exps = np.exp(values - values.max(axis=1, keepdims=True))
+    s = exps / exps.sum(axis=1, keepdims=True)
+    assert f.value == approx(s)
+
+    # the Jacobian of each row is diag(s) - s s^T, and rows are independent
+    jacobian = f.get_gradient("x")
+    assert jacobian.shape == (2, 3, 2, 3)
+    assert jacobian[0, :, 0, :] == approx(np.diag(s[0]) - np.outer(s[0], s[0]))
+    assert jacobian[0, :, 1, :] == approx(np.zeros((3, 3)))
+
+    f = logsumexp(x, axis=1)
+    assert f.value == approx([np.log(np.sum(np.exp(values[0]))), 1000])
+    assert f.get_gradient("x")[0] == approx(np.stack([s[0], np.zeros(3)]))
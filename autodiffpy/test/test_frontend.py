@@ -0,0 +1,116 @@
+from autodiffpy.frontend import ModeSelector, grad, jacobian
+import autodiffpy as ad
+from pytest import approx, raises
+import numpy as np
+
+
+def f(x):
+    return ad.sum(ad.sin(x) * x)
+
+
+def expand(x, a):
+    return ad.exp(a @ x)
+
+
+def test_grad():
+    selector = ModeSelector()
+    x = np.array([1.0, 2.0, 3.0])
+    expected = np.cos(x) * x + np.sin(x)
+
+    assert selector.grad(f, x) == approx(expected)
+    assert selector.history[-1].mode == "reverse"
+    assert selector.grad(f, x, mode="forward") == approx(expected)
+    assert selector.history[-1].mode == "forward"
+
+    assert grad(f, x) == approx(expected)
+    assert grad(ad.sin, 1.0) == approx(np.cos(1))
+
+    with raises(ValueError):
+        grad(ad.sin, x)
+
+
+def test_jacobian_mode_selection():
+    selector = ModeSelector()
+
+    # many outputs of few inputs: forward mode
+    a = np.arange(20.0).reshape(10, 2) / 20
+    x = np.array([0.5, -0.5])
+    expected = np.exp(a @ x)[:, None] * a
+    assert selector.jacobian(expand, x, args=(a,)) == approx(expected)
+    decision = selector.history[-1]
+    assert decision.mode == "forward"
+    assert (decision.inputs, decision.outputs) == (2, 10)
+    assert decision.costs["forward"] < decision.costs["reverse"]
+
+    # few outputs of many inputs: reverse mode
+    y = np.linspace(0, 1, 10)
+    assert selector.jacobian(expand, y, args=(a.T,)) == approx(
+        np.exp(a.T @ y)[:, None] * a.T
+    )
+    assert selector.history[-1].mode == "reverse"
+    assert selector.jacobian(expand, y, args=(a.T,), mode="forward") == approx(
+        np.exp(a.T @ y)[:, None] * a.T
+    )
+
+    with raises(ValueError):
+        selector.jacobian(expand, y, args=(a.T,), mode="sideways")
+
+
+def test_decisions_are_timed():
+    selector = ModeSelector()
+    jacobian(f, np.ones(3), selector=selector)
+
+    decision = selector.history[-1]
+    assert decision.seconds > 0
+    assert decision.nodes > 1
+    assert "reverse mode" in str(decision)
+    assert "reverse" in selector.rates and "forward" not in selector.rates
+
+    # once both modes are timed the estimates are in seconds
+    jacobian(f, np.ones(3), mode="forward", selector=selector)
+    costs = selector.costs(3, 1, decision.nodes)
+    assert costs["reverse"] == approx(decision.nodes * selector.rates["reverse"])
+
+
+def test_jacobian_constant():
+    assert jacobian(lambda x: 2.0, np.ones(3)) == approx(np.zeros(3))
+    assert jacobian(lambda x: np.ones(2), np.ones(3), mode="forward") == approx(
+        np.zeros((2, 3))
+    )
+
+
+def test_forward_mode_skips_the_trace():
+    calls = []
+
+    def counted(x, a):
+        calls.append(type(x).__name__)
+        return expand(x, a)
+
+    selector = ModeSelector()
+    a = np.arange(20.0).reshape(10, 2) / 20
+    x = np.array([0.5, -0.5])
+    expected = np.exp(a @ x)[:, None] * a
+
+    # the first call traces f to pick a mode, later ones reuse its size
+    assert selector.jacobian(counted, x, args=(a,)) == approx(expected)
+    assert calls == ["Reverse", "Forward"]
+    assert selector.jacobian(counted, 2 * x, args=(a,)) == approx(
+        np.exp(a @ (2 * x))[:, None] * a
+    )
+    assert calls == ["Reverse", "Forward", "Forward"]
+    assert selector.history[-1].mode == "forward"
+
+    calls.clear()
+    selector = ModeSelector()
+    assert selector.jacobian(counted, x, args=(a,), mode="forward") == approx(expected)
+    assert calls == ["Forward"]
+    assert selector.history[-1].outputs == 10
+    assert selector.rates == {}
+
+
+def test_empty_input():
+    selector = ModeSelector()
+
+    assert selector.jacobian(lambda x: x, np.zeros(0)).shape == (0, 0)
+    assert selector.jacobian(lambda x: x, np.zeros(0), mode="reverse").shape == (0, 0)
+    assert selector.rates == {}
@@ -0,0 +1,101 @@
+import autodiffpy as ad
+from autodiffpy import dispatch
+from autodiffpy.gradcheck import check_gradients
+from pytest import approx, mark
+import numpy as np
+
+# domains of the elementary functions away from their poles
+DOMAINS = {
+    "sin": (-3, 3),
+    "cos": (-3, 3),
+    "tan": (-1.2, 1.2),
+    "sec": (-1.2, 1.2),
+    "csc": (0.3, 2.8),
+    "cot": (0.3, 2.8),
+    "arcsin": (-0.9, 0.9),
+    "arccos": (-0.9, 0.9),
+    "arctan": (-3, 3),
+    "sinh": (-3, 3),
+    "cosh": (-3, 3),
+    "tanh": (-3, 3),
+    "sech": (-3, 3),
+    "csch": (0.3, 3),
+    "coth": (0.3, 3),
+    "exp": (-3, 3),
+    "log": (0.1, 5),
+    "ln": (0.1, 5),
+    "log2": (0.1, 5),
+    "log10": (0.1, 5),
+    "sqrt": (0.1, 5),
+    "logistic": (-5, 5),
+    "softplus": (-5, 5),
+    "log1p": (-0.9, 5),
+    "expm1": (-3, 3),
+}
+
+
+@mark.parametrize("name", sorted(DOMAINS))
+def test_elementary_functions(name):
+    fun = getattr(dispatch, name)
+    points = np.random.RandomState(0).uniform(*DOMAINS[name], size=(2000, 1))
+
+    result = check_gradients(lambda x: fun(x) * x, points)
+
+    assert result.ok, str(result)
+
+
+def test_multiple_inputs():
+    def fun(x, y, z):
+        return ad.sin(x * y) + x ** 2 / ad.exp(z) + ad.log(y ** 2 + 1) * z
+
+    points = np.random.RandomState(1).uniform(-2, 2, size=(5000, 3))
+    result = check_gradients(fun, points)
+
+    assert result.ok
+    assert result.gradients["forward"].shape == (5000, 3)
+    assert result.max_relative_error[("forward", "reverse")] == approx(0, abs=1e-12)
+    assert result.gradients["forward"][:, 2] == approx(
+        -points[:, 0] ** 2 / np.exp(points[:, 2]) + np.log(points[:, 1] ** 2 + 1)
+    )
+
+
+def test_single_point_and_unused_input():
+    result = check_gradients(lambda x, y: x * 3.0, [1.0, 2.0])
+
+    assert result.ok
+    assert result.gradients["reverse"][0] == approx([3, 0])
+
+
+def test_constant_function():
+    result = check_gradients(lambda x: 3.0, [[1.0], [2.0]])
+
+    assert result.ok
+    for gradients in result.gradients.values():
+        assert gradients == approx(np.zeros((2, 1)))
+
+
+def test_flags_disagreement():
+    def wrong(x):
+        # numpy inputs (finite differences) see a different function
+        return ad.sin(x) if isinstance(x, np.ndarray) else ad.cos(x)
+
+    points = np.linspace(0.1, 1, 10)[:, np.newaxis]
+    result = check_gradients(wrong, points)
+
+    assert not result.ok
+    assert list(result.failures) == list(range(10))
+    assert "10 disagreements" in str(result)
+
+
+def test_skips_undefined_points():
+    result = check_gradients(lambda x: ad.log(x), [[-1.0], [2.0]])
+
+    assert result.ok
+    assert list(result.skipped) == [True, False]
+
+
+def test_skips_undefined_derivatives():
+    result = check_gradients(lambda x: ad.sqrt(x), [[0.5], [-0.5], [2.0]])
+
+    assert result.ok
+    assert list(result.skipped) == [False, True, False]
@@ -0,0 +1,79 @@
+from autodiffpy.implicit import root
+from autodiffpy.forward import Forward
+from autodiffpy.reverse import Reverse, gradients
+import autodiffpy as ad
+from pytest import approx, raises
+import numpy as np
+
+
+def square_root(x, a):
+    return x ** 2 - a
+
+
+def test_root_plain():
+    assert root(square_root, 1.0, [2.0]) == approx(np.sqrt(2))
+    assert root(lambda x: ad.cos(x) - x, 1.0) == approx(0.7390851332)
+
+
+def test_root_forward():
+    a = Forward("a", 2.0)
+    x = root(square_root, 1.0, [a])
+
+    assert x.value == approx(np.sqrt(2))
+    assert x.get_gradient("a") == approx(1 / (2 * np.sqrt(2)))
+
+    # the derivatives of the params are chained through
+    t = Forward("t", 3.0)
+    x = root(square_root, 1.0, [t ** 2])
+    assert x.get_gradient("t") == approx(1)
+
+
+def test_root_reverse():
+    a = Reverse(2.0)
+    x = root(square_root, 1.0, [a])
+
+    assert x.value == approx(np.sqrt(2))
+    assert gradients(x, [a]) == approx([1 / (2 * np.sqrt(2))])
+    # the Newton iterations are not part of the graph
+    assert len(x.parents) == 1
+
+
+def test_root_replayed():
+    a = Reverse(2.0)
+    x = root(square_root, 1.0, [a])
+
+    # replaying the recorded operation solves again at the new parameters
+    assert x.op.fun(9.0) == approx(3)
+    assert x.op.fun(np.array([4.0, 16.0])) == approx([2, 4])
+    assert x.op.fun(a.value) == x.value
+
+    g = ad.vectorize(lambda a: root(square_root, 1.0, [a]))
+    values, (derivatives,) = g.value_and_gradients(np.array([4.0, 9.0]))
+    assert values == approx([2, 3])
+    assert derivatives == approx([1 / 4, 1 / 6])
+
+
+def test_root_vector():
+    A = np.array([[3.0, 1.0], [1.0, 2.0]])
+    b = np.array([1.0, -1.0])
+
+    def f(x, b, c):
+        return A @ x + c * x ** 3 - b
+
+    x = root(f, np.zeros(2), [Forward("b", b), Forward("c", 0.5)])
+    assert f(x.value, b, 0.5) == approx(np.zeros(2))
+
+    jacobian = A + np.diag(1.5 * x.value ** 2)
+    assert x.get_gradient("b") == approx(np.linalg.inv(jacobian))
+    assert x.get_gradient("c") == approx(-np.linalg.solve(jacobian, x.value ** 3))
+
+    rb, rc = Reverse(b), Reverse(0.5)
+    rx = root(f, np.zeros(2), [rb, rc])
+    g_b, g_c = gradients(rx[0], [rb, rc])
+    assert g_b == approx(np.linalg.inv(jacobian)[0])
+    assert g_c == approx(x.get_gradient("c")[0])
+
+
+def test_root_not_converged():
+    with raises(ValueError):
+        root(lambda x: x ** 2 + 1, 0.5, max_iterations=20)
@@ -0,0 +1,83 @@
+from autodiffpy.memoize import LRUCache, memoize
+from autodiffpy.reverse import value_and_grad
+import autodiffpy as ad
+from pytest import approx, raises
+import numpy as np
+
+
+def test_memoize_value_and_grad():
+    calls = []
+
+    def f(x):
+        calls.append(x)
+        return ad.sum(ad.sin(x) * x)
+
+    evaluate = memoize(value_and_grad(f), capacity=2)
+    value, gradient = evaluate(np.array([1.0, 2.0]))
+    assert value == approx(np.sin(1) + 2 * np.sin(2))
+    assert gradient == approx(np.cos([1, 2]) * [1, 2] + np.sin([1, 2]))
+
+    # equal inputs are hits, whatever array or list they come in
+    assert evaluate([1.0, 2.0])[1] == approx(gradient)
+    assert evaluate(np.array([1.0, 2.0]))[0] == approx(value)
+    assert len(calls) == 1
+    assert (evaluate.cache.hits, evaluate.cache.misses) == (2, 1)
+    assert str(evaluate.cache) == "2 hits, 1 misses, 1/2 results"
+
+
+def test_memoize_eviction():
+    square = memoize(lambda x: x ** 2, capacity=2)
+
+    square(1.0)
+    square(2.0)
+    square(1.0)
+    # evicts 2, the least recently used input
+    square(3.0)
+    assert len(square.cache) == 2
+
+    square(1.0)
+    assert square.cache.misses == 3
+    square(2.0)
+    assert square.cache.misses == 4
+
+    square.cache.clear()
+    assert len(square.cache) == 0
+    square(2.0)
+    assert square.cache.misses == 5
+
+
+def test_memoize_decorator_and_arguments():
+    @memoize
+    def scale(x, factor):
+        return np.asarray(x) * factor
+
+    scale([1.0, 2.0], 2)
+    scale([1.0, 2.0], 3)
+    scale([1.0, 2.0], 2)
+    assert (scale.cache.hits, scale.cache.misses) == (1, 2)
+    assert scale.__name__ == "scale"
+
+    # integer and float inputs have different types and are separate entries
+    scale([1, 2], 2)
+    assert scale.cache.misses == 3
+
+
+def test_memoize_tolerance():
+    @memoize(capacity=8, tolerance=1e-6)
+    def norm(x):
+        return np.linalg.norm(x)
+
+    norm(np.array([1.0, -1e-9]))
+    norm(np.array([1.0 + 1e-9, 1e-9]))
+    assert norm.cache.misses == 1
+
+    norm(np.array([1.001, 0.0]))
+    assert norm.cache.misses == 2
+
+
+def test_lru_cache_arguments():
+    with raises(ValueError):
+        LRUCache(capacity=0)
+
+    with raises(ValueError):
+        LRUCache(tolerance=0)
@@ -0,0 +1,75 @@
+from autodiffpy.optimize import adam, gradient_descent, lbfgs, line_search
+from autodiffpy.reverse import value_and_grad
+import autodiffpy as ad
+from pytest import approx
+import numpy as np
+
+
+def rosenbrock(x):
+    return ad.sum(100 * (x[1:] - x[:-1] ** 2) ** 2) + ad.sum((1 - x) ** 2)
+
+
+def quadratic(x, center):
+    return ad.sum((x - center) ** 2 * np.array([1.0, 4.0]))
+
+
+def test_lbfgs():
+    result = lbfgs(rosenbrock, np.full(5, -1.0))
+
+    assert result.converged
+    assert result.x == approx(np.ones(5), abs=1e-6)
+    assert result.value == approx(0, abs=1e-12)
+    # one evaluation per line search step, no separate gradient passes
+    assert result.evaluations < 3 * result.iterations + 2
+    assert "converged" in str(result)
+
+
+def test_gradient_descent():
+    center = np.array([1.0, -2.0])
+
+    result = gradient_descent(quadratic, np.zeros(2), args=(center,), learning_rate=0.1)
+    assert result.converged
+    assert result.x == approx(center)
+    assert result.evaluations == result.iterations + 1
+
+    fast = gradient_descent(
+        quadratic, np.zeros(2), args=(center,), learning_rate=0.05, momentum=0.5
+    )
+    slow = gradient_descent(quadratic, np.zeros(2), args=(center,), learning_rate=0.05)
+    assert fast.x == approx(center)
+    assert fast.iterations < slow.iterations
+
+
+def test_gradient_descent_max_iterations():
+    result = gradient_descent(rosenbrock, np.zeros(2), max_iterations=5)
+
+    assert not result.converged
+    assert result.iterations == 5
+    assert "not converged" in str(result)
+
+
+def test_adam():
+    center = np.array([1.0, -2.0])
+    result = adam(quadratic, np.zeros(2), args=(center,), learning_rate=0.05)
+
+    assert result.converged
+    assert result.x == approx(center, abs=1e-6)
+
+
+def test_line_search():
+    evaluate = value_and_grad(rosenbrock)
+    x = np.array([-1.0, 1.0])
+    value, gradient = evaluate(x)
+
+    step, new_x, new_value, new_gradient = line_search(
+        evaluate, x, -gradient, value, gradient
+    )
+    assert 0 < step < 1
+    assert new_x == approx(x - step * gradient)
+    assert new_value < value
+    assert new_gradient == approx(evaluate(new_x)[1])
+
+    # an ascent direction is never accepted
+    step, new_x, _, _ = line_search(evaluate, x, gradient, value, gradient)
+    assert step == 0
+    assert new_x == approx(x)
@@ -0,0 +1,109 @@
+from autodiffpy.implicit import root
+from autodiffpy.parallel import ParallelGraph
+from autodiffpy.reverse import Reverse, exp, sin, sum, gradients, rVector
+from pytest import approx, raises
+import numpy as np
+
+
+def branches(x, y):
+    return [sum(sin(x * k) * y) + sum(exp(-x * y / k)) for k in range(1, 6)]
+
+
+def test_levels():
+    x = Reverse(1.0)
+    y = Reverse(2.0)
+    f = sin(x) * y + exp(y)
+
+    graph = ParallelGraph(f, [x, y])
+
+    assert [len(level) for level in graph.levels] == [2, 2, 1, 1]
+    assert {id(node) for node in graph.levels[0]} == {id(x), id(y)}
+
+
+def test_evaluate():
+    rng = np.random.RandomState(0)
+    x = Reverse(rng.rand(50))
+    y = Reverse(rng.rand(50))
+    outputs = branches(x, y)
+
+    with ParallelGraph(outputs, [x, y], workers=4, min_cost=0) as graph:
+        assert graph.evaluate() == approx([f.value for f in outputs])
+
+        a, b = rng.rand(50), rng.rand(50)
+        expected = [f.value for f in branches(Reverse(a), Reverse(b))]
+        assert graph.evaluate(a, b) == approx(expected)
+
+        assert graph.tasks > 0
+
+    # the recorded graph is unchanged
+    assert x.value != approx(a)
+
+    with raises(ValueError):
+        graph.evaluate(a)
+
+
+def test_value_and_gradients():
+    rng = np.random.RandomState(1)
+    x = Reverse(rng.rand(50))
+    y = Reverse(rng.rand(50))
+    outputs = branches(x, y)
+    seeds = rng.rand(5)
+
+    with ParallelGraph(outputs, [x, y], workers=4, min_cost=0) as graph:
+        a, b = rng.rand(50), rng.rand(50)
+        values, grads = graph.value_and_gradients(a, b, seeds=seeds)
+
+    ra, rb = Reverse(a), Reverse(b)
+    expected = branches(ra, rb)
+    total = sum([f * s for f, s in zip(expected, seeds)])
+
+    assert values == approx([f.value for f in expected])
+    assert grads[0] == approx(gradients(total, [ra])[0])
+    assert grads[1] == approx(gradients(total, [rb])[0])
+
+
+def test_matches_rvector():
+    x = Reverse(1.0)
+    y = Reverse(2.0)
+    functions = [x * 2 * y + y ** 3, 2 * x ** 2 * y, 3 * y]
+
+    graph = ParallelGraph(functions, [x, y], workers=2, min_cost=0)
+    vector = rVector(functions)
+
+    for k in range(3):
+        seeds = np.eye(3)[k]
+        _, grads = graph.value_and_gradients(seeds=seeds)
+        assert grads == approx([vector.get_gradients(x)[k], vector.get_gradients(y)[k]])
+
+    graph.close()
+
+
+def test_small_nodes_stay_serial():
+    x = Reverse(1.0)
+    y = Reverse(2.0)
+    f = sum([sin(x * k) * y for k in range(100)])
+
+    graph = ParallelGraph(f, [x, y])
+    value, grads = graph.value_and_gradients()
+
+    assert value == approx(f.value)
+    assert grads == approx(gradients(f, [x, y]))
+    assert graph.tasks == 0
+
+
+def test_root_replayed():
+    a = Reverse(4.0)
+    b = Reverse(2.0)
+    x = root(lambda x, a: x ** 2 - a, 1.0, [a])
+    f = x * b + sin(x)
+
+    with ParallelGraph(f, [a, b], workers=2, min_cost=0) as graph:
+        value, grads = graph.value_and_gradients(9.0, 5.0)
+
+    ra, rb = Reverse(9.0), Reverse(5.0)
+    xr = root(lambda x, a: x ** 2 - a, 1.0, [ra])
+    expected = xr * rb + sin(xr)
+
+    assert value == approx(15 + np.sin(3))
+    assert grads == approx(gradients(expected, [ra, rb]))
+    assert grads[0] == approx((5 + np.cos(3)) / 6)
@@ -0,0 +1,184 @@
+from autodiffpy.precision import (
+    get_precision,
+    set_precision,
+    precision,
+    _accumulate,
+    _as_float,
+)
+from autodiffpy.forward import Forward
+from autodiffpy.reverse import Reverse, Tape, gradients, value_and_grad
+import autodiffpy as ad
+from concurrent.futures import ThreadPoolExecutor
+from pytest import approx, raises
+import numpy as np
+
+
+def test_default():
+    assert get_precision() == np.float64
+    assert Reverse([1, 2]).value.dtype == np.float64
+    assert Reverse(np.ones(2, dtype=np.float32)).value.dtype == np.float32
+
+
+def test_set_precision():
+    set_precision("float32")
+    try:
+        assert get_precision() == np.float32
+        assert Forward("x", np.ones(3)).value.dtype == np.float32
+    finally:
+        set_precision(np.float64)
+
+    assert get_precision() == np.float64
+
+
+def test_precision_block():
+    with precision(np.float32):
+        assert get_precision() == np.float32
+
+        with precision(np.float64):
+            assert get_precision() == np.float64
+
+        assert get_precision() == np.float32
+
+    assert get_precision() == np.float64
+
+
+def test_threads_are_separate():
+    def work(dtype):
+        with precision(dtype):
+            x = Reverse(np.linspace(0, 1, 100))
+            return gradients(ad.sum(ad.sin(x) * x), [x])[0].dtype
+
+    with ThreadPoolExecutor(4) as pool:
+        dtypes = list(pool.map(work, [np.float32, np.float64] * 4))
+
+    assert dtypes == [np.float32, np.float64] * 4
+
+
+def test_invalid():
+    with raises(ValueError):
+        set_precision(np.float16)
+    with raises(ValueError):
+        with precision("float128 please"):
+            pass
+    with raises(ValueError):
+        with precision(np.int32):
+            pass
+
+
+def test_as_float():
+    with precision(np.float32):
+        assert _as_float(np.arange(3)).dtype == np.float32
+        assert _as_float(np.ones(3)).dtype == np.float32
+        assert _as_float(np.ones(3, dtype=complex)).dtype == np.complex64
+        assert _as_float(np.float64(2)).dtype == np.float32
+        assert _as_float(2.5).dtype == np.float32
+        assert _as_float(3).dtype == np.float32
+        assert _as_float(1j).dtype == np.complex64
+        assert _as_float(True) is True
+
+    assert _as_float(2.5) == 2.5
+    assert _as_float(np.ones(3, dtype=np.float32)).dtype == np.float32
+
+
+def test_accumulate():
+    values = np.full(10 ** 6, 0.1, dtype=np.float32)
+    total = _accumulate(np.sum, values)
+
+    assert total.dtype == np.float32
+    assert total == approx(10 ** 5, rel=1e-7)
+    assert _accumulate(np.sum, np.arange(4)) == 6
+
+
+def test_forward():
+    x = np.linspace(-1, 1, 50)
+
+    with precision(np.float32):
+        f = Forward.batched("x", x)
+        g = ad.sin(f) * f ** 2 + 2 ** f + ad.maximum(f, 0) / 3
+        y = ad.sum(ad.softmax(Forward("y", x[:5])))
+
+    assert g.value.dtype == np.float32
+    assert g.get_gradient("x").dtype == np.float32
+    assert y.get_gradient("y").dtype == np.float32
+    assert g.get_gradient("x") == approx(
+        np.cos(x) * x ** 2 + 2 * x * np.sin(x) + np.log(2) * 2 ** x + (x > 0) / 3,
+        rel=1e-5,
+    )
+
+
+def test_reverse():
+    rng = np.random.RandomState(0)
+    W = rng.randn(20, 20)
+
+    def f(w):
+        h = ad.tanh(w @ w) - ad.clip(w, -1, 1) + ad.where(w > 0, w, 0) / 2
+        return ad.logsumexp(h[3]) + ad.sum(h[:, 1]) + ad.dot(h[0], h[1]) * 0.5
+
+    with precision(np.float32):
+        value, gradient = value_and_grad(f)(W)
+
+    expected_value, expected_gradient = value_and_grad(f)(W)
+
+    assert gradient.dtype == np.float32
+    assert value == approx(expected_value, rel=1e-5)
+    assert gradient == approx(expected_gradient, rel=1e-4, abs=1e-5)
+
+
+def test_log_and_prod():
+    x = np.linspace(1, 2, 5)
+
+    with precision(np.float32):
+        r = Reverse(x)
+        for f in [ad.ln, ad.log10, ad.prod]:
+            out = ad.sum(f(r))
+            assert out.value.dtype == np.float32
+            assert gradients(out, [r])[0].dtype == np.float32
+
+        base = Reverse(3.0)
+        out = ad.sum(ad.log(r, base))
+        assert out.value.dtype == np.float32
+        assert all(g.dtype == np.float32 for g in gradients(out, [r, base]))
+
+        f = Forward("x", x)
+        for g in [ad.ln(f), ad.log10(f), ad.prod(f)]:
+            assert g.value.dtype == np.float32
+            assert g.get_gradient("x").dtype == np.float32
+
+
+def test_scalar_graph():
+    with precision(np.float32):
+        xs = [Reverse(float(k)) for k in range(5)]
+        out = ad.sum([ad.sin(x) * x / 3 + 2 ** x for x in xs])
+
+        assert all(g.dtype == np.float32 for g in gradients(out, xs))
+
+
+def test_float64_constants():
+    A = np.linspace(0, 1, 6).reshape(2, 3)
+
+    with precision(np.float32):
+        assert Reverse(2.0).value.dtype == np.float32
+        assert ad.sin(Reverse(2.0)).value.dtype == np.float32
+
+        x = Reverse(np.ones(3))
+        for out in [ad.dot(A, x), A @ x, x * np.float64(2), x + A[0]]:
+            assert out.value.dtype == np.float32
+            assert gradients(ad.sum(out), [x])[0].dtype == np.float32
+
+        f = Forward("x", np.ones(3))
+        for g in [ad.dot(A, f), A @ f, f * np.float64(2), f + A[0]]:
+            assert g.value.dtype == np.float32
+            assert g.get_gradient("x").dtype == np.float32
+
+
+def test_tape():
+    x = np.linspace(0, 1, 10)
+
+    with Tape(np.float32):
+        assert get_precision() == np.float32
+        r = Reverse(x)
+        ad.sum(r * r).backward()
+        assert r.get_gradient().dtype == np.float32
+        assert r.get_gradient() == approx(2 * x)
+
+    assert get_precision() == np.float64
@@ -0,0 +1,85 @@
+from autodiffpy.primitive import primitive
+from autodiffpy.forward import Forward
+from autodiffpy.reverse import Reverse, gradients
+import autodiffpy as ad
+from pytest import approx, raises
+import numpy as np
+
+
+@primitive(
+    jvp=lambda t, out, x: t * np.cos(x),
+    vjp=lambda g, out, x: g * np.cos(x),
+)
+def fast_sin(x):
+    return np.sin(x)
+
+
+@primitive(
+    jvp=[None, lambda t, out, a, x: t @ a.T],
+    vjp=[None, lambda g, out, a, x: a.T @ g],
+)
+def matvec(a, x):
+    return a @ x
+
+
+@primitive(
+    jvp=[lambda t, out, x, y, power: power * t * x ** (power - 1), None],
+    vjp=[lambda g, out, x, y, power: power * g * x ** (power - 1), None],
+)
+def shifted_power(x, y, power=2):
+    return x ** power + y
+
+
+def test_primitive_plain():
+    assert fast_sin(1.0) == approx(np.sin(1))
+    assert fast_sin.__name__ == "fast_sin"
+
+
+def test_primitive_forward():
+    x = Forward("x", 2.0)
+    f = fast_sin(x ** 2)
+
+    assert f.value == approx(np.sin(4))
+    assert f.get_gradient("x") == approx(4 * np.cos(4))
+
+    v = Forward("v", [1.0, 2.0])
+    assert fast_sin(v).get_gradient("v") == approx(np.diag(np.cos([1, 2])))
+
+
+def test_primitive_reverse():
+    x = Reverse(2.0)
+    f = fast_sin(x ** 2)
+
+    assert f.value == approx(np.sin(4))
+    assert gradients(f, [x]) == approx([4 * np.cos(4)])
+    # the primitive is a single node
+    assert len(f.parents) == 1
+
+
+def test_primitive_arrays():
+    a = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+
+    x = Forward("x", [1.0, -1.0])
+    f = matvec(a, x)
+    assert f.value == approx(a @ [1, -1])
+    assert f.get_gradient("x") == approx(a)
+
+    y = Reverse([1.0, -1.0])
+    g = ad.sum(matvec(a, y))
+    assert gradients(g, [y])[0] == approx(a.sum(axis=0))
+
+
+def test_primitive_keyword_arguments():
+    x = Forward("x", 2.0)
+    assert shifted_power(x, 1.0, power=3).get_gradient("x") == approx(12)
+
+    y = Reverse(2.0)
+    assert gradients(shifted_power(y, 1.0, power=3), [y]) == approx([12])
+
+
+def test_primitive_missing_rule():
+    with raises(ValueError):
+        shifted_power(2.0, Forward("y", 1.0))
+
+    with raises(ValueError):
+        shifted_power(2.0, Reverse(1.0))
@@ -22,7 +22,38 @@ from autodiffpy.reverse import (
     log,
     sqrt,
     rVector,
+    sum,
+    mean,
+    dot,
+    transpose,
+    solve,
+    inv,
+    det,
+    logdet,
+    norm,
+    prod,
+    logsumexp,
+    stack,
+    cumsum,
+    gradients,
+    value_and_grad,
+    per_example_grad,
+    Tape,
+    where,
+    logistic,
+    softplus,
+    log1p,
+    expm1,
+    softmax,
+    maximum,
+    minimum,
+    clip,
 )
+from autodiffpy.reverse import abs as rabs
+from autodiffpy.reverse import _seeds
+from concurrent.futures import ThreadPoolExecutor
+import gc
+import weakref
 from pytest import approx, raises
 import numpy as np
 
@@ -41,6 +72,23 @@ def test_eq_ne():
     assert f != h
 
 
+def test_eq_ne_arrays():
+    x = Reverse(np.ones(2))
+    y = Reverse(np.ones(2))
+    z = Reverse(np.array([1.0, 2.0]))
+
+    assert x == y
+    assert not x != y
+    assert x != z
+    assert not x == z
+
+    x.gradient_value = np.ones(2)
+    assert x != y
+
+    assert list(z == 1.0) == [True, False]
+    assert list(z != 1.0) == [False, True]
+
+
 def test_str():
     x = Reverse(5)
     f = x ** 2 + 3
@@ -353,3 +401,694 @@ def test_vector():
     # Check for get_gradients()
     assert vector.get_gradients(x) == approx([4.0, 8.0, 0])
     assert vector.get_gradients(y) == approx([14.0, 2.0, 3.0])
+
+
+def test_array_elementwise():
+    x = Reverse([0.5, 1.0, 2.0])
+    f = sum(sin(x) * log(x) + exp(x) / 2)
+    f.gradient_value = 1.0
+    values = np.array([0.5, 1.0, 2.0])
+    assert f.value == approx(
+        np.sum(np.sin(values) * np.log(values) + np.exp(values) / 2)
+    )
+    assert x.get_gradient() == approx(
+        np.cos(values) * np.log(values) + np.sin(values) / values + np.exp(values) / 2
+    )
+
+
+def test_array_integer_power():
+    x = Reverse(np.array([1, 2, 4]))
+    f = sum(x ** -1)
+    f.gradient_value = 1.0
+    assert f.value == approx(1.75)
+    assert x.get_gradient() == approx([-1, -1 / 4, -1 / 16])
+
+
+def test_array_broadcasting():
+    x = Reverse(np.ones((2, 3)))
+    b = Reverse(2.0)
+    c = Reverse([[1.0], [2.0]])
+    f = sum(x * b + c * x)
+    f.gradient_value = 1.0
+    assert f.value == approx(6 * 2 + 3 * 1 + 3 * 2)
+    assert b.get_gradient() == approx(6)
+    assert c.get_gradient() == approx(np.array([[3], [3]]))
+    assert x.get_gradient() == approx(np.array([[3, 3, 3], [4, 4, 4]]))
+
+
+def test_array_sum_mean_axis():
+    x = Reverse(np.arange(6.0).reshape(2, 3))
+    f = sum(sum(x, axis=1) * np.array([1, 2])) + sum(mean(x, axis=0))
+    f.gradient_value = 1.0
+    assert f.value == approx(3 + 2 * 12 + 7.5)
+    assert x.get_gradient() == approx(np.array([[1.5, 1.5, 1.5], [2.5, 2.5, 2.5]]))
+
+    assert sum(np.ones(3)) == approx(3)
+    assert mean(np.arange(3)) == approx(1)
+
+
+def test_dot():
+    a = np.arange(6.0).reshape(2, 3)
+    x = Reverse([1.0, 2.0, 3.0])
+    y = Reverse([1.0, -1.0])
+    f = dot(y, dot(a, x))
+    f.gradient_value = 1.0
+    assert f.value == approx(np.dot([1, -1], a @ [1, 2, 3]))
+    assert x.get_gradient() == approx(np.array([1, -1]) @ a)
+    assert y.get_gradient() == approx(a @ [1, 2, 3])
+
+    m = Reverse(a)
+    f = sum(dot(m, np.ones((3, 2))))
+    f.gradient_value = 1.0
+    assert m.get_gradient() == approx(2 * np.ones((2, 3)))
+
+    s = Reverse(2.0)
+    f = sum(dot(s, np.array([1.0, 2.0])))
+    f.gradient_value = 1.0
+    assert s.get_gradient() == approx(3)
+
+    assert dot(np.ones(2), np.ones(2)) == approx(2)
+
+
+def test_indexing():
+    x = Reverse([1.0, 2.0, 3.0])
+    f = x[0] * x[2] + x[0]
+    f.gradient_value = 1.0
+    assert f.value == approx(4)
+    assert x.get_gradient() == approx([4, 0, 1])
+
+
+def test_vector_array_valued():
+    x = Reverse([1.0, 2.0, 3.0])
+    vector = rVector(x[1:] * x[0])
+
+    assert vector.values == approx([2, 3])
+    gradients = vector.get_gradients(x)
+    assert gradients[0] == approx([2, 1, 0])
+    assert gradients[1] == approx([3, 0, 1])
+
+
+def _numeric_gradient(fun, x, h=1e-6):
+    gradient = np.zeros_like(x)
+
+    for index in np.ndindex(*x.shape):
+        step = np.zeros_like(x)
+        step[index] = h
+        gradient[index] = (fun(x + step) - fun(x - step)) / (2 * h)
+
+    return gradient
+
+
+A = np.array([[4.0, 1.0, 0.5], [1.0, 3.0, -1.0], [0.5, -1.0, 5.0]])
+B = np.array([1.0, -2.0, 0.5])
+
+
+def test_matmul():
+    m = Reverse(A)
+    x = Reverse(B)
+    f = sum(m @ x) + B @ transpose(m) @ x + sum(A @ m)
+    f.gradient_value = 1.0
+
+    assert f.value == approx(np.sum(A @ B) + B @ A.T @ B + np.sum(A @ A))
+    assert x.get_gradient() == approx(A.sum(axis=0) + A @ B)
+    assert m.get_gradient() == approx(
+        _numeric_gradient(lambda a: np.sum(a @ B) + B @ a.T @ B + np.sum(A @ a), A)
+    )
+
+
+def test_least_squares():
+    x = Reverse(B)
+    f = norm(A @ x - 1) ** 2
+    f.gradient_value = 1.0
+
+    residual = A @ B - 1
+    assert f.value == approx(residual @ residual)
+    assert x.get_gradient() == approx(2 * A.T @ residual)
+
+
+def test_solve():
+    m = Reverse(A)
+    b = Reverse(B)
+    f = dot(B, solve(m, b))
+    f.gradient_value = 1.0
+
+    assert f.value == approx(B @ np.linalg.solve(A, B))
+    assert b.get_gradient() == approx(np.linalg.solve(A.T, B))
+    assert m.get_gradient() == approx(
+        _numeric_gradient(lambda a: B @ np.linalg.solve(a, B), A)
+    )
+
+    rhs = np.stack([B, 2 * B], axis=1)
+    m = Reverse(A)
+    f = sum(solve(m, rhs) * rhs)
+    f.gradient_value = 1.0
+    assert m.get_gradient() == approx(
+        _numeric_gradient(lambda a: np.sum(np.linalg.solve(a, rhs) * rhs), A)
+    )
+
+    assert solve(A, B) == approx(np.linalg.solve(A, B))
+
+
+def test_solve_transposed_system_once(monkeypatch):
+    m = Reverse(A)
+    b = Reverse(B)
+    f = dot(B, solve(m, b))
+
+    calls = []
+    numpy_solve = np.linalg.solve
+
+    def counted(*args):
+        calls.append(args)
+        return numpy_solve(*args)
+
+    monkeypatch.setattr(np.linalg, "solve", counted)
+    gradient_m, gradient_b = gradients(f, [m, b])
+
+    assert len(calls) == 1
+    assert gradient_b == approx(numpy_solve(A.T, B))
+    assert gradient_m == approx(-np.outer(gradient_b, numpy_solve(A, B)))
+
+
+def test_inv_det():
+    m = Reverse(A)
+    f = sum(inv(m) * A) + det(m) + logdet(m)
+    f.gradient_value = 1.0
+
+    def fun(a):
+        return np.sum(np.linalg.inv(a) * A) + np.linalg.det(a) + np.linalg.slogdet(a)[1]
+
+    assert f.value == approx(fun(A))
+    assert m.get_gradient() == approx(_numeric_gradient(fun, A))
+
+    assert inv(A) == approx(np.linalg.inv(A))
+    assert det(A) == approx(np.linalg.det(A))
+    assert logdet(A) == approx(np.log(np.linalg.det(A)))
+    assert norm(B) == approx(np.linalg.norm(B))
+    assert transpose(A) == approx(A.T)
+
+
+def test_sum_of_list_is_shallow():
+    # a chain of 100000 additions would overflow the stack in get_gradient
+    xs = [Reverse(float(i)) for i in range(100000)]
+    f = sum(xs + [1.0]) * 2
+    f.gradient_value = 1.0
+
+    assert f.value == approx(2 * (99999 * 100000 / 2 + 1))
+    assert xs[0].get_gradient() == approx(2)
+    assert xs[-1].get_gradient() == approx(2)
+
+    assert sum([1.0, 2.0]) == approx(3)
+
+
+def test_prod():
+    x = Reverse(2.0)
+    y = Reverse(0.0)
+    f = prod([x, y, 3.0])
+    f.gradient_value = 1.0
+
+    assert f.value == approx(0)
+    assert x.get_gradient() == approx(0)
+    assert y.get_gradient() == approx(6)
+
+    v = Reverse([1.0, 2.0, 0.0, 4.0])
+    f = prod(v)
+    f.gradient_value = 1.0
+    assert v.get_gradient() == approx([0, 0, 8, 0])
+
+    assert prod([2.0, 3.0]) == approx(6)
+
+
+def test_dot_of_lists():
+    x = Reverse(2.0)
+    y = Reverse(-1.0)
+    f = dot([x, y, 3.0], [y, x, x])
+    f.gradient_value = 1.0
+
+    assert f.value == approx(2)
+    assert x.get_gradient() == approx(1)
+    assert y.get_gradient() == approx(4)
+
+    with raises(ValueError):
+        dot([x, y, 3.0], [y])
+
+
+def test_logsumexp():
+    x = Reverse(1000.0)
+    y = Reverse(1000.0)
+    f = logsumexp([x, y])
+    f.gradient_value = 1.0
+
+    assert f.value == approx(1000 + np.log(2))
+    assert x.get_gradient() == approx(0.5)
+
+    v = Reverse([0.0, np.log(3.0)])
+    f = logsumexp(v)
+    f.gradient_value = 1.0
+    assert f.value == approx(np.log(4))
+    assert v.get_gradient() == approx([0.25, 0.75])
+
+    assert logsumexp(np.zeros(2)) == approx(np.log(2))
+
+
+def test_stack_cumsum():
+    x = Reverse(2.0)
+    y = Reverse(3.0)
+    f = sum(stack([x, x * y, 1.0]) * np.array([1.0, 2.0, 3.0]))
+    f.gradient_value = 1.0
+
+    assert f.value == approx(2 + 12 + 3)
+    assert x.get_gradient() == approx(1 + 2 * 3)
+    assert y.get_gradient() == approx(2 * 2)
+
+    x = Reverse(2.0)
+    y = Reverse(3.0)
+    f = cumsum([x, x * y, 1.0])
+    assert f.value == approx([2, 8, 9])
+
+    vector = rVector(f)
+    assert vector.get_gradients(x) == approx([1, 4, 4])
+    assert vector.get_gradients(y) == approx([0, 2, 2])
+
+    assert cumsum([1.0, 2.0]) == approx([1, 3])
+
+
+def test_prod_cumsum_of_arrays():
+    a = Reverse(np.array([1.0, 2.0, 0.0]))
+    b = Reverse(np.array([3.0, 4.0, 5.0]))
+    f = prod([a, b, 2.0])
+
+    assert f.value == approx([6, 16, 0])
+    assert np.array(gradients(sum(f), [a, b])) == approx(
+        np.array([[6, 8, 10], [2, 4, 0]])
+    )
+
+    M = np.arange(6.0).reshape(2, 3)
+    basis = np.eye(6).reshape(6, 2, 3)
+    for axis, weights in [(None, np.arange(6.0)), (0, M + 1), (1, M - 2)]:
+        m = Reverse(M)
+        f = cumsum(m, axis=axis)
+        expected = [np.sum(np.cumsum(e, axis=axis) * weights) for e in basis]
+
+        assert f.value == approx(np.cumsum(M, axis=axis))
+        assert gradients(sum(f * weights), [m])[0] == approx(
+            np.reshape(expected, (2, 3))
+        )
+
+
+def test_backward():
+    x = Reverse(1.0)
+    y = Reverse(2.0)
+    f = x * y + exp(x * y)
+    f.backward()
+
+    assert f.gradient_value == approx(1)
+    assert x.get_gradient() == approx(2 + 2 * np.exp(2))
+    assert y.get_gradient() == approx(1 + np.exp(2))
+
+    v = Reverse([1.0, 2.0])
+    f = v * v
+    f.backward()
+    assert v.get_gradient() == approx([2, 4])
+
+
+def test_backward_skips_unrelated_expressions():
+    x = Reverse(3.0)
+    unrelated = [sin(x * i) for i in range(100)]
+    f = x ** 2
+    f.backward()
+
+    assert x.get_gradient() == approx(6)
+    assert all(node.gradient_value is None for node in unrelated)
+
+
+def test_gradients():
+    x = Reverse(3.0)
+    y = Reverse(2.0)
+    z = Reverse(5.0)
+    unrelated = cos(x) * z
+    f = x * y
+
+    assert gradients(f, [x, y, z]) == approx([2, 3, 0])
+    assert gradients(f, [x], seed=2.0) == approx([4])
+    # the graph itself is left untouched
+    assert x.gradient_value is None
+    assert unrelated.gradient_value is None
+
+
+def test_backward_deep_graph():
+    x = Reverse(1.0)
+    f = x
+    for _ in range(10000):
+        f = f * 1.0001
+
+    f.backward()
+    assert x.get_gradient() == approx(1.0001 ** 10000)
+    assert gradients(f, [x]) == approx([1.0001 ** 10000])
+
+
+def test_get_gradient_deep_graph():
+    x = Reverse(1.0)
+    f = x
+    for _ in range(10000):
+        f = f * 1.0001
+    unrelated = x * 3.0
+
+    f.gradient_value = 1.0
+    unrelated.gradient_value = 2.0
+    assert x.get_gradient() == approx(1.0001 ** 10000 + 6)
+    assert x.children[0][1].gradient_value == approx(1.0001 ** 9999)
+
+    x.reset_gradient()
+    assert x.gradient_value is None
+    assert f.gradient_value is None
+    assert unrelated.gradient_value is None
+
+
+def test_get_gradient_skips_unrelated_nodes():
+    x = Reverse(2.0)
+    unrelated = [x + i for i in range(100)]
+    y = x * 3 + sin(x)
+    z = x ** 2
+    y.gradient_value = 1.0
+    z.gradient_value = 2.0
+
+    assert x.get_gradient() == approx(3 + np.cos(2) + 2 * 4)
+    assert all(node.gradient_value is None for node in unrelated)
+    assert unrelated[0].get_gradient() == 0
+
+
+def test_discarded_graph_is_freed():
+    gc.disable()
+    try:
+        x = Reverse(np.ones(5))
+        f = sin(x * 2.0) + x
+        f.backward()
+        assert len(x.children) == 2
+
+        output = weakref.ref(f)
+        del f
+        # without reference cycles the graph goes away with its output
+        assert output() is None
+        assert x.children == []
+        assert x.get_gradient() == approx(2 * np.cos(2) + 1)
+    finally:
+        gc.enable()
+
+
+def test_partials_are_lazy():
+    x = Reverse(0.5)
+    f = sin(x) * exp(x) + log(x, 2)
+
+    # recording the graph computes values only
+    assert f._partials is None
+    assert all(child._partials is None for _, child in x.children)
+
+    assert gradients(f, [x]) == approx(
+        [np.cos(0.5) * np.exp(0.5) + np.sin(0.5) * np.exp(0.5) + 1 / (0.5 * np.log(2))]
+    )
+    assert f._partials is not None
+
+
+def test_partials_grouped_by_operation():
+    xs = [Reverse(0.1 * i) for i in range(1, 20)]
+    f = sum([sin(x) * x ** 2 for x in xs])
+
+    expected = [
+        np.cos(0.1 * i) * (0.1 * i) ** 2 + 2 * np.sin(0.1 * i) * 0.1 * i
+        for i in range(1, 20)
+    ]
+    assert gradients(f, xs) == approx(expected)
+
+    # each node still matches its own partial derivative
+    x = Reverse(0.3)
+    g = sin(x) * x ** 2
+    assert gradients(g, [x]) == approx([expected[2]])
+
+
+def test_log_reverse_base():
+    x = Reverse(8.0)
+    base = Reverse(2.0)
+    f = log(x, base)
+
+    assert f.value == approx(3)
+    assert gradients(f, [x, base]) == approx(
+        [1 / (8 * np.log(2)), -3 / (2 * np.log(2))]
+    )
+
+
+def test_backward_inputs():
+    x = Reverse(2.0)
+    p = Reverse(3.0)
+    q = exp(p)
+    f = x * q + p ** 2
+    f.backward(inputs=[x])
+
+    assert x.gradient_value == approx(np.exp(3))
+    # the subtree that does not lead to x is skipped
+    assert p.gradient_value is None
+    assert q.gradient_value is None
+    # get_gradient of the skipped nodes sweeps from f
+    assert p.get_gradient() == approx(2 * np.exp(3) + 6)
+    assert q.gradient_value == approx(2)
+
+
+def test_seeds_are_released():
+    # propagates the seeds left by the other tests
+    Reverse(0.0).get_gradient()
+
+    x = Reverse(2.0)
+    outputs = [x * i for i in range(100)]
+    for f in outputs:
+        f.backward()
+    # every gradient is known, so there is nothing left to sweep from
+    assert len(_seeds()) == 0
+
+    for f in outputs:
+        f.backward(inputs=[x])
+    assert len(_seeds()) == 100
+
+    assert Reverse(1.0).get_gradient() == 0
+    assert len(_seeds()) == 0
+
+
+def test_seeds_are_per_thread():
+    x = Reverse(2.0)
+    f = x * 3.0
+    f.gradient_value = 1.0
+
+    def other():
+        y = Reverse(1.0)
+        g = y * 5.0
+        g.gradient_value = 1.0
+        return y.get_gradient()
+
+    with ThreadPoolExecutor(1) as pool:
+        assert pool.submit(other).result() == approx(5)
+
+    # the sweep of the other thread left this graph alone
+    assert x.gradient_value is None
+    assert x.get_gradient() == approx(3)
+
+
+def test_value_and_grad():
+    evaluate = value_and_grad(lambda x, c: sum(x ** 2) * c)
+    value, gradient = evaluate([1.0, 2.0], 3.0)
+
+    assert value == approx(15)
+    assert gradient == approx([6, 12])
+
+    value, gradient = evaluate(2.0, 1.0)
+    assert value == approx(4)
+    assert gradient == approx(4)
+
+    assert value_and_grad(lambda x: 1.0)([1.0, 2.0])[1] == approx([0, 0])
+
+
+def test_parameter():
+    W = Reverse.parameter(np.array([1.0, 2.0]))
+    f = sum(W * 3.0)
+
+    assert W.children == []
+    with raises(ValueError):
+        W.value[0] = 5.0
+
+    assert gradients(f, [W])[0] == approx([3, 3])
+
+    f.backward()
+    assert W.gradient_value is None
+    with raises(ValueError):
+        W.get_gradient()
+
+
+def test_tape():
+    x = Reverse(2.0)
+    W = Reverse.parameter(3.0)
+    f = x * W
+
+    with Tape() as tape:
+        f.backward()
+        assert W.get_gradient() == approx(2)
+        assert x.get_gradient() == approx(3)
+
+        with Tape():
+            (W * W).backward()
+            assert W.get_gradient() == approx(6)
+
+        assert W.get_gradient() == approx(2)
+
+    assert x.gradient_value is None
+    assert tape.gradient(x) == approx(3)
+    assert len(tape) == 3
+
+    tape.clear()
+    with raises(ValueError):
+        tape.gradient(x)
+
+
+def test_threads_share_parameters():
+    rng = np.random.RandomState(0)
+    W = Reverse.parameter(rng.rand(20, 5))
+    b = Reverse.parameter(rng.rand(20))
+    inputs = [rng.rand(5) for _ in range(200)]
+
+    def loss(x):
+        return sum(exp(-((W @ x + b) ** 2)))
+
+    def work(x):
+        with Tape():
+            f = loss(x)
+            f.backward()
+            return W.get_gradient(), b.get_gradient()
+
+    def expected(x):
+        z = W.value @ x + b.value
+        d = -2 * z * np.exp(-(z ** 2))
+        return np.outer(d, x), d
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(work, inputs * 5))
+        functional = list(pool.map(lambda x: gradients(loss(x), [W, b]), inputs))
+
+    for x, (dW, db), (gW, gb) in zip(inputs * 5, results, functional * 5):
+        assert dW == approx(expected(x)[0])
+        assert db == approx(expected(x)[1])
+        assert gW == approx(dW)
+        assert gb == approx(db)
+
+    assert W.children == [] and b.children == []
+
+
+def test_per_example_grad():
+    rng = np.random.RandomState(0)
+    batch = np.column_stack([rng.randn(8, 3), np.sign(rng.randn(8))])
+    w = rng.randn(3)
+
+    def losses(w, batch):
+        x, y = batch[..., :-1], batch[..., -1]
+        return log(1 + exp(-y * sum(w * x, axis=-1)))
+
+    values, grads = per_example_grad(losses)(w, batch)
+
+    assert grads.shape == (8, 3)
+    for b in range(8):
+        value, gradient = value_and_grad(losses)(w, batch[b])
+        assert values[b] == approx(value)
+        assert grads[b] == approx(gradient)
+
+    with raises(ValueError):
+        per_example_grad(lambda w, batch: sum(w))(w, batch)
+
+
+def test_per_example_rows_are_independent():
+    rng = np.random.RandomState(1)
+    batch = rng.randn(6, 4)
+    w = rng.randn(4)
+
+    def losses(w, batch):
+        return logsumexp(w * batch, axis=-1) + sum(tanh(w) * batch, axis=-1) ** 2
+
+    _, grads = per_example_grad(losses)(w, batch)
+
+    for j in range(6):
+        changed = batch.copy()
+        changed[j] = 10 * rng.randn(4)
+        _, changed_grads = per_example_grad(losses)(w, changed)
+
+        rows = np.arange(6) != j
+        assert changed_grads[rows] == approx(grads[rows])
+        assert changed_grads[j] != approx(grads[j])
+
+
+def test_piecewise():
+    x = Reverse(np.array([-2.0, 0.0, 0.5, 3.0]))
+
+    assert gradients(sum(rabs(x)), [x])[0] == approx([-1, 0, 1, 1])
+    assert abs(Reverse(-2.0)).value == approx(2)
+
+    f = where(x < 0, x ** 2, 3 * x)
+    assert f.value == approx([4, 0, 1.5, 9])
+    assert gradients(sum(f), [x])[0] == approx([-4, 3, 3, 3])
+
+    assert gradients(sum(maximum(x, 0.0)), [x])[0] == approx([0, 0.5, 1, 1])
+    assert gradients(sum(minimum(x, 0.5)), [x])[0] == approx([1, 1, 0.5, 0])
+
+    f = clip(x, -1.0, 0.5)
+    assert f.value == approx([-1, 0, 0.5, 0.5])
+    assert gradients(sum(f), [x])[0] == approx([0, 1, 1, 0])
+
+
+def test_piecewise_two_variables():
+    x = Reverse(2.0)
+    y = Reverse(2.0)
+
+    assert gradients(maximum(x, y), [x, y]) == approx([0.5, 0.5])
+    assert gradients(clip(x, y - 1, 3.0), [x, y]) == approx([1, 0])
+    assert gradients(clip(x, y + 1, 4.0), [x, y]) == approx([0, 1])
+
+    # scalar nodes of the same operation get their partials together
+    nodes = [maximum(x * k, y) for k in (0.5, 1.0, 2.0)]
+    assert gradients(sum(nodes), [x, y]) == approx([0.5 + 2, 1 + 0.5])
+
+
+def test_fused_activations():
+    values = np.array([-1000.0, -1.0, 0.0, 2.0, 1000.0])
+    s = 1 / (1 + np.exp(-values))
+    x = Reverse(values)
+
+    f = logistic(x)
+    assert np.all(np.isfinite(f.value))
+    assert f.value == approx(s)
+    assert gradients(sum(f), [x])[0] == approx(s * (1 - s))
+
+    f = softplus(x)
+    assert f.value[-1] == approx(1000)
+    assert f.value[0] == approx(0)
+    assert gradients(sum(f), [x])[0] == approx(s)
+
+    y = Reverse(1e-10)
+    assert log1p(y).value == approx(1e-10, rel=1e-12)
+    assert gradients(log1p(y), [y]) == approx([1])
+    assert expm1(y).value == approx(1e-10, rel=1e-12)
+    assert gradients(expm1(y), [y]) == approx([1])
+
+    # a single node whose only parent is the input
+    assert logistic(y).parents[0][1] is y
+
+
+def test_softmax():
+    values = np.array([[1.0, 2.0, 3.0], [0.0, 0.0, 1000.0]])
+    x = Reverse(values)
+    seed = np.array([[1.0, 0.0, 0.0], [0.0, 2.0, 0.0]])
+
+    f = softmax(x, axis=1)
+    exps = np.exp(values - values.max(axis=1, keepdims=True))
+    s = exps / exps.sum(axis=1, keepdims=True)
+    assert f.value == approx(s)
+
+    expected = [(np.diag(s[k]) - np.outer(s[k], s[k])) @ seed[k] for k in range(2)]
+    assert gradients(f, [x], seed)[0] == approx(np.array(expected))
+
+    f = logsumexp(x, axis=1)
+    assert f.value == approx([np.log(np.sum(np.exp(values[0]))), 1000])
+    gradient = gradients(f, [x], np.array([1.0, 0.0]))[0]
+    assert gradient == approx(np.stack([s[0], np.zeros(3)]))
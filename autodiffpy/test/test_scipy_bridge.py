@@ -0,0 +1,87 @@
+from autodiffpy.scipy_bridge import ScipyObjective, minimize
+import autodiffpy as ad
+from pytest import approx, importorskip, raises
+import numpy as np
+
+
+def rosenbrock(x):
+    return ad.sum(100 * (x[1:] - x[:-1] ** 2) ** 2) + ad.sum((1 - x) ** 2)
+
+
+def test_shared_cache():
+    objective = ScipyObjective(rosenbrock)
+    x = np.array([-1.0, 1.0])
+
+    assert objective.fun(x) == approx(4)
+    assert objective.jac(x) == approx([-4, 0])
+    assert objective.misses == 1 and objective.hits == 1
+
+    # a new array with the same values is a hit
+    objective.jac(np.array([-1.0, 1.0]))
+    assert objective.misses == 1 and objective.hits == 2
+
+
+def test_cache_keyed_by_point():
+    data = np.random.RandomState(0).randn(1000, 2)
+    objective = ScipyObjective(lambda x, data: ad.sum((data @ x) ** 2), args=(data,))
+
+    for x in np.eye(2):
+        assert objective.fun(x) == approx(np.sum((data @ x) ** 2))
+        assert objective.jac(x) == approx(2 * data.T @ (data @ x))
+
+    assert objective.misses == 2 and objective.hits == 2
+    # only the points are part of the keys, not the data
+    assert all(len(key) == 1 for key in objective.cache._results)
+
+
+def test_cache_eviction():
+    objective = ScipyObjective(rosenbrock, cache_size=2)
+
+    objective.fun(np.array([0.0, 0.0]))
+    objective.fun(np.array([1.0, 0.0]))
+    objective.fun(np.array([0.0, 0.0]))
+    # evicts [1, 0], the least recently used point
+    objective.fun(np.array([2.0, 0.0]))
+    objective.fun(np.array([0.0, 0.0]))
+    assert objective.misses == 3
+
+    objective.fun(np.array([1.0, 0.0]))
+    assert objective.misses == 4
+
+    objective.clear()
+    objective.fun(np.array([0.0, 0.0]))
+    assert objective.misses == 5
+
+    with raises(ValueError):
+        ScipyObjective(rosenbrock, cache_size=0)
+
+
+def test_hessp():
+    a = np.array([[2.0, 1.0], [1.0, 3.0]])
+    objective = ScipyObjective(lambda x, a: ad.sum(x * (a @ x)) / 2, args=(a,))
+
+    assert objective.hessp(np.array([1.0, 2.0]), np.array([1.0, -1.0])) == approx(
+        a @ [1, -1]
+    )
+
+    x = np.array([0.5, 0.2])
+    hessian = np.array(
+        [[1200 * x[0] ** 2 - 400 * x[1] + 2, -400 * x[0]], [-400 * x[0], 202]]
+    )
+    assert ScipyObjective(rosenbrock).hessp(x, np.array([1.0, 2.0])) == approx(
+        hessian @ [1, 2]
+    )
+
+
+def test_minimize():
+    importorskip("scipy")
+
+    result = minimize(rosenbrock, np.zeros(5))
+    assert result.success
+    assert result.x == approx(np.ones(5), abs=1e-4)
+    # one value and gradient pass per point
+    assert result.objective.misses == result.nfev
+
+    result = minimize(rosenbrock, np.zeros(5), method="trust-ncg")
+    assert result.success
+    assert result.x == approx(np.ones(5), abs=1e-4)
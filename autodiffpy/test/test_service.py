@@ -0,0 +1,187 @@
+from autodiffpy.service import GradientService, serve
+import autodiffpy as ad
+from pytest import approx, raises
+import asyncio
+import json
+import numpy as np
+
+
+def run(coroutine):
+    """Runs coroutine in a new event loop, as asyncio.run does from Python 3.7"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def f(x, y):
+    return ad.sin(x * y) + x ** 2
+
+
+def expected(x, y):
+    return (
+        np.sin(x * y) + x ** 2,
+        [y * np.cos(x * y) + 2 * x, x * np.cos(x * y)],
+    )
+
+
+def test_requests_are_batched():
+    async def main():
+        service = GradientService(max_latency=0.05)
+        service.register("f", f, 2)
+
+        points = [(0.1 * i, 1.0 - 0.1 * i) for i in range(10)]
+        results = await asyncio.gather(*[service.evaluate("f", p) for p in points])
+        await service.close()
+        return service, points, results
+
+    service, points, results = run(main())
+
+    for point, (value, gradient) in zip(points, results):
+        assert value == approx(expected(*point)[0])
+        assert gradient == approx(expected(*point)[1])
+
+    assert service.metrics.batches == 1
+    assert service.metrics.requests == 10
+    assert service.metrics.max_queue_depth == 10
+    assert service.metrics.mean_batch_size == 10
+
+
+def test_max_batch_size():
+    async def main():
+        service = GradientService(max_batch_size=4, max_latency=0.05)
+        service.register("f", f, 2)
+        await asyncio.gather(*[service.evaluate("f", (1.0, 2.0)) for _ in range(10)])
+        await service.close()
+        return service.metrics
+
+    metrics = run(main())
+
+    assert metrics.batches == 3
+    assert metrics.largest_batch == 4
+    assert "10 requests in 3 batches" in str(metrics)
+
+
+def test_close_cancels_pending_batch():
+    async def main():
+        service = GradientService(max_latency=5.0)
+        service.register("f", f, 2)
+
+        pending = [
+            asyncio.ensure_future(service.evaluate("f", (1.0, 2.0))) for _ in range(3)
+        ]
+        # let the worker take the requests off the queue and wait for more
+        await asyncio.sleep(0.05)
+        assert service.queue_depth == 0
+
+        await service.close()
+        return await asyncio.wait_for(
+            asyncio.gather(*pending, return_exceptions=True), 1.0
+        )
+
+    results = run(main())
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+def test_errors():
+    async def main():
+        service = GradientService()
+        service.register("f", f, 2)
+        service.register("bad", lambda x: ad.log(x, "e"), 1)
+
+        with raises(ValueError):
+            await service.evaluate("g", (1.0, 2.0))
+
+        with raises(ValueError):
+            await service.evaluate("f", (1.0,))
+
+        with raises(ValueError):
+            await service.evaluate("bad", (1.0,))
+
+        # the service keeps working after a failed batch
+        value, _ = await service.evaluate("f", (1.0, 2.0))
+        await service.close()
+        return value
+
+    assert run(main()) == approx(expected(1.0, 2.0)[0])
+
+    with raises(ValueError):
+        GradientService(max_batch_size=0)
+
+
+def test_failing_point_in_a_batch():
+    def picky(x):
+        if np.any(x.value < 0):
+            raise ValueError("negative input")
+        return x ** 2
+
+    async def main():
+        service = GradientService(max_latency=0.05)
+        service.register("picky", picky, 1)
+
+        points = [(1.0,), (-1.0,), (2.0,)]
+        results = await asyncio.gather(
+            *[service.evaluate("picky", p) for p in points], return_exceptions=True
+        )
+        await service.close()
+        return service.metrics, results
+
+    metrics, (first, failed, last) = run(main())
+
+    assert isinstance(failed, ValueError)
+    assert first[0] == approx(1) and first[1] == approx([2])
+    assert last[0] == approx(4) and last[1] == approx([4])
+    assert metrics.batches == 1
+    assert metrics.requests == 3
+
+
+def test_undefined_gradient_in_a_batch():
+    async def main():
+        service = GradientService(max_latency=0.05)
+        service.register("sqrt", ad.sqrt, 1)
+
+        results = await asyncio.gather(
+            *[service.evaluate("sqrt", p) for p in [(4.0,), (-1.0,)]],
+            return_exceptions=True,
+        )
+        await service.close()
+        return results
+
+    defined, undefined = run(main())
+
+    assert defined[1] == approx([0.25])
+    assert isinstance(undefined, ValueError)
+
+
+def test_serve():
+    async def main():
+        service = GradientService(max_latency=0.01)
+        service.register("f", f, 2)
+        server = await serve(service)
+        host, port = server.sockets[0].getsockname()[:2]
+
+        reader, writer = await asyncio.open_connection(host, port)
+        requests = [{"id": i, "function": "f", "point": [0.5, i]} for i in range(5)]
+        requests.append({"id": 5, "function": "g", "point": [0.5, 1.0]})
+        for request in requests:
+            writer.write((json.dumps(request) + "\n").encode())
+        writer.write_eof()
+
+        responses = [json.loads(line) async for line in reader]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        await service.close()
+        return service, responses
+
+    service, responses = run(main())
+    responses = {response["id"]: response for response in responses}
+
+    for i in range(5):
+        assert responses[i]["value"] == approx(expected(0.5, i)[0])
+        assert responses[i]["gradient"] == approx(expected(0.5, i)[1])
+
+    assert "Unknown function" in responses[5]["error"]
+    assert service.metrics.batches == 1
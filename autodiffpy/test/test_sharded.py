@@ -0,0 +1,110 @@
+from autodiffpy.sharded import ShardedGradient, sharded_grad, _tree_sum
+from autodiffpy import sharded
+from autodiffpy.reverse import sum, exp, log
+from autodiffpy.precision import precision
+from pytest import approx, mark, raises
+import numpy as np
+
+
+needs_shared_memory = mark.skipif(
+    sharded.shared_memory is None, reason="needs Python 3.8+"
+)
+
+
+def logistic_loss(w, records):
+    x, y = records[:, :-1], records[:, -1]
+    z = x @ w
+    return sum(log(1 + exp(-y * z)))
+
+
+def squared_loss(w, records, scale):
+    return sum((records @ w) ** 2) * scale
+
+
+def expected(w, records):
+    x, y = records[:, :-1], records[:, -1]
+    z = x @ w
+    value = np.sum(np.log(1 + np.exp(-y * z)))
+    gradient = x.T @ (-y / (1 + np.exp(y * z)))
+    return value, gradient
+
+
+def data(n):
+    rng = np.random.RandomState(0)
+    x = rng.randn(n, 3)
+    y = np.sign(rng.randn(n))
+    return np.column_stack([x, y])
+
+
+@needs_shared_memory
+def test_sharded_grad():
+    records = data(1000)
+    w = np.array([0.5, -0.2, 0.1])
+
+    value, gradient = sharded_grad(logistic_loss, w, records, workers=2, chunk=64)
+
+    assert value == approx(expected(w, records)[0])
+    assert gradient == approx(expected(w, records)[1])
+
+
+@needs_shared_memory
+def test_reused_pool():
+    records = data(300)
+
+    with ShardedGradient(logistic_loss, records, workers=2, chunk=1000) as evaluate:
+        assert evaluate.workers == 2
+
+        for w in np.random.RandomState(1).randn(3, 3):
+            value, gradient = evaluate(w)
+            assert value == approx(expected(w, records)[0])
+            assert gradient == approx(expected(w, records)[1])
+
+
+@needs_shared_memory
+def test_args():
+    records = np.arange(12.0).reshape(6, 2)
+    value, gradient = sharded_grad(
+        squared_loss, [1.0, 1.0], records, workers=1, chunk=4, args=(0.5,)
+    )
+
+    assert value == approx(0.5 * np.sum(records.sum(axis=1) ** 2))
+    assert gradient == approx(records.T @ records.sum(axis=1))
+
+
+def test_tree_sum():
+    results = [(float(k), np.array([k, 2 * k])) for k in range(7)]
+
+    value, gradient = _tree_sum(results)
+
+    assert value == approx(21)
+    assert gradient == approx([21, 42])
+
+
+@needs_shared_memory
+def test_invalid():
+    with raises(ValueError):
+        ShardedGradient(logistic_loss, data(10), chunk=0)
+
+    with raises(ValueError):
+        ShardedGradient(logistic_loss, np.zeros((0, 4)))
+
+
+def test_without_shared_memory(monkeypatch):
+    # multiprocessing.shared_memory is missing before Python 3.8
+    monkeypatch.setattr(sharded, "shared_memory", None)
+
+    with raises(RuntimeError):
+        ShardedGradient(logistic_loss, data(10))
+
+
+@needs_shared_memory
+def test_float32():
+    records = data(500)
+    w = np.array([0.5, -0.2, 0.1])
+
+    with precision(np.float32):
+        value, gradient = sharded_grad(logistic_loss, w, records, workers=2, chunk=64)
+
+    assert gradient.dtype == np.float64
+    assert value == approx(expected(w, records)[0], rel=1e-5)
+    assert gradient == approx(expected(w, records)[1], rel=1e-4)
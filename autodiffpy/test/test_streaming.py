@@ -0,0 +1,95 @@
+from autodiffpy.streaming import GradientAccumulator, stream_grad
+from autodiffpy.reverse import Reverse, sum, dot, gradients
+from autodiffpy.precision import precision
+from pytest import approx
+import numpy as np
+import weakref
+
+
+def squared_error(w, record):
+    x, y = record[:-1], record[-1]
+    return (dot(w, x) - y) ** 2
+
+
+def batch_squared_error(w, records, scale):
+    return sum((records[:, :-1] @ w - records[:, -1]) ** 2) * scale
+
+
+def records(n):
+    rng = np.random.RandomState(0)
+    for _ in range(n):
+        yield rng.rand(4)
+
+
+def expected(w, n):
+    data = np.array(list(records(n)))
+    residual = data[:, :-1] @ w - data[:, -1]
+    return np.sum(residual ** 2), 2 * data[:, :-1].T @ residual
+
+
+def test_stream_grad():
+    w = np.array([0.1, 0.2, 0.3])
+    value, gradient = stream_grad(squared_error, w, records(100))
+
+    assert value == approx(expected(w, 100)[0])
+    assert gradient == approx(expected(w, 100)[1])
+
+
+def test_mini_batches():
+    w = np.array([0.1, 0.2, 0.3])
+    accumulator = GradientAccumulator(batch_squared_error, w, args=(1.0,))
+    value, gradient = accumulator.add_all(records(100), batch_size=32)
+
+    assert accumulator.count == 4
+    assert value == approx(expected(w, 100)[0])
+    assert gradient == approx(expected(w, 100)[1])
+
+    accumulator.reset()
+    assert accumulator.value == 0
+    assert accumulator.gradient == approx([0, 0, 0])
+
+
+def test_graphs_are_released():
+    outputs = []
+
+    def loss(w, record):
+        out = squared_error(w, record)
+        outputs.append(weakref.ref(out))
+        return out
+
+    stream_grad(loss, np.zeros(3), records(50))
+
+    assert len(outputs) == 50
+    assert all(ref() is None for ref in outputs)
+
+
+def test_shared_nodes_are_detached():
+    scale = Reverse(0.25)
+    offset = scale * 2
+    other = scale * 3
+
+    def loss(w, record):
+        return squared_error(w, record) + offset * sum(w)
+
+    accumulator = GradientAccumulator(loss, np.zeros(3))
+    accumulator.add_all(records(20))
+
+    assert offset.children == []
+    assert accumulator.gradient == approx(expected(np.zeros(3), 20)[1] + 10)
+
+    # the graphs that existed before are left intact
+    assert gradients(offset, [scale]) == approx([2])
+    assert gradients(other, [scale]) == approx([3])
+
+
+def test_float32_totals():
+    w = np.array([0.1, 0.2, 0.3])
+
+    with precision(np.float32):
+        accumulator = GradientAccumulator(squared_error, w)
+        value, gradient = accumulator.add_all(records(100))
+
+    assert accumulator.params.dtype == np.float32
+    assert gradient.dtype == np.float64
+    assert value == approx(expected(w, 100)[0], rel=1e-5)
+    assert gradient == approx(expected(w, 100)[1], rel=1e-5)
@@ -0,0 +1,129 @@
+from autodiffpy.vectorize import vectorize
+from autodiffpy.reverse import Reverse
+import autodiffpy as ad
+from pytest import approx, raises
+import numpy as np
+
+
+def test_vectorize():
+    g = vectorize(lambda x: x ** x - 2)
+    x = np.linspace(0.5, 2, 50)
+
+    values, (derivatives,) = g.value_and_gradients(x)
+
+    assert g(x) == approx(x ** x - 2)
+    assert values == approx(x ** x - 2)
+    assert derivatives == approx(x ** x * (np.log(x) + 1))
+    assert len(g.paths) == 1
+
+
+def test_several_inputs():
+    g = vectorize(lambda x, y: ad.sin(x * y) + ad.exp(y))
+    x, y = np.linspace(0, 1, 10), 2.0
+
+    values, (dx, dy) = g.value_and_gradients(x, y)
+
+    assert values == approx(np.sin(x * y) + np.exp(y))
+    assert dx == approx(y * np.cos(x * y))
+    assert dy == approx(x * np.cos(x * y) + np.exp(y))
+
+
+def test_branches():
+    def f(x):
+        if x < 0:
+            return -x
+        if x > 1:
+            return ad.log(x) + 1
+        return x ** 2
+
+    g = vectorize(f)
+    x = np.linspace(-2, 3, 101)
+    values, (derivatives,) = g.value_and_gradients(x)
+
+    assert values == approx(np.where(x < 0, -x, np.where(x > 1, np.log(x) + 1, x ** 2)))
+    assert derivatives == approx(np.where(x < 0, -1, np.where(x > 1, 1 / x, 2 * x)))
+    assert len(g.paths) == 3
+
+
+def test_branch_on_two_inputs():
+    def f(x, y):
+        return x * y if x < y else x + y
+
+    g = vectorize(f)
+    x, y = np.array([1.0, 3.0, 2.0]), np.array([2.0, 1.0, 2.0])
+    values, (dx, dy) = g.value_and_gradients(x, y)
+
+    assert values == approx([2, 4, 4])
+    assert dx == approx([2, 1, 1])
+    assert dy == approx([1, 1, 1])
+
+
+def test_equality_branches():
+    g = vectorize(lambda x: x * 2 if x == 1 else x * 3)
+    values, (derivatives,) = g.value_and_gradients(np.array([1.0, 2.0]))
+
+    assert values == approx([2, 6])
+    assert derivatives == approx([2, 3])
+
+    h = vectorize(lambda x, y: x - y if x != y else x * y)
+    assert h(np.array([2.0, 3.0]), np.array([2.0, 1.0])) == approx([4, 2])
+
+
+def test_nested_vectorize():
+    inner = vectorize(lambda y: y * 2 if y > 1 else y)
+
+    def f(x):
+        # the inner function is traced while the comparison below is
+        scale = float(inner(3.0))
+        return x * scale if x > 0 else -x
+
+    assert vectorize(f)(np.array([1.0, -2.0])) == approx([6, 2])
+
+
+def test_constant_paths():
+    g = vectorize(lambda x: 1.0 if x > 0 else x)
+    values, (derivatives,) = g.value_and_gradients([-1.0, 2.0])
+
+    assert values == approx([-1, 1])
+    assert derivatives == approx([1, 0])
+
+
+def test_data_dependent_loop():
+    def f(x):
+        while x > 1:
+            x = x / 2
+        return x
+
+    with raises(ValueError):
+        vectorize(f, max_paths=8)(np.array([3.0, 5.0]))
+
+
+def test_comparisons_outside_tracing():
+    x = Reverse(np.array([1.0, 3.0]))
+
+    assert list(x < 2) == [True, False]
+    assert list(x >= 3) == [False, True]
+    assert Reverse(2.0) <= Reverse(2.0)
+    assert not 1 > Reverse(2.0)
+
+
+def test_where_is_traced_once():
+    g = vectorize(lambda x: ad.where(x < 0, -x, x ** 2) + ad.clip(x, -1, 1))
+    x = np.linspace(-2, 2, 41)
+    values, (derivatives,) = g.value_and_gradients(x)
+
+    assert len(g.paths) == 1
+    assert values == approx(np.where(x < 0, -x, x ** 2) + np.clip(x, -1, 1))
+    assert derivatives == approx(
+        np.where(x < 0, -1, 2 * x) + np.where(np.abs(x) <= 1, 1, 0)
+    )
+
+
+def test_where_on_equality():
+    g = vectorize(lambda x: ad.where(x == 0, 1.0, x) * ad.where(x != 2, x, 3.0))
+    x = np.array([0.0, 1.0, 2.0, 3.0])
+    values, (derivatives,) = g.value_and_gradients(x)
+
+    assert len(g.paths) == 1
+    assert values == approx([0, 1, 6, 9])
+    assert derivatives == approx([1, 2, 3, 6])
@@ -0,0 +1,232 @@
+"""Vectorizes functions written for scalars, with their derivatives.
+
+A function such as lambda x: x ** x - 2 is written for a single number, and calling
+it in a Python loop over many inputs builds and differentiates a separate graph for
+every one of them. vectorize(f) traces f a single time with scalar Reverse inputs
+instead, and replays the recorded operations on whole arrays of inputs (see
+autodiffpy.parallel), which gives the values and the derivatives at every input from
+one pass over the graph.
+
+Control flow that depends on comparisons of the inputs, such as
+
+    def f(x):
+        if x < 0:
+            return -x
+        return x ** 2
+
+would only record the branch taken at the point of the trace. While f is traced the
+comparisons of Reverse objects, including == and !=, are decided by the tracer,
+which records each one, and f is traced again for every combination of outcomes
+that it reaches, up to max_paths traces. Replaying a trace gives the values along
+that path at every input, and the recorded comparisons give the mask of the inputs
+that actually take it, so the result is assembled with one masked where per path.
+Loops whose number of iterations depends on the inputs have an unbounded number of
+paths and are rejected. A comparison that is passed to where() instead of being used
+as a bool stays part of the graph, so functions written with where, abs, maximum,
+minimum and clip are traced only once.
+
+f must be written with the operators and the functions of the top-level autodiffpy
+package, and must not convert its inputs to plain numbers.
+"""
+import numpy as np
+
+from autodiffpy.parallel import ParallelGraph
+from autodiffpy.precision import get_precision
+from autodiffpy.reverse import Reverse, _Comparison, _LOCAL, _values
+
+
+class _Branch(_Comparison):
+    """The result of a comparison while tracing, decided when used as a bool"""
+
+    def __init__(self, tracer, op, x, y):
+        super().__init__(op, x, y)
+        self.tracer = tracer
+
+    def __bool__(self):
+        return self.tracer.decide(self)
+
+
+class _Tracer:
+    """Decides the comparisons of one trace, following the given decisions and
+    the values at the trace point after them.
+    """
+
+    def __init__(self, decisions, max_conditions):
+        self.decisions = decisions
+        self.max_conditions = max_conditions
+        self.conditions = []
+        self._outer = None
+
+    def __enter__(self):
+        # a function vectorized within a traced function is traced with its
+        # own tracer, after which the enclosing one takes over again
+        self._outer = _LOCAL.tracer
+        _LOCAL.tracer = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _LOCAL.tracer = self._outer
+        self._outer = None
+
+    def compare(self, op, x, y):
+        return _Branch(self, op, x, y)
+
+    def decide(self, branch):
+        k = len(self.conditions)
+        if k >= self.max_conditions:
+            raise ValueError("f makes too many data dependent decisions to vectorize")
+
+        if k < len(self.decisions):
+            outcome = self.decisions[k]
+        else:
+            outcome = bool(np.all(branch.op(*_values([branch.x, branch.y]))))
+
+        self.conditions.append((branch.op, branch.x, branch.y, outcome))
+        return outcome
+
+
+class _Path:
+    """One trace of f, with the comparisons that select it"""
+
+    def __init__(self, inputs, output, conditions):
+        self.output = output
+        self.conditions = conditions
+
+        nodes, seen = [], set()
+        operands = [x for _, a, b, _ in conditions for x in (a, b)]
+        for node in [output] + operands:
+            if isinstance(node, Reverse) and id(node) not in seen:
+                seen.add(id(node))
+                nodes.append(node)
+
+        self._nodes = nodes
+        self._graph = ParallelGraph(nodes, inputs) if nodes else None
+
+    def evaluate(self, arrays, shape, derivatives):
+        """Returns the mask of the inputs that take this path, and the values
+        and gradients along it.
+        """
+        computed, gradients = {}, [np.zeros(shape, dtype=x.dtype) for x in arrays]
+
+        if self._graph is not None:
+            if derivatives:
+                one, zero = arrays[0].dtype.type(1), arrays[0].dtype.type(0)
+                seeds = [one if node is self.output else zero for node in self._nodes]
+                values, gradients = self._graph.value_and_gradients(
+                    *arrays, seeds=seeds
+                )
+            else:
+                values = self._graph.evaluate(*arrays)
+
+            computed = {id(node): value for node, value in zip(self._nodes, values)}
+
+        def value_of(x):
+            return computed[id(x)] if isinstance(x, Reverse) else x
+
+        mask = np.ones(shape, dtype=bool)
+        for op, x, y, outcome in self.conditions:
+            mask &= op(value_of(x), value_of(y)) == outcome
+
+        value = np.broadcast_to(value_of(self.output), shape)
+        gradients = [np.broadcast_to(g, shape) for g in gradients]
+
+        return mask, value, gradients
+
+
+class Vectorized:
+    """A function of scalars evaluated on arrays, created by vectorize.
+
+    Attributes:
+        f - the function of scalars
+        paths - the traces of f, one per reachable combination of the outcomes
+            of its comparisons, or None before the first call
+    """
+
+    def __init__(self, f, max_paths=64):
+        """Creates the vectorized function. f is traced on the first call.
+
+        Args:
+            f - function of scalar arguments
+            max_paths - the largest number of traces of f
+        """
+        self.f = f
+        self.max_paths = max_paths
+        self.paths = None
+
+    def _trace(self, point):
+        """Traces f at point once for every reachable sequence of decisions"""
+        paths, pending = [], [[]]
+
+        while pending:
+            decisions = pending.pop()
+            inputs = [Reverse(value) for value in point]
+            tracer = _Tracer(decisions, self.max_paths)
+
+            with np.errstate(all="ignore"), tracer:
+                output = self.f(*inputs)
+
+            taken = [outcome for _, _, _, outcome in tracer.conditions]
+            for k in range(len(decisions), len(taken)):
+                pending.append(taken[:k] + [not taken[k]])
+
+            paths.append(_Path(inputs, output, tracer.conditions))
+            if len(paths) > self.max_paths:
+                raise ValueError(
+                    "f has more than {} paths to vectorize".format(self.max_paths)
+                )
+
+        self.paths = paths
+
+    def _evaluate(self, inputs, derivatives):
+        dtype = get_precision()
+        arrays = np.broadcast_arrays(*[np.asarray(x, dtype=dtype) for x in inputs])
+        shape = np.shape(arrays[0])
+
+        if self.paths is None:
+            self._trace([float(np.ravel(x)[0]) if x.size else 0.0 for x in arrays])
+
+        value = np.zeros(shape, dtype=dtype)
+        gradients = [np.zeros(shape, dtype=dtype) for _ in arrays]
+
+        with np.errstate(all="ignore"):
+            for path in self.paths:
+                mask, path_value, path_gradients = path.evaluate(
+                    arrays, shape, derivatives
+                )
+                value = np.where(mask, path_value, value)
+                gradients = [
+                    np.where(mask, g, total)
+                    for g, total in zip(path_gradients, gradients)
+                ]
+
+        return value, gradients
+
+    def __call__(self, *inputs):
+        """Evaluates f at every element of the broadcast inputs"""
+        return self._evaluate(inputs, False)[0]
+
+    def value_and_gradients(self, *inputs):
+        """Evaluates f and its derivatives at every element of the broadcast inputs.
+
+        Returns:
+            The values, and a list with the derivative with respect to each input,
+            all with the broadcast shape of the inputs.
+        """
+        return self._evaluate(inputs, True)
+
+
+def vectorize(f, max_paths=64):
+    """Turns a function written for scalars into one that is evaluated on arrays
+    elementwise, with a value_and_gradients method for its derivatives.
+
+    Example:
+        def f(x):
+            if x < 1:
+                return x ** x - 2
+            return 2 * x - 3
+
+        g = ad.vectorize(f)
+        values = g(np.linspace(0, 2, 1000))
+        values, (derivatives,) = g.value_and_gradients(np.linspace(0, 2, 1000))
+    """
+    return Vectorized(f, max_paths)
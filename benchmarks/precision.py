@@ -0,0 +1,97 @@
+"""Memory and time of large batched gradients in float64 and in float32.
+
+Two workloads are measured in both precisions: forward mode derivatives of an
+elementwise function at every point of a large batch, and the reverse mode gradient
+of the loss of a two layer network over a large batch of inputs. The peak memory is
+that of the arrays numpy allocates while the gradient is computed, as traced by
+tracemalloc.
+
+    python -m benchmarks.precision --points 2000000 --batch 4096 --width 256
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from autodiffpy.forward import Forward
+from autodiffpy.precision import get_precision, precision
+from autodiffpy.reverse import Reverse, gradients
+import autodiffpy as ad
+
+
+def forward_batch(points):
+    x = Forward.batched("x", points)
+    y = ad.sin(x) * ad.exp(-(x ** 2)) + ad.logistic(3 * x) * x
+    return y.get_gradient("x")
+
+
+def reverse_batch(weights, inputs):
+    W1, W2 = [Reverse(w) for w in weights]
+    hidden = ad.tanh(W1 @ inputs)
+    loss = ad.sum(ad.softplus(W2 @ hidden)) / inputs.shape[1]
+    return gradients(loss, [W1, W2])
+
+
+def measure(function, repeats):
+    """Returns the best time of function and the peak memory of one call"""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return min(seconds), peak
+
+
+def main(arguments):
+    rng = np.random.RandomState(0)
+    width = arguments.width
+    points = rng.randn(arguments.points)
+    weights = [rng.randn(width, width) / np.sqrt(width) for _ in range(2)]
+    inputs = rng.randn(width, arguments.batch)
+
+    workloads = [
+        ("forward, {} points".format(arguments.points), lambda: forward_batch(points)),
+        # the data is stored in the precision it is used in, as Reverse objects
+        # only convert their own values
+        (
+            "reverse, batch of {}".format(arguments.batch),
+            lambda: reverse_batch(weights, inputs.astype(get_precision())),
+        ),
+    ]
+
+    for name, function in workloads:
+        results = {}
+        for dtype in (np.float64, np.float32):
+            with precision(dtype):
+                results[dtype] = measure(function, arguments.repeats)
+
+        print(name)
+        for dtype, (seconds, peak) in results.items():
+            print(
+                "  {:8} {:8.1f} ms {:8.1f} MB".format(
+                    np.dtype(dtype).name, 1000 * seconds, peak / 2 ** 20
+                )
+            )
+
+        (time64, peak64), (time32, peak32) = results[np.float64], results[np.float32]
+        print(
+            "  float32 is {:.2f}x as fast and uses {:.2f}x less memory".format(
+                time64 / time32, peak64 / peak32
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=2000000)
+    parser.add_argument("--batch", type=int, default=4096)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    main(parser.parse_args())
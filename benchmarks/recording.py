@@ -0,0 +1,104 @@
+"""Cost of recording reverse mode graphs of scalars, and of sweeping them.
+
+Many small graphs are built from scalar inputs, and each one is timed against
+evaluating the same expression with plain numbers. The graphs are built once
+dropping each one right away, and once keeping all of them alive, which is timed
+with the garbage collector enabled and disabled, since its full collections scan
+every node that is kept. Then the gradient of one long sum of terms is computed
+with backward().
+
+    python -m benchmarks.recording --graphs 20000 --terms 3000
+"""
+import argparse
+import gc
+import time
+
+import numpy as np
+
+from autodiffpy.reverse import Reverse, exp, sin
+
+
+def expression(x, y, sin, exp):
+    return sin(x) * y + x ** 2 - exp(y) / x
+
+
+def build(graphs):
+    for _ in range(graphs):
+        expression(Reverse(0.5), Reverse(1.5), sin, exp)
+
+
+def keep(graphs):
+    return [expression(Reverse(0.5), Reverse(1.5), sin, exp) for _ in range(graphs)]
+
+
+def without_gc(function):
+    """Returns function, called with the garbage collector disabled"""
+
+    def call():
+        gc.disable()
+        try:
+            return function()
+        finally:
+            gc.enable()
+
+    return call
+
+
+def evaluate(graphs):
+    for _ in range(graphs):
+        expression(0.5, 1.5, np.sin, np.exp)
+
+
+def long_sum(terms):
+    x = Reverse(0.3)
+    f = x
+    for _ in range(terms):
+        f = f + sin(x) * 1.01
+    return f
+
+
+def best(function, repeats):
+    """Returns the best time of function over repeats calls"""
+    seconds = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+def main(arguments):
+    graphs, terms = arguments.graphs, arguments.terms
+
+    recorded = best(lambda: build(graphs), arguments.repeats)
+    plain = best(lambda: evaluate(graphs), arguments.repeats)
+    print(
+        "recording {} graphs: {:8.1f} ms ({:.1f}x plain numbers)".format(
+            graphs, 1000 * recorded, recorded / plain
+        )
+    )
+
+    kept = best(lambda: keep(graphs), arguments.repeats)
+    kept_without_gc = best(without_gc(lambda: keep(graphs)), arguments.repeats)
+    print(
+        "keeping {} graphs:   {:8.1f} ms ({:.1f} ms without garbage collection)".format(
+            graphs, 1000 * kept, 1000 * kept_without_gc
+        )
+    )
+
+    sums = [long_sum(terms) for _ in range(arguments.repeats)]
+    sweeps = []
+    for f in sums:
+        start = time.perf_counter()
+        f.backward()
+        sweeps.append(time.perf_counter() - start)
+    print("backward over {} terms: {:8.1f} ms".format(terms, 1000 * min(sweeps)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--graphs", type=int, default=20000)
+    parser.add_argument("--terms", type=int, default=3000)
+    parser.add_argument("--repeats", type=int, default=3)
+    main(parser.parse_args())
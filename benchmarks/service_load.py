@@ -0,0 +1,92 @@
+"""Load generator for autodiffpy.service.
+
+Starts a GradientService on localhost, opens a number of client connections that
+each keep a fixed number of requests in flight, and reports the throughput, the
+latency percentiles and the batching metrics of the service. Running it with
+--max-batch-size 1 gives the throughput without micro-batching for comparison.
+
+    python -m benchmarks.service_load --clients 16 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+import autodiffpy as ad
+from autodiffpy.service import GradientService, serve
+
+
+def f(x, y, z):
+    return ad.exp(ad.sin(x * y)) + ad.log(z ** 2 + 1) * x - y / (z ** 2 + 2)
+
+
+async def client(host, port, requests, in_flight, latencies, seed):
+    """Sends requests over one connection, keeping in_flight of them unanswered"""
+    random = np.random.RandomState(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    sent, started = 0, {}
+
+    def send():
+        nonlocal sent
+        request = {"id": sent, "function": "f", "point": random.rand(3).tolist()}
+        started[sent] = time.perf_counter()
+        writer.write((json.dumps(request) + "\n").encode())
+        sent += 1
+
+    for _ in range(min(in_flight, requests)):
+        send()
+
+    for _ in range(requests):
+        response = json.loads(await reader.readline())
+        if "error" in response:
+            raise RuntimeError(response["error"])
+
+        latencies.append(time.perf_counter() - started.pop(response["id"]))
+        if sent < requests:
+            send()
+
+    writer.close()
+
+
+async def main(arguments):
+    service = GradientService(arguments.max_batch_size, arguments.max_latency)
+    service.register("f", f, 3)
+    server = await serve(service, arguments.host, arguments.port)
+    host, port = server.sockets[0].getsockname()[:2]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            client(host, port, arguments.requests, arguments.in_flight, latencies, i)
+            for i in range(arguments.clients)
+        ]
+    )
+    seconds = time.perf_counter() - start
+
+    server.close()
+    await server.wait_closed()
+    await service.close()
+
+    milliseconds = 1000 * np.percentile(latencies, [50, 90, 99])
+    print("{:.0f} requests/s".format(len(latencies) / seconds))
+    print("latency p50 {:.2f}ms, p90 {:.2f}ms, p99 {:.2f}ms".format(*milliseconds))
+    print(service.metrics)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="per client")
+    parser.add_argument("--in-flight", type=int, default=8, help="per client")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-latency", type=float, default=0.002)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main(parser.parse_args()))
+    finally:
+        loop.close()
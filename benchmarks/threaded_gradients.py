@@ -0,0 +1,53 @@
+"""Throughput of reverse mode gradients computed from several threads at once.
+
+Every request differentiates the loss of a small network, whose weights are shared
+Reverse.parameter nodes, at its own input batch. The matrix products release the GIL,
+so with large enough layers the throughput grows with the number of threads.
+
+    python -m benchmarks.threaded_gradients --threads 1 2 4 8 --width 512
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import numpy as np
+
+from autodiffpy.reverse import Reverse, Tape, sum, tanh
+
+
+def main(arguments):
+    rng = np.random.RandomState(0)
+    width = arguments.width
+    W1 = Reverse.parameter(rng.randn(width, width) / np.sqrt(width))
+    W2 = Reverse.parameter(rng.randn(width, width) / np.sqrt(width))
+    batches = [rng.randn(width, arguments.batch) for _ in range(arguments.requests)]
+
+    def work(x):
+        with Tape():
+            loss = sum(tanh(W2 @ tanh(W1 @ x)) ** 2)
+            loss.backward()
+            return W1.get_gradient(), W2.get_gradient()
+
+    baseline = None
+    for threads in arguments.threads:
+        with ThreadPoolExecutor(threads) as pool:
+            start = time.perf_counter()
+            list(pool.map(work, batches))
+            seconds = time.perf_counter() - start
+
+        rate = arguments.requests / seconds
+        baseline = baseline or rate
+        print(
+            "{:3d} threads: {:8.1f} gradients/s ({:.2f}x)".format(
+                threads, rate, rate / baseline
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=200)
+    main(parser.parse_args())
@@ -12,6 +12,7 @@ setup(
     version="0.0.9",
     packages=["autodiffpy"],
     install_requires=["numpy"],
+    extras_require={"scipy": ["scipy"]},
     long_description=long_description,
     long_description_content_type="text/markdown",
 )